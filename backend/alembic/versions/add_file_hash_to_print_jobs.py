@@ -0,0 +1,30 @@
+"""Add file_hash to print_jobs for content-addressed storage
+
+Revision ID: add_file_hash_print_jobs
+Revises: add_job_queue_indexes
+Create Date: 2026-03-04 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_file_hash_print_jobs'
+down_revision: Union[str, Sequence[str], None] = 'add_job_queue_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the blob hash column used for dedup and reference counting."""
+    op.add_column('print_jobs', sa.Column('file_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_print_jobs_file_hash'), 'print_jobs', ['file_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove the blob hash column."""
+    op.drop_index(op.f('ix_print_jobs_file_hash'), table_name='print_jobs')
+    op.drop_column('print_jobs', 'file_hash')
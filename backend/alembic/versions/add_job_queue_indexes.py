@@ -0,0 +1,43 @@
+"""Add keyset indexes for the shop job queue
+
+Revision ID: add_job_queue_indexes
+Revises: add_unique_constraints
+Create Date: 2026-03-02 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_job_queue_indexes'
+down_revision: Union[str, Sequence[str], None] = 'add_unique_constraints'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace ix_print_jobs_shop_status with indexes that cover the queue ordering."""
+    # (shop_id, status) is a prefix of the new index, so the old one is redundant
+    op.create_index(
+        'ix_print_jobs_shop_status_created',
+        'print_jobs',
+        ['shop_id', 'status', 'created_at', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_print_jobs_shop_created',
+        'print_jobs',
+        ['shop_id', 'created_at', 'id'],
+        unique=False
+    )
+    op.drop_index('ix_print_jobs_shop_status', table_name='print_jobs')
+
+
+def downgrade() -> None:
+    """Restore the original (shop_id, status) index."""
+    op.create_index('ix_print_jobs_shop_status', 'print_jobs', ['shop_id', 'status'], unique=False)
+    op.drop_index('ix_print_jobs_shop_created', table_name='print_jobs')
+    op.drop_index('ix_print_jobs_shop_status_created', table_name='print_jobs')
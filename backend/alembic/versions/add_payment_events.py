@@ -0,0 +1,49 @@
+"""Add payment_events webhook inbox
+
+Revision ID: add_payment_events
+Revises: add_shop_daily_stats
+Create Date: 2026-03-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_payment_events'
+down_revision: Union[str, Sequence[str], None] = 'add_shop_daily_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the inbox table and its partial index of unprocessed events."""
+    op.create_table(
+        'payment_events',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('gateway_event_id', sa.String(length=255), nullable=False),
+        sa.Column('event_type', sa.String(length=64), nullable=False),
+        sa.Column('job_id', sa.UUID(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('gateway_reference', sa.String(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('gateway_event_id'),
+    )
+    op.create_index(
+        'ix_payment_events_pending',
+        'payment_events',
+        ['id'],
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Drop the inbox table."""
+    op.drop_index('ix_payment_events_pending', table_name='payment_events')
+    op.drop_table('payment_events')
@@ -0,0 +1,109 @@
+"""Add pricing_versions and convert job pricing snapshots
+
+Revision ID: add_pricing_versions
+Revises: add_print_jobs_archive
+Create Date: 2026-03-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_pricing_versions'
+down_revision: Union[str, Sequence[str], None] = 'add_print_jobs_archive'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The snapshot pricing_service.price_job writes, from a job and its version
+SNAPSHOT_SQL = """
+    {function}(
+        'shop_id', j.shop_id::text,
+        'size', j.size::text,
+        'color_mode', lower(j.color_mode::text),
+        'normal_rate', v.normal_rate,
+        'bulk_rate', v.bulk_rate,
+        'bulk_threshold', v.bulk_threshold,
+        'units', j.pages * j.copies,
+        'applied_rate', CASE WHEN j.pages * j.copies >= v.bulk_threshold
+                             THEN v.bulk_rate ELSE v.normal_rate END,
+        'is_bulk', j.pages * j.copies >= v.bulk_threshold
+    )
+"""
+
+# Rates of every snapshot that has them as numbers. CASE keeps the casts
+# from running on rows that would fail them.
+RATES_CTE = """
+    WITH rates AS (
+        SELECT
+            id,
+            CASE WHEN json_typeof(pricing_snapshot -> 'normal_rate') = 'number'
+                 THEN (pricing_snapshot ->> 'normal_rate')::float8 END AS normal_rate,
+            CASE WHEN json_typeof(pricing_snapshot -> 'bulk_rate') = 'number'
+                 THEN (pricing_snapshot ->> 'bulk_rate')::float8 END AS bulk_rate,
+            CASE WHEN pricing_snapshot ->> 'bulk_threshold' ~ '^-?[0-9]{1,9}$'
+                 THEN (pricing_snapshot ->> 'bulk_threshold')::int END AS bulk_threshold
+        FROM print_jobs
+        WHERE pricing_version_id IS NULL
+    )
+"""
+
+
+def upgrade() -> None:
+    """
+    Create pricing_versions and move every job whose snapshot it can
+    rebuild exactly onto a version. The other snapshots are left in place.
+    The UPDATE rewrites most of print_jobs, so run it at a quiet time.
+    """
+    op.create_table(
+        'pricing_versions',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('normal_rate', sa.Float(), nullable=False),
+        sa.Column('bulk_rate', sa.Float(), nullable=False),
+        sa.Column('bulk_threshold', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('normal_rate', 'bulk_rate', 'bulk_threshold', name='uq_pricing_versions_rates'),
+    )
+    op.add_column('print_jobs', sa.Column('pricing_version_id', sa.BigInteger(), nullable=True))
+    op.create_foreign_key(
+        'print_jobs_pricing_version_id_fkey',
+        'print_jobs', 'pricing_versions',
+        ['pricing_version_id'], ['id']
+    )
+    op.alter_column('print_jobs', 'pricing_snapshot', existing_type=sa.JSON(), nullable=True)
+
+    op.execute(RATES_CTE + """
+        INSERT INTO pricing_versions (normal_rate, bulk_rate, bulk_threshold, created_at)
+        SELECT DISTINCT normal_rate, bulk_rate, bulk_threshold, now()
+        FROM rates
+        WHERE normal_rate IS NOT NULL AND bulk_rate IS NOT NULL AND bulk_threshold IS NOT NULL
+        ON CONFLICT (normal_rate, bulk_rate, bulk_threshold) DO NOTHING
+    """)
+    op.execute(RATES_CTE + """
+        UPDATE print_jobs AS j
+        SET pricing_version_id = v.id, pricing_snapshot = NULL
+        FROM rates AS r
+        JOIN pricing_versions AS v
+          ON v.normal_rate = r.normal_rate
+         AND v.bulk_rate = r.bulk_rate
+         AND v.bulk_threshold = r.bulk_threshold
+        WHERE j.id = r.id
+          AND j.pricing_snapshot::jsonb = """ + SNAPSHOT_SQL.format(function='jsonb_build_object'))
+
+
+def downgrade() -> None:
+    """Write the snapshots back into print_jobs and drop pricing_versions."""
+    op.execute("""
+        UPDATE print_jobs AS j
+        SET pricing_snapshot = """ + SNAPSHOT_SQL.format(function='json_build_object') + """
+        FROM pricing_versions AS v
+        WHERE j.pricing_version_id = v.id
+    """)
+    op.alter_column('print_jobs', 'pricing_snapshot', existing_type=sa.JSON(), nullable=False)
+    op.drop_constraint('print_jobs_pricing_version_id_fkey', 'print_jobs', type_='foreignkey')
+    op.drop_column('print_jobs', 'pricing_version_id')
+    op.drop_table('pricing_versions')
@@ -0,0 +1,28 @@
+"""Add print_file_url to print_jobs for preprocessed output
+
+Revision ID: add_print_file_url
+Revises: add_file_hash_print_jobs
+Create Date: 2026-03-06 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_print_file_url'
+down_revision: Union[str, Sequence[str], None] = 'add_file_hash_print_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the print-ready file column."""
+    op.add_column('print_jobs', sa.Column('print_file_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove the print-ready file column."""
+    op.drop_column('print_jobs', 'print_file_url')
@@ -0,0 +1,84 @@
+"""Add print_jobs_archive for finished jobs
+
+Revision ID: add_print_jobs_archive
+Revises: add_payment_events
+Create Date: 2026-03-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_print_jobs_archive'
+down_revision: Union[str, Sequence[str], None] = 'add_payment_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the archive table; move jobs into it with `python -m app.cli archive-jobs`."""
+    op.create_table(
+        'print_jobs_archive',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('campus_id', sa.UUID(), nullable=False),
+        sa.Column('shop_id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('original_filename', sa.String(), nullable=False),
+        sa.Column('pages', sa.Integer(), nullable=False),
+        sa.Column('copies', sa.Integer(), nullable=False),
+        sa.Column('size', postgresql.ENUM('A4', 'A3', name='papersize', create_type=False), nullable=False),
+        sa.Column('color_mode', postgresql.ENUM('BW', 'COLOR', name='colormode', create_type=False), nullable=False),
+        sa.Column('final_price', sa.Float(), nullable=False),
+        sa.Column('normal_rate', sa.Float(), nullable=True),
+        sa.Column('bulk_rate', sa.Float(), nullable=True),
+        sa.Column('bulk_threshold', sa.Integer(), nullable=True),
+        sa.Column('pricing_extra', sa.JSON(), nullable=True),
+        sa.Column(
+            'execution_mode_snapshot',
+            postgresql.ENUM('MANUAL', 'ASSISTED', 'AUTO', name='executionmode', create_type=False),
+            nullable=False
+        ),
+        sa.Column(
+            'payment_mode_snapshot',
+            postgresql.ENUM('COUNTER', 'PREPAID', 'BOTH', name='paymentmode', create_type=False),
+            nullable=False
+        ),
+        sa.Column(
+            'status',
+            postgresql.ENUM(
+                'UPLOADED', 'PAYMENT_PENDING', 'PAYMENT_CONFIRMED', 'READY_TO_PRINT',
+                'PRINTING', 'PRINTED', 'COLLECTED', 'CANCELLED',
+                name='printstatus', create_type=False
+            ),
+            nullable=False
+        ),
+        sa.Column('payment_id', sa.UUID(), nullable=True),
+        sa.Column('payment_amount', sa.Float(), nullable=True),
+        sa.Column('payment_status', sa.String(), nullable=True),
+        sa.Column('payment_reference', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['campus_id'], ['campuses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['shop_id'], ['shops.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_print_jobs_archive_user_id', 'print_jobs_archive', ['user_id'], unique=False)
+    op.create_index(
+        'ix_print_jobs_archive_shop_created',
+        'print_jobs_archive',
+        ['shop_id', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop the archive table (archived jobs are lost, not moved back)."""
+    op.drop_index('ix_print_jobs_archive_shop_created', table_name='print_jobs_archive')
+    op.drop_index('ix_print_jobs_archive_user_id', table_name='print_jobs_archive')
+    op.drop_table('print_jobs_archive')
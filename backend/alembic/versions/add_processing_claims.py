@@ -0,0 +1,33 @@
+"""Add preprocessing claim columns to print_jobs
+
+Revision ID: add_processing_claims
+Revises: add_pricing_versions
+Create Date: 2026-03-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_processing_claims'
+down_revision: Union[str, Sequence[str], None] = 'add_pricing_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the preprocessing lease and failure count."""
+    op.add_column('print_jobs', sa.Column('processing_claimed_until', sa.DateTime(), nullable=True))
+    op.add_column(
+        'print_jobs',
+        sa.Column('processing_attempts', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """Remove the preprocessing lease and failure count."""
+    op.drop_column('print_jobs', 'processing_attempts')
+    op.drop_column('print_jobs', 'processing_claimed_until')
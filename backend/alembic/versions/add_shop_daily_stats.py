@@ -0,0 +1,40 @@
+"""Add shop_daily_stats rollup table
+
+Revision ID: add_shop_daily_stats
+Revises: add_print_file_url
+Create Date: 2026-03-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_shop_daily_stats'
+down_revision: Union[str, Sequence[str], None] = 'add_print_file_url'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the rollup table; fill it with `python -m app.cli rebuild-stats`."""
+    op.create_table(
+        'shop_daily_stats',
+        sa.Column('shop_id', sa.UUID(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('size', postgresql.ENUM('A4', 'A3', name='papersize', create_type=False), nullable=False),
+        sa.Column('color_mode', postgresql.ENUM('BW', 'COLOR', name='colormode', create_type=False), nullable=False),
+        sa.Column('jobs', sa.Integer(), nullable=False),
+        sa.Column('pages', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['shop_id'], ['shops.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('shop_id', 'day', 'size', 'color_mode'),
+    )
+
+
+def downgrade() -> None:
+    """Drop the rollup table."""
+    op.drop_table('shop_daily_stats')
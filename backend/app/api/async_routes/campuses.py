@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_async_db
+from app.models.campus import Campus
+from app.schemas.campus import CampusCreate, CampusUpdate, CampusResponse
+from app.services.cache_service import CAMPUSES_KEY, SHOPS_KEY, cached_response, catalog_cache
+from app.services.ranking_service import shop_rankings
+from app.utils.serialization import column_select, dump_rows
+
+router = APIRouter(route_class=TimedRoute)
+
+campus_list = TypeAdapter(List[CampusResponse])
+
+
+@router.post("/", response_model=CampusResponse)
+async def create_campus(data: CampusCreate, db: AsyncSession = Depends(get_async_db)):
+    # Check if campus with same name already exists
+    existing = (await db.execute(select(Campus).where(Campus.name == data.name))).scalars().first()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Campus with name '{data.name}' already exists")
+
+    campus = Campus(**data.model_dump())
+    db.add(campus)
+    await db.commit()
+    await db.refresh(campus)
+    catalog_cache.invalidate(CAMPUSES_KEY)
+    return campus
+
+
+@router.get("/", response_model=List[CampusResponse])
+async def list_campuses(
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    entry = catalog_cache.get(CAMPUSES_KEY)
+    if entry is None:
+        generation = catalog_cache.generation(CAMPUSES_KEY)
+        if settings.FAST_SERIALIZATION:
+            body = dump_rows(await db.execute(column_select(Campus, CampusResponse)))
+        else:
+            rows = (await db.execute(select(Campus))).scalars().all()
+            body = campus_list.dump_json(campus_list.validate_python(rows, from_attributes=True))
+        entry = catalog_cache.set(CAMPUSES_KEY, body, generation)
+    return cached_response(entry, if_none_match)
+
+
+@router.patch("/{campus_id}", response_model=CampusResponse)
+async def update_campus(campus_id: UUID, data: CampusUpdate, db: AsyncSession = Depends(get_async_db)):
+    campus = await db.get(Campus, campus_id)
+    if not campus:
+        raise HTTPException(status_code=404, detail="Campus not found")
+
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(campus, key, value)
+
+    await db.commit()
+    await db.refresh(campus)
+    catalog_cache.invalidate(CAMPUSES_KEY)
+    return campus
+
+
+@router.delete("/{campus_id}")
+async def delete_campus(campus_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    campus = await db.get(Campus, campus_id)
+    if not campus:
+        raise HTTPException(status_code=404, detail="Campus not found")
+
+    await db.delete(campus)
+    await db.commit()
+    # Shops cascade with their campus
+    catalog_cache.invalidate(CAMPUSES_KEY, SHOPS_KEY)
+    shop_rankings.invalidate(campus_id)
+    return {"message": "Campus deleted"}
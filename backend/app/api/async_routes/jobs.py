@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_async_read_db
+from app.models.job import PrintJob
+from app.schemas.job import JobResponse
+from app.utils.serialization import column_select, dump_rows, json_response
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/", response_model=List[JobResponse])
+async def list_jobs(db: AsyncSession = Depends(get_async_read_db)):
+    if settings.FAST_SERIALIZATION:
+        return json_response(dump_rows(await db.execute(column_select(PrintJob, JobResponse))))
+    return (await db.execute(select(PrintJob))).scalars().all()
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+
+from app.api.deps import WebhookEvent, webhook_event
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_async_db, get_async_read_db
+from app.models.payment import Payment
+from app.schemas.payment import PaymentResponse, WebhookAck
+from app.services import payment_service
+from app.utils.serialization import column_select, dump_rows, json_response
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/", response_model=List[PaymentResponse])
+async def list_payments(db: AsyncSession = Depends(get_async_read_db)):
+    if settings.FAST_SERIALIZATION:
+        return json_response(dump_rows(await db.execute(column_select(Payment, PaymentResponse))))
+    return (await db.execute(select(Payment))).scalars().all()
+
+
+@router.post("/webhook", response_model=WebhookAck)
+async def payment_webhook(
+    webhook: WebhookEvent = Depends(webhook_event),
+    db: AsyncSession = Depends(get_async_db)
+):
+    event, payload = webhook
+    stmt = payment_service.inbox_insert(db.get_bind().dialect, event, payload)
+    inserted = (await db.execute(stmt)).first() is not None
+    await db.commit()
+    if inserted:
+        payment_service.payment_applier.wake()
+    return WebhookAck(duplicate=not inserted)
+
+
+@router.get("/{payment_id}", response_model=PaymentResponse)
+async def get_payment(payment_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
+    payment = await db.get(Payment, payment_id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return payment
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+from datetime import datetime
+
+from app.core.constants import PrintStatus
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_async_db, get_async_read_db
+from app.models.shop import Shop
+from app.schemas.job import JobPage
+from app.schemas.shop import ShopCreate, ShopUpdate, ShopResponse
+from app.services import job_service
+from app.services.cache_service import SHOPS_KEY, cached_response, catalog_cache
+from app.services.ranking_service import shop_rankings
+from app.utils.serialization import column_select, dump_rows
+
+router = APIRouter(route_class=TimedRoute)
+
+shop_list = TypeAdapter(List[ShopResponse])
+
+
+@router.post("/", response_model=ShopResponse)
+async def create_shop(data: ShopCreate, db: AsyncSession = Depends(get_async_db)):
+    # Check if shop with same name already exists in this campus
+    existing = (await db.execute(
+        select(Shop).where(
+            Shop.campus_id == data.campus_id,
+            Shop.name == data.name
+        )
+    )).scalars().first()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Shop with name '{data.name}' already exists in this campus")
+
+    shop = Shop(**data.model_dump())
+    db.add(shop)
+    await db.commit()
+    await db.refresh(shop)
+    catalog_cache.invalidate(SHOPS_KEY)
+    shop_rankings.invalidate(shop.campus_id)
+    return shop
+
+
+@router.get("/", response_model=List[ShopResponse])
+async def list_shops(
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    entry = catalog_cache.get(SHOPS_KEY)
+    if entry is None:
+        generation = catalog_cache.generation(SHOPS_KEY)
+        if settings.FAST_SERIALIZATION:
+            body = dump_rows(await db.execute(column_select(Shop, ShopResponse)))
+        else:
+            rows = (await db.execute(select(Shop))).scalars().all()
+            body = shop_list.dump_json(shop_list.validate_python(rows, from_attributes=True))
+        entry = catalog_cache.set(SHOPS_KEY, body, generation)
+    return cached_response(entry, if_none_match)
+
+
+@router.patch("/{shop_id}", response_model=ShopResponse)
+async def update_shop(shop_id: UUID, data: ShopUpdate, db: AsyncSession = Depends(get_async_db)):
+    shop = await db.get(Shop, shop_id)
+    if not shop:
+        raise HTTPException(status_code=404, detail="Shop not found")
+
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(shop, key, value)
+
+    await db.commit()
+    await db.refresh(shop)
+    catalog_cache.invalidate(SHOPS_KEY)
+    shop_rankings.invalidate(shop.campus_id)
+    return shop
+
+
+@router.get("/{shop_id}/jobs", response_model=JobPage, response_model_exclude_unset=True)
+async def list_shop_jobs(
+    shop_id: UUID,
+    status: List[PrintStatus] | None = Query(None),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    include: str | None = Query(None, description="Comma-separated: campus, shop, user, payment"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        includes = job_service.parse_includes(include)
+        stmt = job_service.build_shop_queue_query(
+            shop_id,
+            statuses=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    jobs = (await db.execute(job_service.with_includes(stmt, includes))).scalars().all()
+    items, next_cursor = job_service.paginate(list(jobs), limit)
+    return JobPage(items=[job_service.job_detail(job, includes) for job in items], next_cursor=next_cursor)
+
+
+@router.delete("/{shop_id}")
+async def delete_shop(shop_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    shop = await db.get(Shop, shop_id)
+    if not shop:
+        raise HTTPException(status_code=404, detail="Shop not found")
+
+    campus_id = shop.campus_id
+    await db.delete(shop)
+    await db.commit()
+    catalog_cache.invalidate(SHOPS_KEY)
+    shop_rankings.invalidate(campus_id)
+    return {"message": "Shop deleted"}
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_async_db, get_async_read_db
+from app.models.user import User
+from app.schemas.user import UserCreate, UserResponse
+from app.utils.serialization import column_select, dump_rows, json_response
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.post("/", response_model=UserResponse)
+async def create_user(data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = User(**data.model_dump())
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@router.get("/", response_model=List[UserResponse])
+async def list_users(db: AsyncSession = Depends(get_async_read_db)):
+    if settings.FAST_SERIALIZATION:
+        return json_response(dump_rows(await db.execute(column_select(User, UserResponse))))
+    return (await db.execute(select(User))).scalars().all()
+
+
+@router.delete("/{user_id}")
+async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    await db.delete(user)
+    await db.commit()
+    return {"message": "User deleted"}
@@ -1,2 +1,37 @@
 # -*- coding: utf-8 -*-
+# app/api/deps.py
 
+import json
+from typing import Tuple
+
+from fastapi import Header, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.payment import PaymentWebhook
+from app.services import payment_service
+
+# Parsed event and the raw JSON payload kept in the inbox
+WebhookEvent = Tuple[PaymentWebhook, dict]
+
+
+async def webhook_event(request: Request, x_signature: str | None = Header(None)) -> WebhookEvent:
+    """Verify and parse a payment gateway webhook body."""
+    body = await request.body()
+    try:
+        payment_service.verify_signature(
+            body,
+            x_signature,
+            settings.PAYMENT_WEBHOOK_SECRET,
+            allow_unsigned=settings.PAYMENT_WEBHOOK_ALLOW_UNSIGNED,
+        )
+    except payment_service.WebhookSignatureError as exc:
+        raise HTTPException(status_code=401, detail=str(exc))
+    try:
+        payload = json.loads(body)
+        return PaymentWebhook.model_validate(payload), payload
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body is not JSON")
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors())
@@ -4,11 +4,12 @@ from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
+from app.core.metrics import TimedRoute
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/login")
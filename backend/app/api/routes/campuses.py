@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 from uuid import UUID
 
+from app.core.config import settings
+from app.core.constants import ColorMode, PaperSize
+from app.core.metrics import TimedRoute
 from app.db.session import get_db
 from app.models.campus import Campus
 from app.schemas.campus import CampusCreate, CampusUpdate, CampusResponse
+from app.schemas.shop import RankedShop
+from app.services.cache_service import CAMPUSES_KEY, SHOPS_KEY, cached_response, catalog_cache
+from app.services.ranking_service import shop_rankings
+from app.utils.serialization import column_select, dump_rows
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+campus_list = TypeAdapter(List[CampusResponse])
 
 
 @router.post("/", response_model=CampusResponse)
@@ -21,12 +31,58 @@ def create_campus(data: CampusCreate, db: Session = Depends(get_db)):
     db.add(campus)
     db.commit()
     db.refresh(campus)
+    catalog_cache.invalidate(CAMPUSES_KEY)
     return campus
 
 
 @router.get("/", response_model=List[CampusResponse])
-def list_campuses(db: Session = Depends(get_db)):
-    return db.query(Campus).all()
+def list_campuses(
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db)
+):
+    entry = catalog_cache.get(CAMPUSES_KEY)
+    if entry is None:
+        generation = catalog_cache.generation(CAMPUSES_KEY)
+        if settings.FAST_SERIALIZATION:
+            body = dump_rows(db.execute(column_select(Campus, CampusResponse)))
+        else:
+            body = campus_list.dump_json(campus_list.validate_python(db.query(Campus).all(), from_attributes=True))
+        entry = catalog_cache.set(CAMPUSES_KEY, body, generation)
+    return cached_response(entry, if_none_match)
+
+
+@router.get("/{campus_id}/shops/ranked", response_model=List[RankedShop])
+def rank_shops(
+    campus_id: UUID,
+    size: PaperSize,
+    color_mode: ColorMode,
+    pages: int = Query(..., ge=1),
+    copies: int = Query(1, ge=1),
+    sort: Literal["price", "wait"] = "price",
+    db: Session = Depends(get_db)
+):
+    """
+    Active shops of a campus that can print the given job, with its price
+    at each and the estimated wait behind their READY_TO_PRINT/PRINTING
+    queue; cheapest first, or shortest wait first with sort=wait.
+    """
+    ranked = shop_rankings.rank(db, campus_id, size, color_mode, pages, copies, by=sort)
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="Campus not found")
+    return [
+        RankedShop(
+            shop_id=r.shop.shop_id,
+            name=r.shop.name,
+            execution_mode=r.shop.execution_mode,
+            payment_mode=r.shop.payment_mode,
+            final_price=r.final_price,
+            applied_rate=r.applied_rate,
+            is_bulk=r.is_bulk,
+            queue_length=r.queue_length,
+            estimated_wait_seconds=r.estimated_wait_seconds,
+        )
+        for r in ranked
+    ]
 
 
 @router.patch("/{campus_id}", response_model=CampusResponse)
@@ -40,6 +96,7 @@ def update_campus(campus_id: UUID, data: CampusUpdate, db: Session = Depends(get
 
     db.commit()
     db.refresh(campus)
+    catalog_cache.invalidate(CAMPUSES_KEY)
     return campus
 
 
@@ -51,4 +108,7 @@ def delete_campus(campus_id: UUID, db: Session = Depends(get_db)):
 
     db.delete(campus)
     db.commit()
+    # Shops cascade with their campus
+    catalog_cache.invalidate(CAMPUSES_KEY, SHOPS_KEY)
+    shop_rankings.invalidate(campus_id)
     return {"message": "Campus deleted"}
\ No newline at end of file
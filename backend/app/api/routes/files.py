@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import TimedRoute
+from app.services.storage_service import SHA256_RE, storage
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.head("/{sha256}")
+def check_file(sha256: str):
+    """
+    200 if a blob with this SHA-256 is already stored, so the client can
+    create its job via POST /api/jobs/from-file instead of uploading.
+    """
+    if SHA256_RE.match(sha256) and storage.exists(sha256):
+        return Response(status_code=200)
+    return Response(status_code=404)
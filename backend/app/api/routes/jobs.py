@@ -1,15 +1,210 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import List, Literal
 from uuid import UUID
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_db, get_read_db
 from app.models.job import PrintJob
-from app.schemas.job import JobResponse
+from app.schemas.bulk import ImportResult
+from app.schemas.job import (
+    JobDetail,
+    JobFromFile,
+    JobImport,
+    JobResponse,
+    JobTransitionBatch,
+    JobTransitionBatchResult,
+    JobTransitionResult,
+    JobUpload,
+    PickupCodeResponse,
+    PickupCollectBatch,
+    PickupCollectBatchResult,
+    PickupCollectResult,
+)
+from app.services import import_service, job_service, pickup_service, transition_service
+from app.services.pickup_service import pickup_codes
+from app.utils.qr_utils import QR_MEDIA_TYPES
+from app.utils import file_utils
+from app.utils.serialization import column_select, dump_rows, json_response
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/", response_model=List[JobResponse])
-def list_jobs(db: Session = Depends(get_db)):
-    return db.query(PrintJob).all()
\ No newline at end of file
+def list_jobs(db: Session = Depends(get_read_db)):
+    if settings.FAST_SERIALIZATION:
+        return json_response(dump_rows(db.execute(column_select(PrintJob, JobResponse))))
+    return db.query(PrintJob).all()
+
+
+@router.get("/processing/metrics")
+def processing_metrics():
+    """Preprocessing queue depth (total and per shop) and per-stage timings."""
+    return job_service.job_processor.metrics()
+
+
+@router.post("/upload", response_model=JobResponse)
+async def upload_job(request: Request, db: Session = Depends(get_db)):
+    """
+    Create a job from a multipart upload with a single PDF `file` part and
+    the JobUpload fields. The body is streamed to disk and hashed as it
+    arrives; pages are counted from the PDF's page tree. Check
+    HEAD /api/files/{sha256} first and use /from-file to skip the upload
+    when the document is already stored.
+    """
+    try:
+        upload = await file_utils.receive_multipart(
+            request.stream(),
+            request.headers.get("content-type", ""),
+            os.path.join(settings.UPLOAD_DIR, "tmp"),
+            settings.MAX_UPLOAD_BYTES,
+        )
+    except file_utils.UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except file_utils.UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if upload.file is None:
+        raise HTTPException(status_code=400, detail="Missing file")
+
+    try:
+        data = JobUpload(**upload.fields)
+        return await run_in_threadpool(job_service.create_job_from_upload, db, data, upload.file)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors())
+    except job_service.JobCreationError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail, headers=exc.headers)
+    finally:
+        file_utils.discard(upload.file)
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_jobs(
+    request: Request,
+    batch_size: int = Query(import_service.DEFAULT_BATCH_SIZE, ge=1, le=import_service.MAX_BATCH_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-create jobs from an NDJSON (application/x-ndjson) or CSV (text/csv)
+    body of JobImport records, e.g. a course pack ordered for a whole class.
+    Each file_hash must already be stored (see /from-file). Rows are inserted
+    `batch_size` at a time; rejected rows are reported by line number and do
+    not stop the import.
+    """
+    try:
+        return await import_service.run_import(
+            db,
+            request.stream(),
+            request.headers.get("content-type", ""),
+            JobImport,
+            import_service.insert_job_batch,
+            batch_size,
+        )
+    except import_service.ImportFormatError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+
+
+@router.post("/transitions:batch", response_model=JobTransitionBatchResult)
+def transition_jobs(data: JobTransitionBatch, db: Session = Depends(get_db)):
+    """
+    Move many jobs to new statuses in one conditional UPDATE, e.g. marking
+    a stack of jobs PRINTED. A transition applies only if the job is still
+    in `expected` (or, without it, in the status read at the start of the
+    call); otherwise it is reported as a conflict along with the job's
+    current status. Disallowed edges are reported as invalid.
+    """
+    outcomes = transition_service.apply_transitions(
+        db,
+        [transition_service.Transition(t.job_id, t.to, t.expected) for t in data.transitions],
+    )
+    results = [
+        JobTransitionResult(job_id=o.job_id, result=o.result, status=o.status, detail=o.detail)
+        for o in outcomes
+    ]
+    applied = sum(1 for r in results if r.result == transition_service.APPLIED)
+    return JobTransitionBatchResult(applied=applied, failed=len(results) - applied, results=results)
+
+
+@router.post("/collect:batch", response_model=PickupCollectBatchResult)
+def collect_jobs(data: PickupCollectBatch, db: Session = Depends(get_db)):
+    """
+    Hand over a burst of scanned pickup codes: every job whose code
+    verifies for `shop_id` and that is still PRINTED is marked COLLECTED,
+    all in one transaction. Codes are checked without touching the
+    database; forged, expired or other-shop codes come back invalid.
+    """
+    try:
+        outcomes = pickup_codes.collect(db, data.shop_id, data.tokens)
+    except pickup_service.PickupCodeError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    results = [
+        PickupCollectResult(job_id=o.job_id, result=o.result, status=o.status, detail=o.detail)
+        for o in outcomes
+    ]
+    collected = sum(1 for r in results if r.result == transition_service.APPLIED)
+    return PickupCollectBatchResult(collected=collected, failed=len(results) - collected, results=results)
+
+
+# Primary, not get_read_db: a replica may not have seen the job reach PRINTED yet
+@router.get("/{job_id}/pickup-code", response_model=PickupCodeResponse)
+def get_pickup_code(job_id: UUID, user_id: UUID = Query(...), db: Session = Depends(get_db)):
+    """The job's pickup code; `user_id` must be the job's user."""
+    try:
+        code = pickup_codes.code_for(db, job_id, user_id)
+    except pickup_service.PickupCodeError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    return PickupCodeResponse(
+        job_id=job_id, token=code.token, expires_at=datetime.utcfromtimestamp(code.expires_at)
+    )
+
+
+@router.get("/{job_id}/pickup-code/qr")
+def get_pickup_qr(
+    job_id: UUID,
+    user_id: UUID = Query(...),
+    format: Literal["png", "svg"] = Query("png"),
+    db: Session = Depends(get_db)
+):
+    try:
+        code = pickup_codes.code_for(db, job_id, user_id)
+    except pickup_service.PickupCodeError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    return Response(
+        content=pickup_codes.image(code, format),
+        media_type=QR_MEDIA_TYPES[format],
+        headers={"Cache-Control": "private, no-store"},
+    )
+
+
+@router.post("/from-file", response_model=JobResponse)
+def create_job_from_file(data: JobFromFile, db: Session = Depends(get_db)):
+    try:
+        return job_service.create_job_from_file(db, data)
+    except job_service.JobCreationError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail, headers=exc.headers)
+
+
+@router.get("/{job_id}", response_model=JobDetail, response_model_exclude_unset=True)
+def get_job(
+    job_id: UUID,
+    include: str | None = Query(None, description="Comma-separated: campus, shop, user, payment"),
+    db: Session = Depends(get_read_db)
+):
+    try:
+        includes = job_service.parse_includes(include)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    stmt = job_service.with_includes(select(PrintJob).where(PrintJob.id == job_id), includes)
+    job = db.execute(stmt).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_service.job_detail(job, includes)
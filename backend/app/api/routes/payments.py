@@ -1,23 +1,58 @@
 # -*- coding: utf-8 -*-
+from dataclasses import asdict
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from uuid import UUID
 
-from app.db.session import get_db
-from app.models.payment import Payment
-from app.schemas.payment import PaymentResponse
+from app.api.deps import WebhookEvent, webhook_event
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_db, get_read_db
+from app.models.payment import Payment, PaymentEvent
+from app.schemas.payment import PaymentResponse, WebhookAck
+from app.services import payment_service
+from app.utils.serialization import column_select, dump_rows, json_response
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/", response_model=List[PaymentResponse])
-def list_payments(db: Session = Depends(get_db)):
+def list_payments(db: Session = Depends(get_read_db)):
+    if settings.FAST_SERIALIZATION:
+        return json_response(dump_rows(db.execute(column_select(Payment, PaymentResponse))))
     return db.query(Payment).all()
 
 
+@router.post("/webhook", response_model=WebhookAck)
+async def payment_webhook(
+    webhook: WebhookEvent = Depends(webhook_event),
+    db: Session = Depends(get_db)
+):
+    """
+    Gateway webhook. The event is only appended to the payment_events inbox
+    (redeliveries are ignored) and acknowledged; the payment applier moves
+    Payment and PrintJob status in the background.
+    """
+    event, payload = webhook
+    inserted = await run_in_threadpool(payment_service.record_event, db, event, payload)
+    return WebhookAck(duplicate=not inserted)
+
+
+@router.get("/applier/metrics")
+def applier_metrics(db: Session = Depends(get_db)):
+    """Inbox backlog and what the applier in this process has done."""
+    pending = db.scalar(
+        select(func.count()).select_from(PaymentEvent).where(PaymentEvent.processed_at.is_(None))
+    )
+    return {"pending": pending, **asdict(payment_service.payment_applier.stats)}
+
+
 @router.get("/{payment_id}", response_model=PaymentResponse)
-def get_payment(payment_id: UUID, db: Session = Depends(get_db)):
+def get_payment(payment_id: UUID, db: Session = Depends(get_read_db)):
     payment = db.get(Payment, payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
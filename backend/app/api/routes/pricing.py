@@ -1,13 +1,22 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.core.metrics import TimedRoute
+from app.db.session import get_db, get_read_db
 from app.models.pricing import ShopPricing
-from app.schemas.pricing import PricingCreate, PricingResponse
+from app.schemas.job import JobCreate
+from app.schemas.pricing import PricingCreate, PricingResponse, QuoteResponse
+from app.services.pricing_service import PricingNotFound, pricing_engine
+
+router = APIRouter(route_class=TimedRoute)
 
-router = APIRouter()
+MAX_BATCH_QUOTES = 50_000
+BATCH_CHUNK_LINES = 1_000
 
 
 @router.post("/", response_model=PricingResponse)
@@ -16,11 +25,64 @@ def create_pricing(data: PricingCreate, db: Session = Depends(get_db)):
     db.add(pricing)
     db.commit()
     db.refresh(pricing)
+    pricing_engine.invalidate(pricing.shop_id)
     return pricing
 
 
+@router.post("/quote", response_model=QuoteResponse)
+def quote_job(data: JobCreate, db: Session = Depends(get_db)):
+    try:
+        quote = pricing_engine.quote(
+            db, data.shop_id, data.size, data.color_mode, data.pages, data.copies
+        )
+    except PricingNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return QuoteResponse(final_price=quote.final_price, pricing_snapshot=quote.pricing_snapshot)
+
+
+@router.post("/quote:batch")
+def quote_batch(specs: List[JobCreate], db: Session = Depends(get_db)):
+    """
+    Price many job specs at once. The response is NDJSON, one line per spec
+    in input order: {"index", "final_price", "applied_rate", "units", "is_bulk"}
+    or {"index", "error"} when the shop has no rate for that size/color.
+    """
+    if len(specs) > MAX_BATCH_QUOTES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_QUOTES} specs per batch")
+
+    result = pricing_engine.quote_batch(db, specs)
+
+    def lines():
+        final_price = result.final_price.tolist()
+        applied_rate = result.applied_rate.tolist()
+        units = result.units.tolist()
+        is_bulk = result.is_bulk.tolist()
+        found = result.found.tolist()
+
+        chunk = []
+        for i in range(len(result)):
+            if found[i]:
+                row = {
+                    "index": i,
+                    "final_price": final_price[i],
+                    "applied_rate": applied_rate[i],
+                    "units": units[i],
+                    "is_bulk": is_bulk[i],
+                }
+            else:
+                row = {"index": i, "error": "No pricing for this size and color mode"}
+            chunk.append(json.dumps(row))
+            if len(chunk) == BATCH_CHUNK_LINES:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{shop_id}", response_model=List[PricingResponse])
-def list_pricing(shop_id: UUID, db: Session = Depends(get_db)):
+def list_pricing(shop_id: UUID, db: Session = Depends(get_read_db)):
     return db.query(ShopPricing).filter(ShopPricing.shop_id == shop_id).all()
 
 
@@ -30,6 +92,8 @@ def delete_pricing(pricing_id: UUID, db: Session = Depends(get_db)):
     if not pricing:
         raise HTTPException(status_code=404, detail="Pricing not found")
 
+    shop_id = pricing.shop_id
     db.delete(pricing)
     db.commit()
+    pricing_engine.invalidate(shop_id)
     return {"message": "Pricing deleted"}
\ No newline at end of file
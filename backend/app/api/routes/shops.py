@@ -1,13 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
+from datetime import date, datetime, timedelta
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.constants import ExecutionMode, PrintStatus
+from app.core.metrics import TimedRoute
+from app.db.session import get_db, get_read_db
 from app.models.shop import Shop
+from app.schemas.dispatch import DispatchPlan, DispatchSlot
+from app.schemas.job import JobPage
 from app.schemas.shop import ShopCreate, ShopUpdate, ShopResponse
+from app.schemas.stats import ShopStats, ShopStatsRow, ShopStatsTotals
+from app.services import dispatch_service, job_service, stats_service
+from app.services.cache_service import SHOPS_KEY, cached_response, catalog_cache
+from app.services.ranking_service import shop_rankings
+from app.services.event_service import RESET_SSE, job_events
+from app.utils.serialization import column_select, dump_rows
+
+router = APIRouter(route_class=TimedRoute)
+
+shop_list = TypeAdapter(List[ShopResponse])
 
-router = APIRouter()
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_RETRY_MS = 3000
+STATS_DEFAULT_DAYS = 30
+STATS_MAX_DAYS = 366
+DISPATCH_MAX_PRINTERS = 16
 
 
 @router.post("/", response_model=ShopResponse)
@@ -24,12 +48,25 @@ def create_shop(data: ShopCreate, db: Session = Depends(get_db)):
     db.add(shop)
     db.commit()
     db.refresh(shop)
+    catalog_cache.invalidate(SHOPS_KEY)
+    shop_rankings.invalidate(shop.campus_id)
     return shop
 
 
 @router.get("/", response_model=List[ShopResponse])
-def list_shops(db: Session = Depends(get_db)):
-    return db.query(Shop).all()
+def list_shops(
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db)
+):
+    entry = catalog_cache.get(SHOPS_KEY)
+    if entry is None:
+        generation = catalog_cache.generation(SHOPS_KEY)
+        if settings.FAST_SERIALIZATION:
+            body = dump_rows(db.execute(column_select(Shop, ShopResponse)))
+        else:
+            body = shop_list.dump_json(shop_list.validate_python(db.query(Shop).all(), from_attributes=True))
+        entry = catalog_cache.set(SHOPS_KEY, body, generation)
+    return cached_response(entry, if_none_match)
 
 
 @router.patch("/{shop_id}", response_model=ShopResponse)
@@ -43,15 +80,160 @@ def update_shop(shop_id: UUID, data: ShopUpdate, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(shop)
+    catalog_cache.invalidate(SHOPS_KEY)
+    shop_rankings.invalidate(shop.campus_id)
     return shop
 
 
+@router.get("/{shop_id}/jobs", response_model=JobPage, response_model_exclude_unset=True)
+def list_shop_jobs(
+    shop_id: UUID,
+    status: List[PrintStatus] | None = Query(None),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    include: str | None = Query(None, description="Comma-separated: campus, shop, user, payment"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Shop job queue, oldest first. Pass `next_cursor` from the previous
+    response as `cursor` to fetch the following page. `include` adds the
+    named related objects to each item, loaded in a fixed number of queries
+    whatever the page size.
+    """
+    try:
+        includes = job_service.parse_includes(include)
+        stmt = job_service.build_shop_queue_query(
+            shop_id,
+            statuses=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    jobs = db.execute(job_service.with_includes(stmt, includes)).scalars().all()
+    items, next_cursor = job_service.paginate(list(jobs), limit)
+    return JobPage(items=[job_service.job_detail(job, includes) for job in items], next_cursor=next_cursor)
+
+
+@router.get("/{shop_id}/stats", response_model=ShopStats)
+def get_shop_stats(
+    shop_id: UUID,
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Daily jobs, printed pages and revenue per paper size and colour mode,
+    read from the shop_daily_stats rollup. Defaults to the last 30 days;
+    days are those the jobs were created on.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=STATS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= STATS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {STATS_MAX_DAYS} days")
+
+    rows = [ShopStatsRow.model_validate(r) for r in stats_service.shop_stats(db, shop_id, start, end)]
+    totals = ShopStatsTotals(
+        jobs=sum(r.jobs for r in rows),
+        pages=sum(r.pages for r in rows),
+        revenue=round(sum(r.revenue for r in rows), 2),
+    )
+    return ShopStats(shop_id=shop_id, start=start, end=end, totals=totals, rows=rows)
+
+
+@router.get("/{shop_id}/dispatch", response_model=DispatchPlan)
+def get_dispatch_plan(
+    shop_id: UUID,
+    printers: int = Query(1, ge=1, le=DISPATCH_MAX_PRINTERS),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Print order for an AUTO shop's READY_TO_PRINT jobs across `printers`
+    printers, batched by paper size and colour mode with bounded waits.
+    Times are seconds from now.
+    """
+    shop = db.get(Shop, shop_id)
+    if not shop:
+        raise HTTPException(status_code=404, detail="Shop not found")
+    if shop.execution_mode != ExecutionMode.AUTO:
+        raise HTTPException(status_code=400, detail="Dispatch is only available for AUTO shops")
+
+    assignments = dispatch_service.plan(db, shop_id, printers)
+    slots = [
+        DispatchSlot(
+            job_id=a.job.job_id,
+            printer=a.printer,
+            size=a.job.size,
+            color_mode=a.job.color_mode,
+            start_seconds=round(a.start, 3),
+            setup_seconds=a.setup_seconds,
+            end_seconds=round(a.end, 3),
+        )
+        for a in assignments
+    ]
+    return DispatchPlan(
+        shop_id=shop_id,
+        printers=printers,
+        switches=sum(1 for a in assignments if a.setup_seconds),
+        makespan_seconds=round(max((a.end for a in assignments), default=0.0), 3),
+        slots=slots,
+    )
+
+
+@router.get("/{shop_id}/jobs/stream")
+async def stream_shop_jobs(
+    shop_id: UUID,
+    request: Request,
+    last_event_id: str | None = Query(None),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events for job status changes in this shop. Browsers resume
+    with the Last-Event-ID header; `last_event_id` does the same for clients
+    that cannot set headers. An `event: reset` means events were missed and
+    the job list should be re-fetched.
+    """
+    sub = job_events.subscribe(shop_id, last_event_id_header or last_event_id)
+
+    async def events():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+            while not await request.is_disconnected():
+                if sub.needs_reset:
+                    sub.needs_reset = False
+                    yield RESET_SSE
+                try:
+                    event = await asyncio.wait_for(sub.get(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield event.to_sse()
+        finally:
+            job_events.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete("/{shop_id}")
 def delete_shop(shop_id: UUID, db: Session = Depends(get_db)):
     shop = db.get(Shop, shop_id)
     if not shop:
         raise HTTPException(status_code=404, detail="Shop not found")
 
+    campus_id = shop.campus_id
     db.delete(shop)
     db.commit()
+    catalog_cache.invalidate(SHOPS_KEY)
+    shop_rankings.invalidate(campus_id)
     return {"message": "Shop deleted"}
\ No newline at end of file
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.db.session import get_db, get_read_db
 from app.models.user import User
+from app.schemas.bulk import ImportResult
 from app.schemas.user import UserCreate, UserResponse
+from app.services import import_service
+from app.utils.serialization import column_select, dump_rows, json_response
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/", response_model=UserResponse)
@@ -19,8 +24,35 @@ def create_user(data: UserCreate, db: Session = Depends(get_db)):
     return user
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_users(
+    request: Request,
+    batch_size: int = Query(import_service.DEFAULT_BATCH_SIZE, ge=1, le=import_service.MAX_BATCH_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-create users from an NDJSON (application/x-ndjson) or CSV (text/csv)
+    body of UserCreate records. Rows are inserted `batch_size` at a time;
+    rejected rows (invalid, unknown campus, email taken) are reported by
+    line number and do not stop the import.
+    """
+    try:
+        return await import_service.run_import(
+            db,
+            request.stream(),
+            request.headers.get("content-type", ""),
+            UserCreate,
+            import_service.insert_user_batch,
+            batch_size,
+        )
+    except import_service.ImportFormatError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+
+
 @router.get("/", response_model=List[UserResponse])
-def list_users(db: Session = Depends(get_db)):
+def list_users(db: Session = Depends(get_read_db)):
+    if settings.FAST_SERIALIZATION:
+        return json_response(dump_rows(db.execute(column_select(User, UserResponse))))
     return db.query(User).all()
 
 
@@ -0,0 +1,162 @@
+# app/cli.py
+"""
+Maintenance commands, run from backend/:
+
+    python -m app.cli gc-blobs [--grace-seconds N] [--dry-run]
+    python -m app.cli rebuild-stats [--shop SHOP_ID]
+    python -m app.cli archive-jobs [--older-than-days N] [--batch-size N]
+                                   [--max-batches N] [--dry-run] [--vacuum]
+    python -m app.cli startup-profile [--top N]
+
+archive-jobs is meant to run on a schedule, e.g. nightly from cron:
+
+    15 3 * * *  cd /srv/backend && python -m app.cli archive-jobs --vacuum
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from uuid import UUID
+
+from app.db.session import SessionLocal
+
+
+def gc_blobs(args):
+    from app.services.storage_service import collect_garbage
+
+    db = SessionLocal()
+    try:
+        result = collect_garbage(db, grace_seconds=args.grace_seconds, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    action = "would delete" if args.dry_run else "deleted"
+    print(
+        f"scanned {result.scanned} blobs, {action} {result.deleted} "
+        f"({result.freed_bytes / 2**20:.1f} MB freed)"
+    )
+
+
+def rebuild_stats(args):
+    from app.services.stats_service import rebuild
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = rebuild(db, shop_id=args.shop)
+    finally:
+        db.close()
+    print(f"rebuilt {rows} shop_daily_stats rows in {time.perf_counter() - start:.1f}s")
+
+
+def archive_jobs(args):
+    from sqlalchemy import text
+
+    from app.db.session import engine
+    from app.services.archive_service import archive_jobs as archive, count_archivable
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            print(f"would archive {count_archivable(db, args.older_than_days)} jobs")
+            return
+        start = time.perf_counter()
+        result = archive(
+            db,
+            older_than_days=args.older_than_days,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+        )
+    finally:
+        db.close()
+    print(
+        f"archived {result.archived} jobs in {result.batches} batches in {time.perf_counter() - start:.1f}s, "
+        f"deleted {result.files_removed} processed files ({result.freed_bytes / 2**20:.1f} MB freed)"
+    )
+
+    if args.vacuum and result.archived and engine.dialect.name == "postgresql":
+        # Marks the deleted rows' space reusable and refreshes the planner
+        # statistics; VACUUM cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM (ANALYZE) print_jobs"))
+            connection.execute(text("VACUUM (ANALYZE) payments"))
+
+
+# Run by startup-profile in a fresh interpreter: import the app, then print
+# its startup phases after the lifespan handler and pool warm-up have run
+_PROFILE_SCRIPT = """
+import threading
+from app.main import app
+from app.core.startup import startup_timer
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    client.get("/health")
+    startup_timer.mark("first response")
+    warm_up = next((t for t in threading.enumerate() if t.name == "startup-warm-up"), None)
+    if warm_up is not None:
+        warm_up.join()
+print(startup_timer.report())
+"""
+
+
+def startup_profile(args):
+    from app.core.startup import cost_by_package, parse_importtime
+
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME="1", JOB_PROCESSING_ENABLED="false")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _PROFILE_SCRIPT],
+        env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    costs = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        print(result.stderr[-2000:], file=sys.stderr)
+        sys.exit(result.returncode)
+
+    print(f"interpreter start to exit: {elapsed * 1000:.0f}ms, {len(costs)} modules imported\n")
+    print(result.stdout.strip())
+
+    print(f"\n{'package':<32} {'self':>10}")
+    for package, self_us in list(cost_by_package(costs).items())[:args.top]:
+        print(f"{package:<32} {self_us / 1000:>8.1f}ms")
+
+    print(f"\n{'app module':<40} {'self':>10} {'cumulative':>12}")
+    app_costs = sorted((c for c in costs if c.module.startswith("app.")), key=lambda c: -c.cumulative_us)
+    for cost in app_costs[:args.top]:
+        print(f"{cost.module:<40} {cost.self_us / 1000:>8.1f}ms {cost.cumulative_us / 1000:>10.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gc = commands.add_parser("gc-blobs", help="delete stored files no job references")
+    gc.add_argument("--grace-seconds", type=int, default=None)
+    gc.add_argument("--dry-run", action="store_true")
+    gc.set_defaults(func=gc_blobs)
+
+    stats = commands.add_parser("rebuild-stats", help="recompute shop_daily_stats from jobs and payments")
+    stats.add_argument("--shop", type=UUID, default=None)
+    stats.set_defaults(func=rebuild_stats)
+
+    archive = commands.add_parser("archive-jobs", help="move finished jobs into print_jobs_archive")
+    archive.add_argument("--older-than-days", type=int, default=None)
+    archive.add_argument("--batch-size", type=int, default=None)
+    archive.add_argument("--max-batches", type=int, default=None)
+    archive.add_argument("--dry-run", action="store_true")
+    archive.add_argument("--vacuum", action="store_true", help="VACUUM (ANALYZE) the tables afterwards")
+    archive.set_defaults(func=archive_jobs)
+
+    profile = commands.add_parser("startup-profile", help="import times and startup phases of the API app")
+    profile.add_argument("--top", type=int, default=15)
+    profile.set_defaults(func=startup_profile)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 # app/core/config.py
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,6 +10,138 @@ class Settings(BaseSettings):
     SUPABASE_URL: str | None = None
     SUPABASE_ANON_KEY: str | None = None
 
+    # Serve the CRUD routes from an AsyncEngine instead of the threadpool.
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with the async driver swapped in.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Connection pool (applies to both engines). DB_PRE_PING is "always"
+    # (a round trip on every checkout), "idle" (only connections idle for
+    # DB_PRE_PING_IDLE_SECONDS or more) or "never". DB_PGBOUNCER switches to
+    # a connection per checkout for PgBouncer in transaction mode.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_PRE_PING_IDLE_SECONDS: float = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_PGBOUNCER: bool = False
+
+    # Optional read replica for read-only GET handlers (get_read_db). A client
+    # that just wrote reads from the primary for REPLICA_STICKY_SECONDS; the
+    # replica is skipped while unreachable or over REPLICA_MAX_LAG_SECONDS behind.
+    REPLICA_DATABASE_URL: str | None = None
+    REPLICA_STICKY_SECONDS: float = 5
+    REPLICA_MAX_LAG_SECONDS: float = 10
+    REPLICA_HEALTH_INTERVAL_SECONDS: float = 5
+
+    # Uploaded documents
+    UPLOAD_DIR: str = "uploads"
+    MAX_UPLOAD_BYTES: int = 512 * 1024 * 1024
+
+    # Content-addressed blob store for uploaded files
+    STORAGE_DIR: str = "uploads/blobs"
+    BLOB_GC_GRACE_SECONDS: int = 3600
+
+    # `python -m app.cli archive-jobs` moves COLLECTED/CANCELLED jobs that
+    # finished more than ARCHIVE_AFTER_DAYS ago into print_jobs_archive
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 5000
+
+    # Document preprocessing for ASSISTED/AUTO shops. A new job is claimed
+    # for JOB_CLAIM_SECONDS by the worker that created it; every
+    # JOB_RECOVER_INTERVAL_SECONDS each worker takes over jobs whose claim
+    # lapsed (their worker died, or processing failed), until a job has
+    # failed JOB_MAX_ATTEMPTS times
+    PROCESSED_DIR: str = "uploads/processed"
+    JOB_PROCESSING_ENABLED: bool = True
+    JOB_WORKERS: int = 2
+    JOB_MAX_PER_SHOP: int = 2
+    JOB_CLAIM_SECONDS: float = 900
+    JOB_RECOVER_INTERVAL_SECONDS: float = 60
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Compiled shop rate tables are cached per worker and reloaded once they
+    # are PRICING_RESYNC_SECONDS old, so a pricing change made through another
+    # worker is picked up within that time (0 only reloads on this worker's
+    # own writes: single-worker deployments only)
+    PRICING_RESYNC_SECONDS: float = 30
+
+    # In-process cache for the campus/shop catalog reads (0 TTL disables it)
+    CATALOG_CACHE_TTL_SECONDS: float = 60
+    CATALOG_CACHE_MAX_ENTRIES: int = 256
+
+    # List routes select only the response columns and encode rows straight
+    # to JSON with orjson instead of validating a response model per row
+    FAST_SERIALIZATION: bool = False
+
+    # Payment webhooks: HMAC-SHA256 secret for X-Signature (every webhook is
+    # rejected while unset, unless PAYMENT_WEBHOOK_ALLOW_UNSIGNED is turned on
+    # for local development) and the background applier that drains the
+    # payment_events inbox
+    PAYMENT_WEBHOOK_SECRET: str | None = None
+    PAYMENT_WEBHOOK_ALLOW_UNSIGNED: bool = False
+    PAYMENT_APPLIER_ENABLED: bool = True
+    PAYMENT_APPLIER_BATCH_SIZE: int = 500
+    PAYMENT_APPLIER_INTERVAL_SECONDS: float = 0.5
+
+    # Rate limiting: token buckets per client address and per shop (for
+    # /api/shops/{shop_id} routes). The "redis" backend shares the buckets
+    # between workers via RATE_LIMIT_REDIS_URL (needs the redis package);
+    # "memory" keeps them per process
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CLIENT_PER_SECOND: float = 20
+    RATE_LIMIT_CLIENT_BURST: int = 100
+    RATE_LIMIT_SHOP_PER_SECOND: float = 100
+    RATE_LIMIT_SHOP_BURST: int = 400
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    RATE_LIMIT_REDIS_URL: str | None = None
+
+    # Admission control: a new job for a shop with ADMISSION_MAX_BACKLOG
+    # UPLOADED + READY_TO_PRINT jobs waits up to ADMISSION_QUEUE_SECONDS for
+    # room, then gets 429 with Retry-After (0 turns the limit off)
+    ADMISSION_MAX_BACKLOG: int = 500
+    ADMISSION_QUEUE_SECONDS: float = 0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+    ADMISSION_RESYNC_SECONDS: float = 30
+
+    # Pickup codes: HMAC-signed tokens a student shows as a QR code once
+    # their job is PRINTED, checked at the counter without a database
+    # lookup. Disabled until PICKUP_CODE_SECRET is set; shared by all workers
+    PICKUP_CODE_SECRET: str | None = None
+    PICKUP_CODE_TTL_SECONDS: int = 14 * 24 * 3600
+    PICKUP_CODE_CACHE_MAX_ENTRIES: int = 2048
+
+    # AUTO-shop dispatch: printer setup costs and the longest a ready job
+    # may be passed over in favour of jobs needing no tray/mode switch
+    DISPATCH_TRAY_SWITCH_SECONDS: float = 30
+    DISPATCH_MODE_SWITCH_SECONDS: float = 10
+    DISPATCH_MAX_WAIT_SECONDS: float = 600
+
+    # GET /api/campuses/{campus_id}/shops/ranked: the in-memory index is
+    # reloaded from the database every RANKING_RESYNC_SECONDS, and each
+    # queued job is assumed to take RANKING_SECONDS_PER_QUEUED_JOB
+    RANKING_RESYNC_SECONDS: float = 60
+    RANKING_SECONDS_PER_QUEUED_JOB: float = 120
+
+    # Request instrumentation: Prometheus metrics at /metrics, a Server-Timing
+    # header, slow-query and N+1 warnings, and cProfile dumps of every Nth
+    # request (0 turns the profiler off)
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 200
+    N_PLUS_ONE_THRESHOLD: int = 10
+    PROFILE_EVERY_N_REQUESTS: int = 0
+    PROFILE_DIR: str = "profiles"
+
+    # Startup: the lifespan handler opens DB_WARM_CONNECTIONS pool
+    # connections in the background after the app is already serving.
+    # STARTUP_PROFILE logs how long each startup phase took (see
+    # `python -m app.cli startup-profile` for the import-time breakdown)
+    DB_WARM_CONNECTIONS: int = 2
+    STARTUP_PROFILE: bool = False
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,432 @@
+# app/core/metrics.py
+
+import asyncio
+import cProfile
+import functools
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.routing import request_response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Connection checkouts are normally well under a millisecond
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5, 1.0, 5.0, 30.0)
+UNMATCHED_ROUTE = "unmatched"
+STATEMENT_LOG_CHARS = 500
+
+
+@dataclass
+class RequestTimings:
+    """What one request spent, filled in by the engine hooks and middleware."""
+    start: float
+    db_seconds: float = 0.0
+    queries: int = 0
+    serialize_seconds: float = 0.0
+    handler_end: Optional[float] = None
+    statements: Counter = field(default_factory=Counter)
+    profiler: Optional[cProfile.Profile] = None
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record_serialization(seconds: float) -> None:
+    """For handlers that encode their own response body (see utils.serialization)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.serialize_seconds += seconds
+
+
+# ---------------------------
+# Registry / Prometheus text format
+# ---------------------------
+
+@dataclass
+class Histogram:
+    bounds: Tuple[float, ...] = DURATION_BUCKETS
+    buckets: List[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self):
+        if not self.buckets:
+            self.buckets = [0] * len(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+@dataclass
+class PoolStats:
+    """Checkout wait times for one connection pool (see app.db.pool)."""
+    wait: Histogram = field(default_factory=lambda: Histogram(POOL_WAIT_BUCKETS))
+    timeouts: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def observe_wait(self, seconds: float, timed_out: bool) -> None:
+        with self.lock:
+            self.wait.observe(seconds)
+            self.timeouts += timed_out
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """
+    Request and query metrics for GET /metrics. Routes are labelled by
+    their path template, so label cardinality stays bounded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.duration: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.db_seconds: Counter = Counter()
+        self.queries: Counter = Counter()
+        self.serialize_seconds: Counter = Counter()
+        self.n_plus_one: Counter = Counter()
+        self.db_queries_total = 0
+        self.db_seconds_total = 0.0
+        self.slow_queries = 0
+        self.pools: Dict[str, Tuple[object, PoolStats]] = {}
+
+    def register_pool(self, name: str, engine, stats: PoolStats) -> None:
+        """Publish `engine`'s pool gauges and checkout waits under pool=`name`."""
+        with self._lock:
+            self.pools[name] = (engine, stats)
+
+    def observe_request(self, method: str, route: str, status: int, total: float, timings: RequestTimings) -> None:
+        with self._lock:
+            self.requests[(method, route, status)] += 1
+            self.duration[(method, route)].observe(total)
+            self.db_seconds[(method, route)] += timings.db_seconds
+            self.queries[(method, route)] += timings.queries
+            self.serialize_seconds[(method, route)] += timings.serialize_seconds
+
+    def observe_query(self, seconds: float, slow: bool) -> None:
+        with self._lock:
+            self.db_queries_total += 1
+            self.db_seconds_total += seconds
+            self.slow_queries += slow
+
+    def observe_n_plus_one(self, method: str, route: str) -> None:
+        with self._lock:
+            self.n_plus_one[(method, route)] += 1
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("http_requests_total", "counter", "Requests by route template and status.")
+            for (method, route, status), n in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+            family("http_request_duration_seconds", "histogram", "Time to response headers.")
+            for (method, route), h in sorted(self.duration.items()):
+                _histogram_lines(lines, "http_request_duration_seconds", h, method=method, route=route)
+
+            for name, counter, help_text in (
+                ("http_request_db_seconds_total", self.db_seconds, "Time spent in SQL statements."),
+                ("http_request_db_queries_total", self.queries, "SQL statements executed."),
+                ("http_request_serialize_seconds_total", self.serialize_seconds,
+                 "Time spent validating and encoding response bodies."),
+                ("http_request_n_plus_one_total", self.n_plus_one,
+                 "Requests that repeated one statement N_PLUS_ONE_THRESHOLD times or more."),
+            ):
+                family(name, "counter", help_text)
+                for (method, route), value in sorted(counter.items()):
+                    lines.append(f"{name}{_labels(method=method, route=route)} {value}")
+
+            family("db_queries_total", "counter", "SQL statements, including background workers.")
+            lines.append(f"db_queries_total {self.db_queries_total}")
+            family("db_query_seconds_total", "counter", "Time in SQL statements, including background workers.")
+            lines.append(f"db_query_seconds_total {self.db_seconds_total}")
+            family("db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_MS.")
+            lines.append(f"db_slow_queries_total {self.slow_queries}")
+
+            pools = sorted(self.pools.items())
+
+        # Pool gauges are read live; each PoolStats has its own lock
+        for name, kind, help_text in (
+            ("db_pool_size", "gauge", "Connections the pool keeps open."),
+            ("db_pool_checked_out", "gauge", "Connections in use."),
+            ("db_pool_checked_in", "gauge", "Idle connections in the pool."),
+            ("db_pool_overflow", "gauge", "Connections open beyond the pool size."),
+        ):
+            family(name, kind, help_text)
+            for pool_name, (engine, _) in pools:
+                value = _pool_gauge(engine.pool, name)
+                if value is not None:
+                    lines.append(f"{name}{_labels(pool=pool_name)} {value}")
+
+        family("db_pool_wait_seconds", "histogram", "Time to get a connection from the pool.")
+        for pool_name, (_, stats) in pools:
+            with stats.lock:
+                _histogram_lines(lines, "db_pool_wait_seconds", stats.wait, pool=pool_name)
+        family("db_pool_timeouts_total", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT.")
+        for pool_name, (_, stats) in pools:
+            lines.append(f"db_pool_timeouts_total{_labels(pool=pool_name)} {stats.timeouts}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(lines: List[str], name: str, h: Histogram, **labels) -> None:
+    for bound, n in zip(h.bounds, h.buckets):
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {n}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {h.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {h.total}")
+    lines.append(f"{name}_count{_labels(**labels)} {h.count}")
+
+
+def _pool_gauge(pool, name: str) -> Optional[int]:
+    # NullPool (PgBouncer mode) keeps nothing open, so has no gauges
+    method = {
+        "db_pool_size": "size",
+        "db_pool_checked_out": "checkedout",
+        "db_pool_checked_in": "checkedin",
+        "db_pool_overflow": "overflow",
+    }[name]
+    getter = getattr(pool, method, None)
+    return getter() if getter is not None else None
+
+
+metrics = MetricsRegistry()
+
+
+# ---------------------------
+# Engine hooks
+# ---------------------------
+
+def instrument_engine(engine) -> None:
+    """Time every statement on `engine` and attribute it to the current request."""
+    slow_seconds = settings.SLOW_QUERY_MS / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        slow = elapsed >= slow_seconds
+        metrics.observe_query(elapsed, slow)
+        if slow:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement[:STATEMENT_LOG_CHARS])
+
+        timings = _current.get()
+        if timings is not None:
+            timings.db_seconds += elapsed
+            timings.queries += 1
+            timings.statements[statement] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # after_cursor_execute does not run for a failed statement
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+# ---------------------------
+# Middleware
+# ---------------------------
+
+# Requests inside MetricsMiddleware right now; only touched on the event loop
+_in_flight = 0
+# Whether a coroutine endpoint is being profiled on the event loop
+_loop_profiling = False
+
+
+def _timed_endpoint(call):
+    """
+    Wrap an endpoint so it marks where the handler returned (the time until
+    the response starts counts as serialization) and runs sampled requests
+    under their profiler.
+
+    A sync endpoint runs on a worker thread, which the profiler sees alone.
+    A coroutine endpoint shares the event loop with every other request, so
+    it is only profiled when its request is the only one in flight; requests
+    arriving while it awaits still show up in the sample.
+    """
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def endpoint(**values):
+            global _loop_profiling
+            timings = _current.get()
+            if timings is None:
+                return await call(**values)
+            profiler = timings.profiler
+            if profiler is not None and (_in_flight > 1 or _loop_profiling):
+                logger.debug("Not profiling a coroutine endpoint with other requests in flight")
+                profiler = None
+            try:
+                if profiler is None:
+                    return await call(**values)
+                _loop_profiling = True
+                profiler.enable()
+                try:
+                    return await call(**values)
+                finally:
+                    profiler.disable()
+                    _loop_profiling = False
+            finally:
+                timings.handler_end = time.perf_counter()
+    else:
+        @functools.wraps(call)
+        def endpoint(**values):
+            timings = _current.get()
+            if timings is None:
+                return call(**values)
+            try:
+                if timings.profiler is None:
+                    return call(**values)
+                timings.profiler.enable()
+                try:
+                    return call(**values)
+                finally:
+                    timings.profiler.disable()
+            finally:
+                timings.handler_end = time.perf_counter()
+    return endpoint
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that feeds handler timing and profiles to MetricsMiddleware
+    (see _timed_endpoint). Routers opt in with
+    APIRouter(route_class=TimedRoute); outside the middleware it only adds
+    a context variable lookup per request.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        # Swapped in after APIRoute has read the endpoint's signature, so
+        # dependencies and the response model come from the real function
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        self.app = request_response(self.get_route_handler())
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+class MetricsMiddleware:
+    """
+    Per-request timings: DB time and statement count (from the engine
+    hooks), serialization, handler and total time up to the response
+    headers. Recorded into `metrics`, sent as a Server-Timing header, and
+    checked for N+1 patterns. Every PROFILE_EVERY_N_REQUESTS-th request is
+    run under cProfile and dumped to PROFILE_DIR. Handler timing and
+    profiling need the route to be a TimedRoute.
+
+    A plain ASGI middleware, so streamed responses (SSE) pass through
+    untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests = 0
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(start=time.perf_counter())
+        self._requests += 1
+        every = settings.PROFILE_EVERY_N_REQUESTS
+        if every and self._requests % every == 0:
+            timings.profiler = cProfile.Profile()
+        token = _current.set(timings)
+        _in_flight += 1
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                header = self._finish(scope, message["status"], timings)
+                if header is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not started:
+                self._finish(scope, 500, timings)
+            raise
+        finally:
+            _in_flight -= 1
+            _current.reset(token)
+            if timings.profiler is not None and timings.profiler.getstats():
+                self._dump_profile(scope, timings.profiler)
+
+    def _finish(self, scope, status: int, timings: RequestTimings) -> Optional[bytes]:
+        now = time.perf_counter()
+        total = now - timings.start
+        if timings.handler_end is not None:
+            timings.serialize_seconds += now - timings.handler_end
+        method = scope["method"]
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+        metrics.observe_request(method, route, status, total, timings)
+        if timings.statements:
+            statement, repeats = timings.statements.most_common(1)[0]
+            if repeats >= settings.N_PLUS_ONE_THRESHOLD:
+                metrics.observe_n_plus_one(method, route)
+                logger.warning(
+                    "Possible N+1 in %s %s: statement ran %d times: %s",
+                    method, route, repeats, statement[:STATEMENT_LOG_CHARS],
+                )
+
+        if not settings.SERVER_TIMING_ENABLED:
+            return None
+        app_seconds = max(0.0, total - timings.db_seconds - timings.serialize_seconds)
+        return (
+            f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries", '
+            f"serialize;dur={timings.serialize_seconds * 1000:.1f}, "
+            f"app;dur={app_seconds * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        ).encode()
+
+    @staticmethod
+    def _dump_profile(scope, profiler: cProfile.Profile) -> None:
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(
+            settings.PROFILE_DIR,
+            f"{int(time.time() * 1000)}-{scope['method']}-{_slug(route)}.prof",
+        )
+        profiler.dump_stats(path)
+        logger.info("Profiled %s %s -> %s", scope["method"], route, path)
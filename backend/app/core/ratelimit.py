@@ -0,0 +1,189 @@
+# app/core/ratelimit.py
+
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Never limited: probes and scrapes must keep working under load
+EXEMPT_PREFIXES = ("/health", "/metrics")
+
+_SHOP_PATH_RE = re.compile(r"^/api/shops/([0-9a-fA-F-]{36})(?:/|$)")
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    # Tokens added per second and the most a bucket holds
+    rate: float
+    burst: int
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in this process. Buckets that have refilled completely
+    are the same as missing ones, so once `max_keys` is reached they are
+    swept out; if none are, the oldest buckets are dropped.
+
+    Only used from the event loop (RateLimitMiddleware), so no locking.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, rate, burst]
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        return self.take_now(key, limit, time.monotonic())
+
+    def take_now(self, key: str, limit: BucketLimit, now: float) -> float:
+        """Take a token: 0.0 if there was one, else seconds until there will be."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._sweep(now)
+            self._buckets[key] = [limit.burst - 1, now, limit.rate, limit.burst]
+            return 0.0
+        tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / limit.rate
+
+    def _sweep(self, now: float) -> None:
+        full = [
+            key for key, (tokens, updated_at, rate, burst) in self._buckets.items()
+            if tokens + (now - updated_at) * rate >= burst
+        ]
+        for key in full:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            for key in list(self._buckets)[:max(1, self.max_keys // 10)]:
+                del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# The same bucket as MemoryBucketStore.take_now, atomically in Redis and on
+# the Redis clock so every worker shares it. Returns the wait as a string
+# (Lua numbers come back truncated to integers).
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or burst
+local at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared by every worker through Redis (needs the redis
+    package). MemoryBucketStore is the local stand-in with the same
+    interface. Fails open: while Redis is unreachable requests are let
+    through rather than rejected.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio
+
+        self.prefix = prefix
+        self._redis = redis.asyncio.from_url(url)
+        self._take = self._redis.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        try:
+            return float(await self._take(keys=[self.prefix + key], args=[limit.rate, limit.burst]))
+        except Exception as e:
+            logger.warning("Rate limit store unavailable (%s); not limiting", e)
+            return 0.0
+
+
+def bucket_store():
+    """The RATE_LIMIT_BACKEND store."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise ValueError("RATE_LIMIT_BACKEND is redis but RATE_LIMIT_REDIS_URL is not set")
+        return RedisBucketStore(settings.RATE_LIMIT_REDIS_URL)
+    return MemoryBucketStore()
+
+
+def client_key(scope) -> str:
+    """
+    The connection's address. Request headers are set by the caller and
+    nothing verifies them, so they cannot pick the bucket; behind a proxy
+    run uvicorn with --proxy-headers so this is the real client.
+    """
+    client = scope.get("client")
+    return "addr:" + (client[0] if client else "unknown")
+
+
+def shop_key(scope) -> Optional[str]:
+    """The shop of an /api/shops/{shop_id}/... route, from the path only."""
+    match = _SHOP_PATH_RE.match(scope["path"])
+    return "shop:" + match[1].lower() if match else None
+
+
+class RateLimitMiddleware:
+    """
+    Token buckets per client (see client_key) and per shop (see shop_key).
+    A request takes a token from each of its buckets and gets 429 with
+    Retry-After if either is empty. Job creation sends its shop in the body,
+    which this does not read; there the per-shop protection is admission
+    control (app.services.admission_service).
+    """
+
+    def __init__(self, app, store, client_limit: BucketLimit, shop_limit: BucketLimit):
+        self.app = app
+        self.store = store
+        self.client_limit = client_limit
+        self.shop_limit = shop_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self.store.take(client_key(scope), self.client_limit)
+        if not wait:
+            shop = shop_key(scope)
+            if shop is not None:
+                wait = await self.store.take(shop, self.shop_limit)
+        if wait:
+            await _too_many_requests(send, wait)
+            return
+        await self.app(scope, receive, send)
+
+
+async def _too_many_requests(send, wait: float) -> None:
+    body = b'{"detail":"Too many requests"}'
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,95 @@
+# app/core/startup.py
+"""
+Startup phase timings.
+
+app.main marks the end of each startup phase on `startup_timer` (imports,
+middleware, routers, lifespan) and times the background pool warm-up;
+with STARTUP_PROFILE set the lifespan handler prints the report.
+`python -m app.cli startup-profile` runs the import in a fresh interpreter
+under -X importtime and prints the slowest modules next to these phases.
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class Phase:
+    name: str
+    # Seconds since the timer was created
+    start: float
+    seconds: float
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last_mark = self.started
+        self._phases: List[Phase] = []
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> None:
+        """End the phase `name`, which started at the previous mark."""
+        now = time.perf_counter()
+        with self._lock:
+            self._phases.append(Phase(name, self._last_mark - self.started, now - self._last_mark))
+            self._last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block that may overlap the marked phases, e.g. in a thread."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._phases.append(Phase(name, start - self.started, end - start))
+
+    def phases(self) -> List[Phase]:
+        with self._lock:
+            return sorted(self._phases, key=lambda phase: phase.start)
+
+    def report(self) -> str:
+        lines = [f"{'phase':<24} {'start':>10} {'took':>10}"]
+        for phase in self.phases():
+            lines.append(f"{phase.name:<24} {phase.start * 1000:>8.1f}ms {phase.seconds * 1000:>8.1f}ms")
+        return "\n".join(lines)
+
+
+startup_timer = StartupTimer()
+
+
+# ---------------------------
+# -X importtime output
+# ---------------------------
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+
+@dataclass(frozen=True)
+class ImportCost:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportCost]:
+    """Module import costs from the stderr of `python -X importtime`."""
+    return [
+        ImportCost(match[3], int(match[1]), int(match[2]))
+        for match in _IMPORTTIME_LINE.finditer(output)
+    ]
+
+
+def cost_by_package(costs: List[ImportCost]) -> Dict[str, int]:
+    """Self time summed per top-level package, in microseconds, largest first."""
+    totals: Dict[str, int] = {}
+    for cost in costs:
+        package = cost.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + cost.self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
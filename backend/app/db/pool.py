@@ -0,0 +1,159 @@
+# app/db/pool.py
+
+import time
+from typing import Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import PoolStats
+
+PRE_PING_ALWAYS = "always"
+PRE_PING_IDLE = "idle"
+
+
+def instrumented_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Subclass of `base` that records how long each checkout waited (queueing
+    for a free connection or opening a new one) into `stats`. Pool.recreate()
+    builds the same class, so the stats survive engine.dispose().
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                timed_out = True
+                raise
+            finally:
+                stats.observe_wait(time.perf_counter() - start, timed_out)
+
+    InstrumentedPool.__name__ = InstrumentedPool.__qualname__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def engine_options(url: str, stats: PoolStats, is_async: bool = False) -> Dict:
+    """
+    create_engine / create_async_engine keyword arguments from the DB_POOL_*
+    / DB_* settings.
+
+    DB_PGBOUNCER opens a connection per checkout (NullPool), leaving pooling
+    to PgBouncer in transaction mode, and stops asyncpg from caching
+    prepared statements, which would not survive a change of server
+    connection. The statement timeout is then set per transaction, since
+    session settings would leak to other clients of the server connection.
+    """
+    options: Dict = {}
+    connect_args: Dict = {}
+    is_sqlite = url.startswith("sqlite")
+
+    if settings.DB_PGBOUNCER:
+        options["poolclass"] = instrumented_pool_class(NullPool, stats)
+        if is_async and not is_sqlite:
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    elif is_async and is_sqlite:
+        # aiosqlite runs on a NullPool, which rejects the sizing arguments
+        options["poolclass"] = instrumented_pool_class(NullPool, stats)
+    else:
+        options["poolclass"] = instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, stats)
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    options["pool_pre_ping"] = settings.DB_PRE_PING == PRE_PING_ALWAYS
+
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout_ms and not is_sqlite and not settings.DB_PGBOUNCER:
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def install_pool_events(engine) -> None:
+    """Connection checks that create_engine has no option for (see engine_options)."""
+    if settings.DB_PRE_PING == PRE_PING_IDLE and not settings.DB_PGBOUNCER:
+        _ping_idle_connections(engine, settings.DB_PRE_PING_IDLE_SECONDS)
+
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout_ms and settings.DB_PGBOUNCER and engine.dialect.name == "postgresql":
+        @event.listens_for(engine, "begin")
+        def _statement_timeout(conn):
+            # Runs before SQLAlchemy's first statement and inside the same
+            # (driver-started) transaction; the Connection itself cannot be
+            # used here because it is still beginning
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            finally:
+                cursor.close()
+
+
+def _ping_idle_connections(engine, idle_seconds: float) -> None:
+    """
+    Pre-ping only connections that sat in the pool for `idle_seconds` or
+    more: those are the ones a server or firewall timeout may have closed,
+    and a busy pool skips the extra round trip entirely.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, record, proxy):
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool discards this connection and checks out another
+            raise exc.DisconnectionError(f"Idle connection failed pre-ping: {e}") from e
+
+
+def warm_connections(connections: int) -> int:
+    """
+    How many connections to open ahead of the first requests: at most
+    DB_POOL_SIZE, since overflow connections are closed on checkin, and one
+    (just a connectivity check) when PgBouncer does the pooling.
+    """
+    if settings.DB_PGBOUNCER:
+        return 1
+    return max(1, min(connections, settings.DB_POOL_SIZE))
+
+
+def warm_pool(engine, connections: int) -> int:
+    """Open `connections` connections at once and return them to the pool."""
+    opened = []
+    try:
+        for _ in range(warm_connections(connections)):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+async def warm_async_pool(engine, connections: int) -> int:
+    """warm_pool for an AsyncEngine."""
+    opened = []
+    try:
+        for _ in range(warm_connections(connections)):
+            opened.append(await engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
@@ -0,0 +1,134 @@
+# app/db/replica.py
+
+import logging
+import threading
+import time
+from http.cookies import CookieError, SimpleCookie
+from typing import Optional
+
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+# Set on responses to writes; while it is valid the client reads from the primary
+STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Seconds the standby is behind; 0 when it has replayed everything it received
+# (an idle primary would otherwise look like growing lag)
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+class ReplicaHealth:
+    """
+    Cached view of whether the replica can serve reads: reachable and no
+    more than `max_lag_seconds` behind. Probed at most once per
+    `interval_seconds`, by whichever request asks first; a dropped
+    connection marks it unhealthy straight away.
+    """
+
+    def __init__(self, engine, interval_seconds: float, max_lag_seconds: float):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._healthy = True
+        self._lag: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        @event.listens_for(engine, "handle_error")
+        def _on_error(context):
+            if context.is_disconnect:
+                self.mark_unhealthy("connection lost")
+
+    def healthy(self) -> bool:
+        if time.monotonic() < self._next_check:
+            return self._healthy
+        # Someone else is probing; go with the last answer meanwhile
+        if not self._lock.acquire(blocking=False):
+            return self._healthy
+        try:
+            self._healthy = self._probe()
+            self._next_check = time.monotonic() + self.interval_seconds
+        finally:
+            self._lock.release()
+        return self._healthy
+
+    def mark_unhealthy(self, reason: str) -> None:
+        if self._healthy:
+            logger.warning("Read replica unhealthy (%s); reading from the primary", reason)
+        self._healthy = False
+        self._next_check = time.monotonic() + self.interval_seconds
+
+    def status(self) -> dict:
+        return {"healthy": self._healthy, "lag_seconds": self._lag}
+
+    def _probe(self) -> bool:
+        lag_sql = POSTGRES_LAG_SQL if self.engine.dialect.name == "postgresql" else "SELECT 0"
+        try:
+            with self.engine.connect() as connection:
+                self._lag = float(connection.execute(text(lag_sql)).scalar() or 0)
+        except Exception as e:
+            self._lag = None
+            self.mark_unhealthy(f"probe failed: {e}")
+            return False
+        if self._lag > self.max_lag_seconds:
+            self.mark_unhealthy(f"{self._lag:.1f}s behind")
+            return False
+        if not self._healthy:
+            logger.info("Read replica healthy again")
+        return True
+
+
+def is_sticky(cookie_header: Optional[str], sticky_seconds: float) -> bool:
+    """
+    True while the client's last write is recent enough that it must read
+    from the primary. The cookie is the client's to edit, so a time further
+    out than a fresh write would set (`sticky_seconds`) is ignored: a
+    hand-made cookie pins no more reads than a write would.
+    """
+    if not cookie_header:
+        return False
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header)
+        until = float(cookie[STICKY_COOKIE].value)
+    except (CookieError, KeyError, ValueError):
+        return False
+    now = time.time()
+    return now < until <= now + sticky_seconds
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Gives read-your-writes across the primary/replica split: a successful
+    non-GET response sets STICKY_COOKIE for `sticky_seconds`, and
+    get_read_db sends that client's reads to the primary until it expires.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.sticky_seconds
+                cookie = (
+                    f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(self.sticky_seconds) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
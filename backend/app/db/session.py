@@ -1,18 +1,65 @@
 # app/db/session.py
 
+import threading
+from typing import Callable, Dict
+
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
+from app.core.metrics import PoolStats, instrument_engine, metrics
+from app.db.pool import engine_options, install_pool_events
+from app.db.replica import ReplicaHealth, is_sticky
+
+
+# ---------------------------
+# Lazily created engines
+# ---------------------------
+
+# Engines (and the replica health probe) are built on first use, not at
+# import, so the app can start serving before the driver and pool are set
+# up. `engine`, `replica_engine`, `replica_health`, `async_engine` and
+# friends are still importable from this module; see __getattr__ below.
+
+_resources: Dict[str, object] = {}
+_resources_lock = threading.RLock()
+
+
+def _lazy(name: str, build: Callable[[], object]):
+    resource = _resources.get(name)
+    if resource is None:
+        with _resources_lock:
+            resource = _resources.get(name)
+            if resource is None:
+                resource = _resources[name] = build()
+    return resource
+
+
+def _create_engine(url: str, pool_name: str):
+    stats = PoolStats()
+    engine = create_engine(url, **engine_options(url, stats))
+    install_pool_events(engine)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+        metrics.register_pool(pool_name, engine, stats)
+    return engine
+
+
+def get_engine():
+    return _lazy("engine", lambda: _create_engine(settings.DATABASE_URL, "sync"))
+
+
+class _PrimarySession(Session):
+    """Session bound to the primary engine, which it creates if need be."""
+
+    def get_bind(self, mapper=None, **kw):
+        return get_engine()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-)
 
 SessionLocal = sessionmaker(
-    bind=engine,
+    class_=_PrimarySession,
     autoflush=False,
     autocommit=False
 )
@@ -24,5 +71,189 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()# -*- coding: utf-8 -*-
+        db.close()
+
+
+# ---------------------------
+# Read replica (settings.REPLICA_DATABASE_URL)
+# ---------------------------
+
+def get_replica_engine():
+    if not settings.REPLICA_DATABASE_URL:
+        return None
+    return _lazy("replica_engine", lambda: _create_engine(settings.REPLICA_DATABASE_URL, "replica"))
+
+
+def get_replica_health():
+    if not settings.REPLICA_DATABASE_URL:
+        return None
+    return _lazy("replica_health", lambda: ReplicaHealth(
+        get_replica_engine(),
+        interval_seconds=settings.REPLICA_HEALTH_INTERVAL_SECONDS,
+        max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    ))
+
+
+class _ReplicaSession(Session):
+    def get_bind(self, mapper=None, **kw):
+        return get_replica_engine()
+
+
+# Only handed out when reads_from_replica() says a replica is configured
+ReplicaSessionLocal = sessionmaker(
+    class_=_ReplicaSession,
+    autoflush=False,
+    autocommit=False
+)
+
+
+def reads_from_replica(request: Request) -> bool:
+    """
+    Whether a read-only request can go to the replica: one is configured
+    and healthy, and the client has not written within the stickiness
+    window (see app.db.replica). May probe the replica, so call it off the
+    event loop.
+    """
+    replica_health = get_replica_health()
+    return (
+        replica_health is not None
+        and not is_sticky(request.headers.get("cookie"), settings.REPLICA_STICKY_SECONDS)
+        and replica_health.healthy()
+    )
+
+
+# Dependency for read-only handlers
+def get_read_db(request: Request):
+    factory = ReplicaSessionLocal if reads_from_replica(request) else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dialect_insert(dialect, table):
+    """
+    INSERT construct with ON CONFLICT support (on_conflict_do_nothing /
+    on_conflict_do_update) for `dialect`. SQLite is only used in local runs.
+    """
+    if dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+
+# ---------------------------
+# Async engine (settings.DB_ASYNC)
+# ---------------------------
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url_for(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return async_url_for(settings.DATABASE_URL)
+
+
+def _create_async_engine(url: str, pool_name: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    stats = PoolStats()
+    engine = create_async_engine(url, **engine_options(url, stats, is_async=True))
+    install_pool_events(engine.sync_engine)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine.sync_engine)
+        metrics.register_pool(pool_name, engine.sync_engine, stats)
+    return engine
+
+
+def get_async_engine():
+    if not settings.DB_ASYNC:
+        return None
+    return _lazy("async_engine", lambda: _create_async_engine(async_database_url(), "async"))
+
+
+def get_async_replica_engine():
+    if not (settings.DB_ASYNC and settings.REPLICA_DATABASE_URL):
+        return None
+    return _lazy("async_replica_engine", lambda: _create_async_engine(
+        async_url_for(settings.REPLICA_DATABASE_URL), "async_replica"
+    ))
+
+
+class _AsyncPrimarySession(Session):
+    # AsyncSession runs its sync session on the async engine's sync facade
+    def get_bind(self, mapper=None, **kw):
+        return get_async_engine().sync_engine
+
+
+class _AsyncReplicaSession(Session):
+    def get_bind(self, mapper=None, **kw):
+        return get_async_replica_engine().sync_engine
+
+
+def _async_sessionmaker(name: str, session_class):
+    def build():
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        return async_sessionmaker(
+            sync_session_class=session_class,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _lazy(name, build)
+
+
+def get_async_sessionmaker():
+    if not settings.DB_ASYNC:
+        return None
+    return _async_sessionmaker("AsyncSessionLocal", _AsyncPrimarySession)
+
+
+def get_async_replica_sessionmaker():
+    if get_async_replica_engine() is None:
+        return None
+    return _async_sessionmaker("AsyncReplicaSessionLocal", _AsyncReplicaSession)
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    # Health is probed through the sync replica engine, off the event loop
+    use_replica = get_replica_health() is not None and await run_in_threadpool(reads_from_replica, request)
+    factory = get_async_replica_sessionmaker() if use_replica else get_async_sessionmaker()
+    async with factory() as db:
+        yield db
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "replica_engine": get_replica_engine,
+    "replica_health": get_replica_health,
+    "async_engine": get_async_engine,
+    "async_replica_engine": get_async_replica_engine,
+    "AsyncSessionLocal": get_async_sessionmaker,
+    "AsyncReplicaSessionLocal": get_async_replica_sessionmaker,
+}
+
 
+def __getattr__(name: str):
+    # `from app.db.session import engine` builds the engine at that point
+    factory = _LAZY_ATTRIBUTES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
@@ -1,17 +1,117 @@
 # app/main.py
 
-from fastapi import FastAPI
+# Imported first so the "imports" phase covers everything below
+from app.core.startup import startup_timer
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings
-from app.api.routes import auth, users, shops, jobs, payments, campuses
-from app.db.session import engine
+from app.core.metrics import MetricsMiddleware, TimedRoute, metrics
+from app.core.ratelimit import BucketLimit, RateLimitMiddleware, bucket_store
+from app.api.routes import auth, users, shops, jobs, payments, campuses, pricing, files
+from app.db.pool import warm_async_pool, warm_pool
+from app.db.replica import ReplicaStickinessMiddleware
+from app.db.session import SessionLocal, get_async_engine, get_engine, get_replica_health
+from app.services.cache_service import catalog_cache
+from app.services.job_service import job_processor
+from app.services.payment_service import payment_applier
+from app.services.pickup_service import pickup_codes
+
+startup_timer.mark("imports")
+
+
+# ---------------------------
+# Lifespan
+# ---------------------------
+
+def warm_up(app: FastAPI) -> None:
+    """
+    Open the first pool connections and re-queue unprocessed jobs. Runs in
+    a thread once the app is serving, so neither delays the first request;
+    a request that beats it just opens its own connection.
+    """
+    with startup_timer.phase("pool warm-up"):
+        try:
+            opened = warm_pool(get_engine(), settings.DB_WARM_CONNECTIONS)
+            app.state.warm_up = "ok"
+            print(f"✅ Database connected successfully ({opened} connections warmed)")
+        except Exception as e:
+            app.state.warm_up = "failed"
+            print("❌ Database connection failed:", e)
+
+    if settings.JOB_PROCESSING_ENABLED:
+        with startup_timer.phase("re-queue jobs"):
+            db = SessionLocal()
+            try:
+                print(f"Re-queued {job_processor.recover(db)} unprocessed jobs")
+            except Exception as e:
+                print("❌ Could not re-queue unprocessed jobs:", e)
+            finally:
+                db.close()
+
+    if settings.STARTUP_PROFILE:
+        print(startup_timer.report())
+
+
+async def warm_up_async_pool() -> None:
+    with startup_timer.phase("async pool warm-up"):
+        try:
+            await warm_async_pool(get_async_engine(), settings.DB_WARM_CONNECTIONS)
+        except Exception as e:
+            print("❌ Async database connection failed:", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.warm_up = "pending"
+    if settings.JOB_PROCESSING_ENABLED:
+        job_processor.start()
+    if settings.PAYMENT_APPLIER_ENABLED:
+        payment_applier.start()
+    if not settings.PAYMENT_WEBHOOK_SECRET:
+        if settings.PAYMENT_WEBHOOK_ALLOW_UNSIGNED:
+            print("⚠️ PAYMENT_WEBHOOK_SECRET is not set: accepting UNSIGNED payment webhooks")
+        else:
+            print("⚠️ PAYMENT_WEBHOOK_SECRET is not set: every payment webhook will be rejected")
+
+    threading.Thread(target=warm_up, args=(app,), name="startup-warm-up", daemon=True).start()
+    async_warm_up = asyncio.create_task(warm_up_async_pool()) if settings.DB_ASYNC else None
+    startup_timer.mark("lifespan")
+
+    yield
+
+    if async_warm_up is not None:
+        async_warm_up.cancel()
+    job_processor.shutdown()
+    payment_applier.shutdown()
 
 
 app = FastAPI(
     title="Campus Print Platform API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
+# Routes declared on the app itself (health, metrics); routers set their own
+app.router.route_class = TimedRoute
+
+# ---------------------------
+# Rate Limiting
+# ---------------------------
+
+# Added before CORS so that CORS wraps it and 429s carry the CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=bucket_store(),
+        client_limit=BucketLimit(settings.RATE_LIMIT_CLIENT_PER_SECOND, settings.RATE_LIMIT_CLIENT_BURST),
+        shop_limit=BucketLimit(settings.RATE_LIMIT_SHOP_PER_SECOND, settings.RATE_LIMIT_SHOP_BURST),
+    )
 
 # ---------------------------
 # CORS Configuration
@@ -26,8 +126,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Marks clients that just wrote so get_read_db keeps them on the primary
+if settings.REPLICA_DATABASE_URL:
+    app.add_middleware(ReplicaStickinessMiddleware, sticky_seconds=settings.REPLICA_STICKY_SECONDS)
+
+# Added last so it wraps CORS and times the whole request
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+startup_timer.mark("middleware")
+
 
 # ---------------------------
 # Health Check
@@ -38,6 +149,47 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/cache")
+def cache_stats():
+    return {"catalog": catalog_cache.stats(), "pickup_codes": pickup_codes.stats()}
+
+
+@app.get("/health/db")
+def db_health(request: Request):
+    replica_health = get_replica_health()
+    return {
+        "warm_up": getattr(request.app.state, "warm_up", None),
+        "replica": replica_health.status() if replica_health else None,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ---------------------------
+# Async Routes (settings.DB_ASYNC)
+# ---------------------------
+
+# Registered before the sync routers so that paths defined in both are served
+# by the async handler; everything else falls through to the sync routers.
+if settings.DB_ASYNC:
+    from app.api.async_routes import (
+        users as async_users,
+        shops as async_shops,
+        jobs as async_jobs,
+        payments as async_payments,
+        campuses as async_campuses,
+    )
+
+    app.include_router(async_users.router, prefix="/api/users", tags=["Users"])
+    app.include_router(async_campuses.router, prefix="/api/campuses", tags=["Campuses"])
+    app.include_router(async_shops.router, prefix="/api/shops", tags=["Shops"])
+    app.include_router(async_jobs.router, prefix="/api/jobs", tags=["Jobs"])
+    app.include_router(async_payments.router, prefix="/api/payments", tags=["Payments"])
+
+
 # ---------------------------
 # Include API Routes
 # ---------------------------
@@ -48,16 +200,8 @@ app.include_router(campuses.router, prefix="/api/campuses", tags=["Campuses"])
 app.include_router(shops.router, prefix="/api/shops", tags=["Shops"])
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 app.include_router(payments.router, prefix="/api/payments", tags=["Payments"])
+app.include_router(pricing.router, prefix="/api/pricing", tags=["Pricing"])
+app.include_router(files.router, prefix="/api/files", tags=["Files"])
 
 
-# ---------------------------
-# Startup Event (Optional DB Check)
-# ---------------------------
-
-@app.on_event("startup")
-def startup_event():
-    try:
-        with engine.connect() as connection:
-            print("✅ Database connected successfully")
-    except Exception as e:
-        print("❌ Database connection failed:", e)
\ No newline at end of file
+startup_timer.mark("routers")
\ No newline at end of file
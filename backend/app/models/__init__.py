@@ -1,6 +1,7 @@
 from .campus import Campus
 from .user import User
 from .shop import Shop
-from .pricing import ShopPricing
-from .job import PrintJob
-from .payment import Payment
\ No newline at end of file
+from .pricing import PricingVersion, ShopPricing
+from .job import ArchivedPrintJob, PrintJob
+from .payment import Payment, PaymentEvent
+from .stats import ShopDailyStats
\ No newline at end of file
@@ -1,5 +1,6 @@
 import uuid
 from sqlalchemy import (
+    BigInteger,
     Integer,
     Float,
     Enum,
@@ -56,6 +57,22 @@ class PrintJob(Base):
     file_url: Mapped[str] = mapped_column(String, nullable=False)
     original_filename: Mapped[str] = mapped_column(String, nullable=False)
 
+    # SHA-256 of the stored blob; blobs are reference-counted by this column
+    file_hash: Mapped[str] = mapped_column(String(64), nullable=True, index=True)
+
+    # Print-ready output of preprocessing (ASSISTED/AUTO shops)
+    print_file_url: Mapped[str] = mapped_column(String, nullable=True)
+
+    # Preprocessing lease: the worker that set it owns the job until then
+    # (see job_service.JobProcessor.recover); failed runs are counted
+    processing_claimed_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    processing_attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0"
+    )
+
     pages: Mapped[int] = mapped_column(Integer, nullable=False)
     copies: Mapped[int] = mapped_column(Integer, nullable=False)
 
@@ -71,9 +88,20 @@ class PrintJob(Base):
 
     final_price: Mapped[float] = mapped_column(Float, nullable=False)
 
+    # The rates the job was priced at; pricing_service.job_snapshot gives
+    # the full snapshot back
+    pricing_version_id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"),
+        ForeignKey("pricing_versions.id"),
+        nullable=True
+    )
+
+    # Only set for jobs from before pricing_versions whose snapshot did not
+    # convert; not loaded unless accessed
     pricing_snapshot: Mapped[dict] = mapped_column(
         JSON,
-        nullable=False
+        nullable=True,
+        deferred=True
     )
 
     execution_mode_snapshot: Mapped[ExecutionMode] = mapped_column(
@@ -86,10 +114,13 @@ class PrintJob(Base):
         nullable=False
     )
 
+    # active_history: the previous status is needed by the rollup hook
+    # (app.services.stats_service) even when the attribute was expired
     status: Mapped[PrintStatus] = mapped_column(
         Enum(PrintStatus),
         nullable=False,
-        index=True
+        index=True,
+        active_history=True
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -108,8 +139,87 @@ class PrintJob(Base):
     shop = relationship("Shop", back_populates="jobs")
     user = relationship("User", back_populates="jobs")
     payment = relationship("Payment", back_populates="job", uselist=False)
+    pricing_version = relationship("PricingVersion")
 
 
 # Index optimization
-Index("ix_print_jobs_shop_status", PrintJob.shop_id, PrintJob.status)# -*- coding: utf-8 -*-
+# Shop queue reads filter on (shop_id, status) and page on (created_at, id),
+# so both indexes carry the keyset columns to avoid a sort.
+Index(
+    "ix_print_jobs_shop_status_created",
+    PrintJob.shop_id,
+    PrintJob.status,
+    PrintJob.created_at,
+    PrintJob.id
+)
+Index("ix_print_jobs_shop_created", PrintJob.shop_id, PrintJob.created_at, PrintJob.id)
+
+
+class ArchivedPrintJob(Base):
+    """
+    A COLLECTED/CANCELLED job moved out of print_jobs by
+    `python -m app.cli archive-jobs` (app.services.archive_service), so
+    that finished history stops weighing on the queue indexes.
+
+    The row is compact: the uploaded/processed file references are dropped
+    (the blobs become garbage for gc-blobs), the job's payment is folded in,
+    and the pricing snapshot keeps only the rates it was quoted at; the
+    rest is derived again by archive_service.expand_snapshot. Snapshots
+    that do not fit that shape are kept whole in `pricing_extra`.
+    """
+    __tablename__ = "print_jobs_archive"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+
+    campus_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("campuses.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    shop_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("shops.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    original_filename: Mapped[str] = mapped_column(String, nullable=False)
+
+    pages: Mapped[int] = mapped_column(Integer, nullable=False)
+    copies: Mapped[int] = mapped_column(Integer, nullable=False)
+    size: Mapped[PaperSize] = mapped_column(Enum(PaperSize), nullable=False)
+    color_mode: Mapped[ColorMode] = mapped_column(Enum(ColorMode), nullable=False)
+    final_price: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # Compact pricing_snapshot
+    normal_rate: Mapped[float] = mapped_column(Float, nullable=True)
+    bulk_rate: Mapped[float] = mapped_column(Float, nullable=True)
+    bulk_threshold: Mapped[int] = mapped_column(Integer, nullable=True)
+    pricing_extra: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+    execution_mode_snapshot: Mapped[ExecutionMode] = mapped_column(Enum(ExecutionMode), nullable=False)
+    payment_mode_snapshot: Mapped[PaymentMode] = mapped_column(Enum(PaymentMode), nullable=False)
+    status: Mapped[PrintStatus] = mapped_column(Enum(PrintStatus), nullable=False)
+
+    # The job's Payment row, if it had one
+    payment_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=True)
+    payment_amount: Mapped[float] = mapped_column(Float, nullable=True)
+    payment_status: Mapped[str] = mapped_column(String, nullable=True)
+    payment_reference: Mapped[str] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # When the job reached its final status
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+# Per-shop history and stats rebuilds read by (shop_id, created_at)
+Index("ix_print_jobs_archive_shop_created", ArchivedPrintJob.shop_id, ArchivedPrintJob.created_at)# -*- coding: utf-8 -*-
 
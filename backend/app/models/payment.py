@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Float, String, DateTime, Enum, ForeignKey
+from sqlalchemy import BigInteger, Float, Integer, String, DateTime, Enum, ForeignKey, JSON, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
@@ -40,5 +40,51 @@ class Payment(Base):
         default=datetime.utcnow
     )
 
-    job = relationship("PrintJob", back_populates="payment")# -*- coding: utf-8 -*-
+    job = relationship("PrintJob", back_populates="payment")
+
+
+class PaymentEvent(Base):
+    """
+    Append-only inbox of gateway webhook deliveries. The unique
+    gateway_event_id makes retried deliveries no-ops; rows are applied to
+    Payment/PrintJob later by app.services.payment_service.PaymentApplier.
+    """
+    __tablename__ = "payment_events"
+    __table_args__ = (
+        # Scan order for the applier; only unprocessed rows are indexed
+        Index(
+            "ix_payment_events_pending",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True
+    )
+
+    gateway_event_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    # Not a foreign key: the inbox accepts events for unknown jobs and the
+    # applier reports them
+    job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+
+    gateway_reference: Mapped[str] = mapped_column(String, nullable=True)
+
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow
+    )
+
+    processed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    error: Mapped[str] = mapped_column(String, nullable=True)# -*- coding: utf-8 -*-
 
@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Float, Integer, Enum, ForeignKey
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Float, Integer, Enum, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -37,5 +38,34 @@ class ShopPricing(Base):
     bulk_rate: Mapped[float] = mapped_column(Float, nullable=False)
     bulk_threshold: Mapped[int] = mapped_column(Integer, nullable=False)
 
-    shop = relationship("Shop", back_populates="pricing")# -*- coding: utf-8 -*-
+    shop = relationship("Shop", back_populates="pricing")
+
+
+class PricingVersion(Base):
+    """
+    The rates a job was priced at. Hash-consed: there is one immutable row
+    per distinct (normal_rate, bulk_rate, bulk_threshold), shared by every
+    job priced with those rates whatever the shop, size or colour, and rows
+    are never updated or deleted. Rows are created through
+    app.services.pricing_service.pricing_versions.
+    """
+    __tablename__ = "pricing_versions"
+    __table_args__ = (
+        UniqueConstraint("normal_rate", "bulk_rate", "bulk_threshold", name="uq_pricing_versions_rates"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True
+    )
+
+    normal_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    bulk_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    bulk_threshold: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow
+    )# -*- coding: utf-8 -*-
 
@@ -0,0 +1,42 @@
+import uuid
+from datetime import date
+from sqlalchemy import Date, Enum, Float, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+from app.core.constants import PaperSize, ColorMode
+
+
+class ShopDailyStats(Base):
+    """
+    Per-shop rollup of printed volume and revenue, keyed by the day the jobs
+    were created. Maintained incrementally by app.services.stats_service and
+    rebuildable from print_jobs/payments with `python -m app.cli rebuild-stats`.
+    """
+    __tablename__ = "shop_daily_stats"
+
+    shop_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("shops.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    size: Mapped[PaperSize] = mapped_column(
+        Enum(PaperSize),
+        primary_key=True
+    )
+
+    color_mode: Mapped[ColorMode] = mapped_column(
+        Enum(ColorMode),
+        primary_key=True
+    )
+
+    # Jobs that reached PRINTED (or COLLECTED)
+    jobs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Printed pages, i.e. pages * copies
+    pages: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Successful payments, plus counter-paid jobs once COLLECTED
+    revenue: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    inserted: int
+    failed: int
+    # Only the first MAX_REPORTED_ERRORS failures are listed
+    errors: List[ImportRowError]
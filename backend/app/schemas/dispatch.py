@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+from app.core.constants import ColorMode, PaperSize
+
+
+class DispatchSlot(BaseModel):
+    job_id: UUID
+    printer: int
+    size: PaperSize
+    color_mode: ColorMode
+    start_seconds: float
+    setup_seconds: float
+    end_seconds: float
+
+
+class DispatchPlan(BaseModel):
+    shop_id: UUID
+    printers: int
+    switches: int
+    makespan_seconds: float
+    slots: List[DispatchSlot]
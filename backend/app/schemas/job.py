@@ -1,21 +1,51 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Literal
 from uuid import UUID
 from app.schemas.base import BaseResponse
+from app.schemas.campus import CampusResponse
+from app.schemas.payment import PaymentResponse
+from app.schemas.shop import ShopResponse
+from app.schemas.user import UserResponse
 from app.core.constants import (
     PaperSize,
     ColorMode,
     PrintStatus
 )
 
+# Upper bounds keep pages * copies well inside int64 for batch pricing
+MAX_JOB_PAGES = 100_000
+MAX_JOB_COPIES = 10_000
+
 
 class JobCreate(BaseModel):
     shop_id: UUID
-    pages: int
-    copies: int
+    pages: int = Field(gt=0, le=MAX_JOB_PAGES)
+    copies: int = Field(gt=0, le=MAX_JOB_COPIES)
     size: PaperSize
     color_mode: ColorMode
 
 
+class JobUpload(BaseModel):
+    shop_id: UUID
+    user_id: UUID
+    copies: int = Field(default=1, le=MAX_JOB_COPIES)
+    size: PaperSize
+    color_mode: ColorMode
+
+
+class JobFromFile(JobUpload):
+    file_hash: str
+    original_filename: str
+
+
+class JobImport(JobCreate):
+    """One row of a bulk job import; the document must already be stored."""
+    user_id: UUID
+    file_hash: str
+    original_filename: str
+
+
 class JobResponse(BaseResponse):
     shop_id: UUID
     pages: int
@@ -23,4 +53,67 @@ class JobResponse(BaseResponse):
     size: PaperSize
     color_mode: ColorMode
     final_price: float
-    status: PrintStatus
\ No newline at end of file
+    status: PrintStatus
+
+
+class JobDetail(JobResponse):
+    # Only present when requested with ?include=
+    campus: CampusResponse | None = None
+    shop: ShopResponse | None = None
+    user: UserResponse | None = None
+    payment: PaymentResponse | None = None
+
+
+class JobPage(BaseModel):
+    items: List[JobDetail]
+    next_cursor: str | None = None
+
+
+class JobTransition(BaseModel):
+    job_id: UUID
+    to: PrintStatus
+    # The status the client last saw; omit to move from whatever it is now
+    expected: PrintStatus | None = None
+
+
+class JobTransitionBatch(BaseModel):
+    transitions: List[JobTransition] = Field(min_length=1, max_length=1000)
+
+
+class JobTransitionResult(BaseModel):
+    job_id: UUID
+    result: Literal["applied", "conflict", "invalid", "not_found"]
+    status: PrintStatus | None = None
+    detail: str | None = None
+
+
+class JobTransitionBatchResult(BaseModel):
+    applied: int
+    failed: int
+    results: List[JobTransitionResult]
+
+
+class PickupCodeResponse(BaseModel):
+    job_id: UUID
+    token: str
+    expires_at: datetime
+
+
+class PickupCollectBatch(BaseModel):
+    # The scanning counter's shop; codes from other shops do not verify
+    shop_id: UUID
+    tokens: List[str] = Field(min_length=1, max_length=1000)
+
+
+class PickupCollectResult(BaseModel):
+    # None when the token did not verify
+    job_id: UUID | None = None
+    result: Literal["applied", "conflict", "invalid", "not_found"]
+    status: PrintStatus | None = None
+    detail: str | None = None
+
+
+class PickupCollectBatchResult(BaseModel):
+    collected: int
+    failed: int
+    results: List[PickupCollectResult]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Literal
 from uuid import UUID
 from app.schemas.base import BaseResponse
 
@@ -6,4 +7,18 @@ from app.schemas.base import BaseResponse
 class PaymentResponse(BaseResponse):
     job_id: UUID
     amount: float
-    status: str
\ No newline at end of file
+    status: str
+
+
+class PaymentWebhook(BaseModel):
+    """Event body posted by the payment gateway."""
+    id: str
+    type: Literal["payment.succeeded", "payment.failed"]
+    job_id: UUID
+    amount: float
+    reference: str | None = None
+
+
+class WebhookAck(BaseModel):
+    received: bool = True
+    duplicate: bool
@@ -1,6 +1,5 @@
 from pydantic import BaseModel
 from uuid import UUID
-from app.schemas.base import BaseResponse
 from app.core.constants import PaperSize, ColorMode
 
 
@@ -13,10 +12,21 @@ class PricingCreate(BaseModel):
     bulk_threshold: int
 
 
-class PricingResponse(BaseResponse):
+# shop_pricing has no created_at column, so this can't extend BaseResponse
+class PricingResponse(BaseModel):
+    id: UUID
     shop_id: UUID
     size: PaperSize
     color_mode: ColorMode
     normal_rate: float
     bulk_rate: float
-    bulk_threshold: int
\ No newline at end of file
+    bulk_threshold: int
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class QuoteResponse(BaseModel):
+    final_price: float
+    pricing_snapshot: dict
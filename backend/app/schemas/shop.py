@@ -23,4 +23,17 @@ class ShopResponse(BaseResponse):
     name: str
     execution_mode: ExecutionMode
     payment_mode: PaymentMode
-    is_active: bool
\ No newline at end of file
+    is_active: bool
+
+
+class RankedShop(BaseModel):
+    shop_id: UUID
+    name: str
+    execution_mode: ExecutionMode
+    payment_mode: PaymentMode
+    final_price: float
+    applied_rate: float
+    is_bulk: bool
+    # READY_TO_PRINT + PRINTING jobs ahead of a new one
+    queue_length: int
+    estimated_wait_seconds: float
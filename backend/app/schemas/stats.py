@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+from datetime import date
+from app.core.constants import ColorMode, PaperSize
+
+
+class ShopStatsRow(BaseModel):
+    day: date
+    size: PaperSize
+    color_mode: ColorMode
+    jobs: int
+    pages: int
+    revenue: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class ShopStatsTotals(BaseModel):
+    jobs: int = 0
+    pages: int = 0
+    revenue: float = 0.0
+
+
+class ShopStats(BaseModel):
+    shop_id: UUID
+    start: date
+    end: date
+    totals: ShopStatsTotals
+    rows: List[ShopStatsRow]
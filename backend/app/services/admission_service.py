@@ -0,0 +1,103 @@
+# app/services/admission_service.py
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import PrintStatus
+from app.models.job import PrintJob
+from app.services.event_service import JobEvent, job_events
+
+# Jobs a shop has accepted but not started printing
+BACKLOG_STATUSES = frozenset({PrintStatus.UPLOADED, PrintStatus.READY_TO_PRINT})
+
+# Longest single wait while queued, so a missed notification only costs this
+_WAIT_SLICE_SECONDS = 0.5
+
+
+class ShopOverloaded(Exception):
+    def __init__(self, backlog: int, retry_after: int):
+        super().__init__(f"Shop has {backlog} jobs waiting; try again later")
+        self.backlog = backlog
+        self.retry_after = retry_after
+
+
+@dataclass
+class Backlog:
+    count: int
+    expires_at: float
+
+
+class ShopBacklog:
+    """
+    Per-process count of each shop's UPLOADED + READY_TO_PRINT jobs, used
+    to turn away new jobs once a shop is ADMISSION_MAX_BACKLOG behind.
+
+    A shop's count is read with one COUNT on first use, then follows
+    job_events as jobs enter and leave the backlog. Jobs moved by other
+    worker processes are not seen here, so counts are re-read every
+    ADMISSION_RESYNC_SECONDS. The limit is soft: jobs admitted at the same
+    moment can each take the last free slot.
+    """
+
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self._backlogs: Dict[UUID, Backlog] = {}
+        self._changed = threading.Condition()
+
+    def count(self, db: Session, shop_id: UUID) -> int:
+        backlog = self._backlogs.get(shop_id)
+        if backlog is not None and time.monotonic() < backlog.expires_at:
+            return backlog.count
+        count = db.execute(
+            select(func.count())
+            .select_from(PrintJob)
+            .where(PrintJob.shop_id == shop_id, PrintJob.status.in_(BACKLOG_STATUSES))
+        ).scalar_one()
+        with self._changed:
+            self._backlogs[shop_id] = Backlog(count, time.monotonic() + self.resync_seconds)
+        return count
+
+    def on_job_event(self, event: JobEvent) -> None:
+        entered = event.status in BACKLOG_STATUSES
+        left = event.previous in BACKLOG_STATUSES
+        if entered == left:
+            return
+        with self._changed:
+            backlog = self._backlogs.get(event.shop_id)
+            if backlog is None:
+                return
+            backlog.count = max(0, backlog.count + (1 if entered else -1))
+            if left:
+                self._changed.notify_all()
+
+    def room(self, db: Session, shop_id: UUID) -> Optional[int]:
+        """How many more jobs the shop takes now; None without a limit."""
+        limit = settings.ADMISSION_MAX_BACKLOG
+        if limit <= 0:
+            return None
+        return max(0, limit - self.count(db, shop_id))
+
+    def admit(self, db: Session, shop_id: UUID) -> None:
+        """
+        Return once the shop has room for one more job, waiting up to
+        ADMISSION_QUEUE_SECONDS for its backlog to drain; ShopOverloaded
+        after that. Blocking; call from a worker thread.
+        """
+        deadline = time.monotonic() + settings.ADMISSION_QUEUE_SECONDS
+        while self.room(db, shop_id) == 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ShopOverloaded(self.count(db, shop_id), settings.ADMISSION_RETRY_AFTER_SECONDS)
+            with self._changed:
+                self._changed.wait(min(remaining, _WAIT_SLICE_SECONDS))
+
+
+shop_backlog = ShopBacklog(resync_seconds=settings.ADMISSION_RESYNC_SECONDS)
+job_events.add_listener(shop_backlog.on_job_event)
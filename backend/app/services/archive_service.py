@@ -0,0 +1,191 @@
+# app/services/archive_service.py
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, undefer
+
+from app.core.config import settings
+from app.core.constants import PrintStatus
+from app.models.job import ArchivedPrintJob, PrintJob
+from app.models.payment import Payment
+from app.services.pricing_service import job_snapshot
+
+# Statuses a job never leaves (see transition_service.ALLOWED_TRANSITIONS)
+ARCHIVABLE_STATUSES = (PrintStatus.COLLECTED, PrintStatus.CANCELLED)
+
+RATE_KEYS = ("normal_rate", "bulk_rate", "bulk_threshold")
+
+# print_jobs columns carried over unchanged
+_COPIED_COLUMNS = (
+    "id", "campus_id", "shop_id", "user_id", "original_filename", "pages",
+    "copies", "size", "color_mode", "final_price", "execution_mode_snapshot",
+    "payment_mode_snapshot", "status", "created_at", "updated_at",
+)
+
+
+@dataclass
+class ArchiveResult:
+    archived: int = 0
+    batches: int = 0
+    # Processed output files (print_file_url) of the archived jobs
+    files_removed: int = 0
+    freed_bytes: int = 0
+
+
+def _rated_snapshot(shop_id, size, color_mode, units, normal_rate, bulk_rate, bulk_threshold) -> dict:
+    """The pricing_snapshot pricing_service.price_job writes for these rates."""
+    is_bulk = units >= bulk_threshold
+    return {
+        "shop_id": str(shop_id),
+        "size": size.value,
+        "color_mode": color_mode.value,
+        "normal_rate": normal_rate,
+        "bulk_rate": bulk_rate,
+        "bulk_threshold": bulk_threshold,
+        "units": units,
+        "applied_rate": bulk_rate if is_bulk else normal_rate,
+        "is_bulk": is_bulk,
+    }
+
+
+def expand_snapshot(job: ArchivedPrintJob) -> dict:
+    """The pricing_snapshot an archived job was created with."""
+    if job.pricing_extra is not None:
+        return job.pricing_extra
+    return _rated_snapshot(
+        job.shop_id, job.size, job.color_mode, job.pages * job.copies,
+        job.normal_rate, job.bulk_rate, job.bulk_threshold,
+    )
+
+
+def archive_row(job: PrintJob, payment: Optional[Payment] = None) -> Dict:
+    """
+    print_jobs_archive values for a job (and its payment, if any). The
+    snapshot is reduced to its three rates when expand_snapshot gives it
+    back exactly, and kept whole in pricing_extra otherwise.
+    """
+    values = {name: getattr(job, name) for name in _COPIED_COLUMNS}
+    snapshot = job_snapshot(job) or {}
+    rates = {key: snapshot.get(key) for key in RATE_KEYS}
+
+    try:
+        compact = _rated_snapshot(
+            job.shop_id, job.size, job.color_mode, job.pages * job.copies, **rates
+        ) == snapshot
+    except TypeError:
+        # Missing or non-numeric rates
+        compact = False
+
+    if compact:
+        values.update(rates, pricing_extra=None)
+    else:
+        values.update(dict.fromkeys(RATE_KEYS), pricing_extra=snapshot)
+
+    values.update(
+        payment_id=payment.id if payment else None,
+        payment_amount=payment.amount if payment else None,
+        payment_status=payment.status if payment else None,
+        payment_reference=payment.gateway_reference if payment else None,
+    )
+    return values
+
+
+def _candidates(cutoff: datetime, limit: int):
+    return (
+        select(PrintJob, Payment)
+        .outerjoin(Payment, Payment.job_id == PrintJob.id)
+        .where(PrintJob.status.in_(ARCHIVABLE_STATUSES), PrintJob.updated_at < cutoff)
+        .options(undefer(PrintJob.pricing_snapshot))
+        .limit(limit)
+        # Another archiver run skips the rows this one is moving
+        .with_for_update(of=PrintJob, skip_locked=True)
+    )
+
+
+def _cutoff(older_than_days: Optional[int]) -> datetime:
+    if older_than_days is None:
+        older_than_days = settings.ARCHIVE_AFTER_DAYS
+    return datetime.utcnow() - timedelta(days=older_than_days)
+
+
+def count_archivable(db: Session, older_than_days: Optional[int] = None) -> int:
+    cutoff = _cutoff(older_than_days)
+    return db.execute(
+        select(func.count())
+        .select_from(PrintJob)
+        .where(PrintJob.status.in_(ARCHIVABLE_STATUSES), PrintJob.updated_at < cutoff)
+    ).scalar_one()
+
+
+def remove_processed(paths: Iterable[str]) -> Tuple[int, int]:
+    """
+    Delete processed output files, skipping any path outside PROCESSED_DIR.
+    Returns how many were removed and their total size.
+    """
+    root = os.path.realpath(settings.PROCESSED_DIR)
+    removed = freed = 0
+    for path in paths:
+        real = os.path.realpath(path)
+        if os.path.dirname(real) != root:
+            continue
+        try:
+            size = os.path.getsize(real)
+            os.remove(real)
+        except FileNotFoundError:
+            continue
+        removed += 1
+        freed += size
+    return removed, freed
+
+
+def archive_jobs(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> ArchiveResult:
+    """
+    Move COLLECTED/CANCELLED jobs that reached that status more than
+    `older_than_days` ago from print_jobs (and payments) into
+    print_jobs_archive, committing every `batch_size` jobs so no
+    transaction holds many locks or much WAL.
+
+    shop_daily_stats is left as it is (the history did not change) and
+    stats_service.rebuild reads the archive too. The jobs' blobs are no
+    longer referenced and go at the next gc-blobs run; their processed
+    output files are deleted once each batch has committed.
+    """
+    if batch_size is None:
+        batch_size = settings.ARCHIVE_BATCH_SIZE
+    cutoff = _cutoff(older_than_days)
+    result = ArchiveResult()
+
+    while max_batches is None or result.batches < max_batches:
+        rows = db.execute(_candidates(cutoff, batch_size)).all()
+        if not rows:
+            break
+
+        ids: List = [job.id for job, _ in rows]
+        outputs = [job.print_file_url for job, _ in rows if job.print_file_url]
+        db.execute(insert(ArchivedPrintJob), [archive_row(job, payment) for job, payment in rows])
+        db.execute(delete(Payment).where(Payment.job_id.in_(ids)), execution_options={"synchronize_session": False})
+        db.execute(delete(PrintJob).where(PrintJob.id.in_(ids)), execution_options={"synchronize_session": False})
+        db.commit()
+        for job, payment in rows:
+            db.expunge(job)
+            if payment is not None:
+                db.expunge(payment)
+        removed, freed = remove_processed(outputs)
+        result.files_removed += removed
+        result.freed_bytes += freed
+
+        result.archived += len(rows)
+        result.batches += 1
+        if len(rows) < batch_size:
+            break
+
+    return result
@@ -0,0 +1,137 @@
+# app/services/cache_service.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Response
+
+from app.core.config import settings
+
+CAMPUSES_KEY = "campuses"
+SHOPS_KEY = "shops"
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A rendered JSON response body and its ETag."""
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of rendered response bodies with a per-entry TTL.
+
+    Entries are dropped on expiry, when the cache is full (least recently
+    used first), or explicitly via `invalidate` from the write handlers.
+    A reader takes `generation(key)` before querying and passes it to
+    `set`, which stores nothing if the key was invalidated in between, so
+    a body rendered from pre-write rows is not cached after the write.
+    The cache is per-process, so with several workers a write is only
+    guaranteed to be visible everywhere once the TTL has passed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._clears = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self, key: str) -> Tuple[int, int]:
+        """Token for `set`; changes whenever `key` is invalidated."""
+        with self._lock:
+            return self._clears, self._generations.get(key, 0)
+
+    def set(self, key: str, body: bytes, generation: Tuple[int, int]) -> CachedBody:
+        entry = CachedBody(
+            body=body,
+            etag='"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        if self.ttl_seconds <= 0:
+            return entry
+        with self._lock:
+            # Not cached if the key was invalidated while the body was built
+            if (self._clears, self._generations.get(key, 0)) != generation:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._clears += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+catalog_cache = ResponseCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def cached_response(entry: CachedBody, if_none_match: Optional[str]) -> Response:
+    """200 with the cached body, or 304 if the client already has this version."""
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "public, max-age=0, must-revalidate",
+    }
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
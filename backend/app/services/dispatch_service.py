@@ -0,0 +1,240 @@
+# app/services/dispatch_service.py
+
+import heapq
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import ColorMode, PaperSize, PrintStatus
+from app.models.job import PrintJob
+
+# What a printer is set up for: the tray loaded and colour or mono
+Setup = Tuple[PaperSize, ColorMode]
+
+
+@dataclass(frozen=True)
+class QueuedJob:
+    job_id: Hashable
+    size: PaperSize
+    color_mode: ColorMode
+    sheets: int
+    ready_at: float
+
+    @property
+    def setup(self) -> Setup:
+        return self.size, self.color_mode
+
+
+@dataclass(frozen=True)
+class PrinterProfile:
+    """Timing model for one printer, in seconds."""
+    seconds_per_sheet: float = 1.0
+    color_factor: float = 2.0
+    a3_factor: float = 2.0
+    tray_switch_seconds: float = 30.0
+    mode_switch_seconds: float = 10.0
+
+    def setup_seconds(self, current: Optional[Setup], target: Setup) -> float:
+        if current is None:
+            return 0.0
+        seconds = 0.0
+        if current[0] != target[0]:
+            seconds += self.tray_switch_seconds
+        if current[1] != target[1]:
+            seconds += self.mode_switch_seconds
+        return seconds
+
+    def print_seconds(self, job: QueuedJob) -> float:
+        seconds = job.sheets * self.seconds_per_sheet
+        if job.color_mode == ColorMode.COLOR:
+            seconds *= self.color_factor
+        if job.size == PaperSize.A3:
+            seconds *= self.a3_factor
+        return seconds
+
+
+@dataclass(frozen=True)
+class Assignment:
+    job: QueuedJob
+    printer: int
+    start: float
+    setup_seconds: float
+    end: float
+
+    @property
+    def wait(self) -> float:
+        return self.start - self.job.ready_at
+
+
+# ---------------------------
+# Queue policies
+# ---------------------------
+
+class FifoQueue:
+    """Baseline: jobs go to whichever printer frees up first, in arrival order."""
+
+    def __init__(self):
+        self._jobs: Deque[QueuedJob] = deque()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def push(self, job: QueuedJob) -> None:
+        self._jobs.append(job)
+
+    def pop(self, current: Optional[Setup], now: float, others: Set[Setup]) -> QueuedJob:
+        return self._jobs.popleft()
+
+
+class BatchingQueue:
+    """
+    Ready queue grouped by (size, color_mode).
+
+    A free printer keeps draining the group it is set up for. When that
+    group is empty it switches to the cheapest group to set up for,
+    preferring groups no other printer is set up for and then the group
+    whose oldest job has waited longest. Aging bounds the wait: once the
+    oldest job in the queue has waited `max_wait_seconds`, its group is
+    served next regardless of switch cost (after the overdue jobs of the
+    printer's current group, if any). The bound only holds while the
+    printers keep up with arrivals.
+
+    Jobs must be pushed in ready_at order.
+    """
+
+    def __init__(self, profile: PrinterProfile, max_wait_seconds: float):
+        self.profile = profile
+        self.max_wait_seconds = max_wait_seconds
+        self._groups: Dict[Setup, Deque[QueuedJob]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, job: QueuedJob) -> None:
+        self._groups.setdefault(job.setup, deque()).append(job)
+        self._size += 1
+
+    def _overdue(self, key: Optional[Setup], now: float) -> bool:
+        group = self._groups.get(key)
+        return bool(group) and now - group[0].ready_at >= self.max_wait_seconds
+
+    def pop(self, current: Optional[Setup], now: float, others: Set[Setup]) -> QueuedJob:
+        oldest = min(self._groups, key=lambda key: self._groups[key][0].ready_at)
+        if now - self._groups[oldest][0].ready_at >= self.max_wait_seconds:
+            # Serve overdue jobs; finish the current group's overdue run
+            # first so an overloaded queue does not degrade into FIFO
+            key = current if self._overdue(current, now) else oldest
+        elif current in self._groups:
+            key = current
+        else:
+            key = min(
+                self._groups,
+                key=lambda k: (
+                    self.profile.setup_seconds(current, k),
+                    k in others,
+                    self._groups[k][0].ready_at,
+                ),
+            )
+
+        group = self._groups[key]
+        job = group.popleft()
+        if not group:
+            del self._groups[key]
+        self._size -= 1
+        return job
+
+
+# ---------------------------
+# Simulation
+# ---------------------------
+
+def simulate(
+    jobs: Iterable[QueuedJob],
+    printers: int,
+    profile: PrinterProfile,
+    queue: Union[FifoQueue, BatchingQueue],
+) -> List[Assignment]:
+    """
+    Discrete-event run of `jobs` through `queue` on `printers` identical
+    printers. Each time a printer frees up, every job that has become
+    ready by then is queued and the printer takes `queue.pop(...)`.
+    Printers start free at time 0 with no setup, so the first job on each
+    costs no switch.
+    """
+    pending = sorted(jobs, key=lambda job: job.ready_at)
+    state: List[Optional[Setup]] = [None] * printers
+    free = [(0.0, printer) for printer in range(printers)]
+    heapq.heapify(free)
+    assignments: List[Assignment] = []
+    i = 0
+
+    while i < len(pending) or len(queue):
+        now, printer = heapq.heappop(free)
+        if not len(queue) and pending[i].ready_at > now:
+            now = pending[i].ready_at
+        while i < len(pending) and pending[i].ready_at <= now:
+            queue.push(pending[i])
+            i += 1
+
+        others = {setup for p, setup in enumerate(state) if p != printer and setup is not None}
+        job = queue.pop(state[printer], now, others)
+        setup_seconds = profile.setup_seconds(state[printer], job.setup)
+        end = now + setup_seconds + profile.print_seconds(job)
+        state[printer] = job.setup
+        assignments.append(Assignment(job, printer, now, setup_seconds, end))
+        heapq.heappush(free, (end, printer))
+
+    return assignments
+
+
+# ---------------------------
+# Shop dispatch plan
+# ---------------------------
+
+def default_profile() -> PrinterProfile:
+    return PrinterProfile(
+        tray_switch_seconds=settings.DISPATCH_TRAY_SWITCH_SECONDS,
+        mode_switch_seconds=settings.DISPATCH_MODE_SWITCH_SECONDS,
+    )
+
+
+def ready_queue(db: Session, shop_id, now: datetime) -> List[QueuedJob]:
+    """
+    A shop's READY_TO_PRINT jobs, oldest first, with ready_at in seconds
+    relative to `now` (negative: already waiting). updated_at stands in for
+    the time a job became ready.
+    """
+    rows = db.execute(
+        select(
+            PrintJob.id, PrintJob.size, PrintJob.color_mode,
+            PrintJob.pages, PrintJob.copies, PrintJob.updated_at,
+        )
+        .where(PrintJob.shop_id == shop_id, PrintJob.status == PrintStatus.READY_TO_PRINT)
+        .order_by(PrintJob.updated_at, PrintJob.id)
+    ).all()
+    return [
+        QueuedJob(
+            job_id=row.id,
+            size=row.size,
+            color_mode=row.color_mode,
+            sheets=row.pages * row.copies,
+            ready_at=(row.updated_at - now).total_seconds(),
+        )
+        for row in rows
+    ]
+
+
+def plan(db: Session, shop_id, printers: int) -> List[Assignment]:
+    """
+    Order and assign a shop's ready queue to `printers` printers that are
+    free now. Times are seconds from now.
+    """
+    profile = default_profile()
+    queue = BatchingQueue(profile, settings.DISPATCH_MAX_WAIT_SECONDS)
+    return simulate(ready_queue(db, shop_id, datetime.utcnow()), printers, profile, queue)
@@ -0,0 +1,169 @@
+# app/services/event_service.py
+
+import asyncio
+import itertools
+import json
+import secrets
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set
+from uuid import UUID
+
+from app.core.constants import PrintStatus
+
+HISTORY_PER_SHOP = 1000
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class JobEvent:
+    id: int
+    shop_id: UUID
+    job_id: UUID
+    status: PrintStatus
+    previous: Optional[PrintStatus]
+    at: datetime
+    # The publishing broker's epoch; see JobEventBroker
+    epoch: str = ""
+
+    @property
+    def sse_id(self) -> str:
+        return f"{self.epoch}-{self.id}"
+
+    def to_sse(self) -> bytes:
+        data = json.dumps({
+            "job_id": str(self.job_id),
+            "shop_id": str(self.shop_id),
+            "status": self.status.value,
+            "previous": self.previous.value if self.previous else None,
+            "at": self.at.isoformat(),
+        })
+        return f"id: {self.sse_id}\nevent: job_status\ndata: {data}\n\n".encode()
+
+
+RESET_SSE = b"event: reset\ndata: {}\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    shop_id: UUID
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+    # Set when events were lost (resume point too old, or the client fell behind)
+    needs_reset: bool = False
+
+    async def get(self) -> JobEvent:
+        return await self.queue.get()
+
+    def _deliver(self, event: JobEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.needs_reset = True
+
+
+class JobEventBroker:
+    """
+    In-process fan-out of PrintJob status changes, keyed by shop.
+
+    `publish` may be called from any thread (route handlers run in the
+    threadpool); delivery hops onto each subscriber's event loop. Every event
+    gets a process-wide increasing id and the last HISTORY_PER_SHOP events
+    per shop are kept so a reconnecting client can resume from Last-Event-ID.
+    Events are only seen by subscribers of the same process.
+
+    Ids restart with the process, so the SSE id is `<epoch>-<n>` with an
+    epoch drawn when the broker is created: a Last-Event-ID from another
+    process (an earlier run, or another worker) cannot be resumed from and
+    gets a reset instead.
+    """
+
+    def __init__(self, history: int = HISTORY_PER_SHOP):
+        self.epoch = secrets.token_hex(4)
+        self._ids = itertools.count(1)
+        self._history: Dict[UUID, Deque[JobEvent]] = defaultdict(lambda: deque(maxlen=history))
+        # Highest event id per shop that has fallen out of history
+        self._evicted: Dict[UUID, int] = {}
+        self._subscribers: Dict[UUID, Set[Subscription]] = defaultdict(set)
+        self._listeners: List[Callable[[JobEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[JobEvent], None]) -> None:
+        """Synchronous hook run on every published event, in the publisher's thread."""
+        self._listeners.append(listener)
+
+    def publish(
+        self,
+        shop_id: UUID,
+        job_id: UUID,
+        status: PrintStatus,
+        previous: Optional[PrintStatus] = None,
+    ) -> JobEvent:
+        with self._lock:
+            event = JobEvent(
+                id=next(self._ids),
+                shop_id=shop_id,
+                job_id=job_id,
+                status=status,
+                previous=previous,
+                at=datetime.utcnow(),
+                epoch=self.epoch,
+            )
+            history = self._history[shop_id]
+            if len(history) == history.maxlen:
+                self._evicted[shop_id] = history[0].id
+            history.append(event)
+            subscribers = list(self._subscribers.get(shop_id, ()))
+
+        for sub in subscribers:
+            sub.loop.call_soon_threadsafe(sub._deliver, event)
+        for listener in self._listeners:
+            listener(event)
+        return event
+
+    def resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """The sequence number in an SSE id from this broker, else None."""
+        epoch, _, n = (last_event_id or "").rpartition("-")
+        if epoch != self.epoch or not n.isdigit():
+            return None
+        return int(n)
+
+    def subscribe(self, shop_id: UUID, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Register a subscriber on the running loop. Events after
+        `last_event_id` (an SSE id) still in history are queued first; if
+        some were already evicted, or the id is not from this broker, the
+        subscription is flagged `needs_reset`.
+        """
+        sub = Subscription(shop_id=shop_id, loop=asyncio.get_running_loop())
+        resume_from = self.resume_point(last_event_id)
+        if last_event_id is not None and resume_from is None:
+            sub.needs_reset = True
+        with self._lock:
+            if resume_from is not None:
+                if resume_from < self._evicted.get(shop_id, 0):
+                    sub.needs_reset = True
+                missed = [e for e in self._history.get(shop_id, ()) if e.id > resume_from]
+                for event in missed[-SUBSCRIBER_QUEUE_SIZE:]:
+                    sub.queue.put_nowait(event)
+            self._subscribers[shop_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.shop_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.shop_id]
+
+    def subscriber_count(self, shop_id: Optional[UUID] = None) -> int:
+        with self._lock:
+            if shop_id is not None:
+                return len(self._subscribers.get(shop_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+
+job_events = JobEventBroker()
@@ -0,0 +1,349 @@
+# app/services/import_service.py
+
+import codecs
+import csv
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.constants import ExecutionMode, PrintStatus
+from app.db.session import dialect_insert
+from app.models.campus import Campus
+from app.models.job import PrintJob
+from app.models.shop import Shop
+from app.models.user import User
+from app.schemas.bulk import ImportResult, ImportRowError
+from app.services.admission_service import shop_backlog
+from app.services.event_service import job_events
+from app.services.job_service import job_processor
+from app.services.pricing_service import pricing_engine, pricing_versions, price_job
+from app.services.storage_service import storage
+from app.utils import pdf_utils
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10_000
+MAX_REPORTED_ERRORS = 1000
+
+NDJSON_TYPES = {"application/x-ndjson", "application/jsonl", "application/json-seq"}
+CSV_TYPES = {"text/csv", "application/csv"}
+
+# (line number, validated record)
+Row = Tuple[int, BaseModel]
+RowErrors = List[Tuple[int, str]]
+
+
+class ImportFormatError(ValueError):
+    """The request body is not NDJSON or CSV."""
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (line, record, error) for each non-blank line of an NDJSON or CSV
+    body as it streams in. CSV needs a header row; quoted fields may not
+    span lines. Exactly one of record/error is set.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        parse, header = _parse_json_line, None
+    elif media_type in CSV_TYPES:
+        parse, header = _parse_csv_line, []
+    else:
+        raise ImportFormatError("Send application/x-ndjson or text/csv")
+
+    async for line_no, line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        if header is not None and not header:
+            header.extend(next(csv.reader([line])))
+            continue
+        try:
+            yield line_no, parse(line, header), None
+        except ValueError as exc:
+            yield line_no, None, str(exc)
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending.rstrip("\r")
+
+
+def _parse_json_line(line: str, header) -> dict:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON: {exc.msg}")
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    return record
+
+
+def _parse_csv_line(line: str, header: List[str]) -> dict:
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    return dict(zip(header, values))
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+
+async def run_import(
+    db: Session,
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    schema: Type[BaseModel],
+    insert_batch: Callable[[Session, List[Row]], Tuple[int, RowErrors]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportResult:
+    """
+    Validate streamed records against `schema` and hand them to
+    `insert_batch` `batch_size` at a time, on a worker thread. Invalid rows
+    are reported and skipped; they never fail the rest of the import.
+    """
+    inserted = 0
+    errors: RowErrors = []
+    batch: List[Row] = []
+
+    async def flush():
+        nonlocal inserted
+        count, batch_errors = await run_in_threadpool(insert_batch, db, list(batch))
+        inserted += count
+        errors.extend(batch_errors)
+        batch.clear()
+
+    async for line, record, error in iter_records(chunks, content_type):
+        if error is not None:
+            errors.append((line, error))
+            continue
+        try:
+            batch.append((line, schema(**record)))
+        except ValidationError as exc:
+            errors.append((line, _describe(exc)))
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    errors.sort()
+    return ImportResult(
+        inserted=inserted,
+        failed=len(errors),
+        errors=[ImportRowError(line=line, error=error) for line, error in errors[:MAX_REPORTED_ERRORS]],
+    )
+
+
+def _insert_one_by_one(db: Session, model, rows: List[Tuple[int, dict]]) -> Tuple[List[int], RowErrors]:
+    """
+    Fallback when a multi-row INSERT fails despite pre-validation (e.g. a
+    campus deleted mid-import): retry each row in its own savepoint so only
+    the offending rows are rejected.
+    """
+    inserted, errors = [], []
+    for line, values in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model), [values])
+            inserted.append(line)
+        except DBAPIError as exc:
+            errors.append((line, str(exc.orig).splitlines()[0]))
+    db.commit()
+    return inserted, errors
+
+
+# ---------------------------
+# Users
+# ---------------------------
+
+def insert_user_batch(db: Session, rows: List[Row]) -> Tuple[int, RowErrors]:
+    """
+    Insert validated UserCreate rows with one multi-row
+    INSERT ... ON CONFLICT (email) DO NOTHING RETURNING email.
+    """
+    errors: RowErrors = []
+    values: Dict[str, Tuple[int, dict]] = {}
+
+    campus_ids = {}
+    for line, data in rows:
+        try:
+            campus_ids[line] = uuid.UUID(str(data.campus_id))
+        except ValueError:
+            errors.append((line, "campus_id: Invalid UUID"))
+    known_campuses = set(
+        db.execute(select(Campus.id).where(Campus.id.in_(set(campus_ids.values())))).scalars()
+    )
+
+    now = datetime.utcnow()
+    for line, data in rows:
+        campus_id = campus_ids.get(line)
+        if campus_id is None:
+            continue
+        if campus_id not in known_campuses:
+            errors.append((line, "Campus not found"))
+        elif data.email in values:
+            errors.append((line, f"Duplicate email in import (line {values[data.email][0]})"))
+        else:
+            values[data.email] = (line, {
+                "id": uuid.uuid4(),
+                "campus_id": campus_id,
+                "email": data.email,
+                "name": data.name,
+                "role": data.role,
+                "created_at": now,
+            })
+
+    if not values:
+        return 0, errors
+
+    stmt = (
+        dialect_insert(db.get_bind().dialect, User)
+        .values([v for _, v in values.values()])
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.email)
+    )
+    try:
+        created = set(db.execute(stmt).scalars())
+        db.commit()
+    except DBAPIError:
+        db.rollback()
+        inserted, row_errors = _insert_one_by_one(db, User, list(values.values()))
+        return len(inserted), errors + row_errors
+
+    for email, (line, _) in values.items():
+        if email not in created:
+            errors.append((line, "Email already registered"))
+    return len(created), errors
+
+
+# ---------------------------
+# Jobs
+# ---------------------------
+
+def insert_job_batch(db: Session, rows: List[Row]) -> Tuple[int, RowErrors]:
+    """
+    Insert validated JobImport rows (course packs and other bulk orders for
+    documents already in blob storage) with one executemany INSERT. Shops,
+    users, documents and rates are checked per batch, not per row.
+    """
+    errors: RowErrors = []
+    shops = {
+        shop.id: shop
+        for shop in db.execute(
+            select(Shop).where(Shop.id.in_({data.shop_id for _, data in rows}), Shop.is_active)
+        ).scalars()
+    }
+    users = set(
+        db.execute(select(User.id).where(User.id.in_({data.user_id for _, data in rows}))).scalars()
+    )
+    tables = pricing_engine.get_tables(db, shops)
+    # Admission control: rows past a shop's free backlog slots are rejected
+    room = {shop_id: shop_backlog.room(db, shop_id) for shop_id in shops}
+
+    # Documents are shared across many rows of a course-pack import
+    page_counts: Dict[str, Union[int, str]] = {}
+    for file_hash in {data.file_hash for _, data in rows}:
+        try:
+            if not storage.touch(file_hash):
+                page_counts[file_hash] = "File not found, upload it first"
+                continue
+            page_counts[file_hash] = pdf_utils.count_pages(storage.path_for(file_hash))
+        except (pdf_utils.PdfError, OSError) as exc:
+            page_counts[file_hash] = str(exc)
+
+    now = datetime.utcnow()
+    values: List[Tuple[int, dict]] = []
+    for line, data in rows:
+        shop = shops.get(data.shop_id)
+        pages = page_counts[data.file_hash]
+        entry = tables.get(data.shop_id, {}).get((data.size, data.color_mode))
+        if shop is None:
+            errors.append((line, "Shop not found"))
+        elif data.user_id not in users:
+            errors.append((line, "User not found"))
+        elif isinstance(pages, str):
+            errors.append((line, pages))
+        elif data.pages != pages:
+            errors.append((line, f"pages is {data.pages} but the document has {pages}"))
+        elif data.copies < 1:
+            errors.append((line, "copies must be at least 1"))
+        elif entry is None:
+            errors.append((line, f"No pricing for {data.size.value} {data.color_mode.value} at this shop"))
+        elif room[shop.id] == 0:
+            errors.append((line, "Shop backlog is full; try again later"))
+        else:
+            if room[shop.id] is not None:
+                room[shop.id] -= 1
+            quote = price_job(shop.id, data.size, data.color_mode, entry, pages, data.copies)
+            values.append((line, {
+                "id": uuid.uuid4(),
+                "campus_id": shop.campus_id,
+                "shop_id": shop.id,
+                "user_id": data.user_id,
+                "file_url": storage.path_for(data.file_hash),
+                "file_hash": data.file_hash,
+                "original_filename": data.original_filename,
+                "pages": pages,
+                "copies": data.copies,
+                "size": data.size,
+                "color_mode": data.color_mode,
+                "final_price": quote.final_price,
+                "pricing_version_id": pricing_versions.id_for(db, entry),
+                "execution_mode_snapshot": shop.execution_mode,
+                "payment_mode_snapshot": shop.payment_mode,
+                "status": PrintStatus.UPLOADED,
+                "processing_claimed_until": job_processor.initial_claim(shop.execution_mode, now),
+                "created_at": now,
+                "updated_at": now,
+            }))
+
+    if not values:
+        return 0, errors
+
+    try:
+        # executemany; SQLAlchemy batches it into multi-row INSERTs
+        db.execute(insert(PrintJob), [v for _, v in values])
+        db.commit()
+    except DBAPIError:
+        db.rollback()
+        inserted_lines, row_errors = _insert_one_by_one(db, PrintJob, values)
+        errors.extend(row_errors)
+        kept = set(inserted_lines)
+        values = [(line, v) for line, v in values if line in kept]
+
+    for _, v in values:
+        job = PrintJob(**v)
+        job_events.publish(job.shop_id, job.id, job.status)
+        if job.execution_mode_snapshot != ExecutionMode.MANUAL:
+            job_processor.submit(job)
+    return len(values), errors
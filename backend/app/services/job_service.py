@@ -1,2 +1,566 @@
 # -*- coding: utf-8 -*-
+# app/services/job_service.py
 
+import base64
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, or_, select, tuple_, union_all, update
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+
+from app.core.config import settings
+from app.core.constants import ColorMode, ExecutionMode, PaymentMode, PrintStatus
+from app.db.session import SessionLocal
+from app.models.job import PrintJob
+from app.models.shop import Shop
+from app.models.user import User
+from app.schemas.job import JobDetail, JobFromFile, JobResponse, JobUpload
+from app.services.admission_service import ShopOverloaded, shop_backlog
+from app.services.event_service import job_events
+from app.services.payment_service import has_successful_payment
+from app.services.pricing_service import PricingNotFound, Quote, pricing_engine, pricing_versions
+from app.services.storage_service import storage
+from app.utils import pdf_utils
+from app.utils.file_utils import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+
+class JobCreationError(Exception):
+    def __init__(self, detail: str, status_code: int = 400, headers: Optional[Dict[str, str]] = None):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+        self.headers = headers
+
+
+# ---------------------------
+# Shop queue (keyset pagination)
+# ---------------------------
+
+def encode_cursor(job: PrintJob) -> str:
+    """Opaque cursor pointing just after `job` in (created_at, id) order."""
+    raw = f"{job.created_at.isoformat()}|{job.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, job_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(job_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def build_shop_queue_query(
+    shop_id: UUID,
+    statuses: Optional[Sequence[PrintStatus]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Select:
+    """
+    Oldest-first page of a shop's jobs.
+
+    The predicate only uses columns of ix_print_jobs_shop_status_created /
+    ix_print_jobs_shop_created, and the cursor is a row comparison on
+    (created_at, id), so each page is an index range scan regardless of how
+    deep into the queue it is. One extra row is fetched to detect a next page.
+
+    The status index is only in (created_at, id) order within one status, so
+    for several statuses a single scan would have to sort every matching
+    row before the LIMIT. Instead each status gets its own limited range
+    scan and the page is taken from their union, at most
+    len(statuses) * (limit + 1) rows.
+    """
+    filters = [PrintJob.shop_id == shop_id]
+    if created_after is not None:
+        filters.append(PrintJob.created_at >= created_after)
+    if created_before is not None:
+        filters.append(PrintJob.created_at < created_before)
+    if cursor is not None:
+        after_created_at, after_id = decode_cursor(cursor)
+        filters.append(tuple_(PrintJob.created_at, PrintJob.id) > tuple_(after_created_at, after_id))
+    order = (PrintJob.created_at, PrintJob.id)
+
+    statuses = list(dict.fromkeys(statuses or ()))
+    if len(statuses) > 1:
+        branches = [
+            select(PrintJob.id)
+            .where(*filters, PrintJob.status == status)
+            .order_by(*order)
+            .limit(limit + 1)
+            .subquery()
+            for status in statuses
+        ]
+        page_ids = union_all(*(select(branch.c.id) for branch in branches)).subquery()
+        stmt = select(PrintJob).join(page_ids, PrintJob.id == page_ids.c.id)
+    else:
+        stmt = select(PrintJob).where(*filters)
+        if statuses:
+            stmt = stmt.where(PrintJob.status == statuses[0])
+
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def paginate(jobs: List[PrintJob], limit: int) -> Tuple[List[PrintJob], Optional[str]]:
+    """Split a limit+1 result into the page and the cursor for the next one."""
+    if len(jobs) <= limit:
+        return jobs, None
+    page = jobs[:limit]
+    return page, encode_cursor(page[-1])
+
+
+# ---------------------------
+# Related objects (?include=)
+# ---------------------------
+
+JOB_INCLUDES = ("campus", "shop", "user", "payment")
+
+
+def parse_includes(include: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated ?include= value. Raises ValueError for unknown names."""
+    if not include:
+        return ()
+    names = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+    unknown = [name for name in names if name not in JOB_INCLUDES]
+    if unknown:
+        raise ValueError(f"Unknown include {', '.join(unknown)}; expected any of {', '.join(JOB_INCLUDES)}")
+    return names
+
+
+def with_includes(stmt: Select, includes: Sequence[str]) -> Select:
+    """
+    Eager-load the requested relationships so a page costs the same number
+    of queries whatever its size: the many-to-one parents are joined into
+    the job query, the payment comes from one extra SELECT ... IN. Any
+    other relationship access raises instead of lazy loading per job.
+    """
+    options = [
+        joinedload(getattr(PrintJob, name), innerjoin=True)
+        for name in ("campus", "shop", "user")
+        if name in includes
+    ]
+    if "payment" in includes:
+        options.append(selectinload(PrintJob.payment))
+    return stmt.options(*options, raiseload("*"))
+
+
+def job_detail(job: PrintJob, includes: Sequence[str]) -> JobDetail:
+    """JobDetail with only the requested relationships set (see with_includes)."""
+    data = JobResponse.model_validate(job).model_dump()
+    for name in includes:
+        data[name] = getattr(job, name)
+    return JobDetail.model_validate(data)
+
+
+# ---------------------------
+# Job creation
+# ---------------------------
+
+def _prepare_job(db: Session, data: JobUpload, path: str) -> Tuple[Shop, int, Quote]:
+    shop = db.get(Shop, data.shop_id)
+    if not shop or not shop.is_active:
+        raise JobCreationError("Shop not found", status_code=404)
+    try:
+        shop_backlog.admit(db, shop.id)
+    except ShopOverloaded as exc:
+        raise JobCreationError(str(exc), status_code=429, headers={"Retry-After": str(exc.retry_after)})
+    if not db.get(User, data.user_id):
+        raise JobCreationError("User not found", status_code=404)
+    if data.copies < 1:
+        raise JobCreationError("copies must be at least 1")
+
+    try:
+        pages = pdf_utils.count_pages(path)
+    except pdf_utils.PdfError as exc:
+        raise JobCreationError(str(exc))
+
+    try:
+        quote = pricing_engine.quote(db, shop.id, data.size, data.color_mode, pages, data.copies)
+    except PricingNotFound as exc:
+        raise JobCreationError(str(exc))
+
+    return shop, pages, quote
+
+
+def _insert_job(
+    db: Session,
+    shop: Shop,
+    data: JobUpload,
+    file_hash: str,
+    original_filename: str,
+    pages: int,
+    quote: Quote,
+) -> PrintJob:
+    job = PrintJob(
+        campus_id=shop.campus_id,
+        shop_id=shop.id,
+        user_id=data.user_id,
+        file_url=storage.path_for(file_hash),
+        file_hash=file_hash,
+        original_filename=original_filename,
+        pages=pages,
+        copies=data.copies,
+        size=data.size,
+        color_mode=data.color_mode,
+        final_price=quote.final_price,
+        pricing_version_id=pricing_versions.id_for(db, quote.rate),
+        execution_mode_snapshot=shop.execution_mode,
+        payment_mode_snapshot=shop.payment_mode,
+        status=PrintStatus.UPLOADED,
+        processing_claimed_until=job_processor.initial_claim(shop.execution_mode),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_events.publish(job.shop_id, job.id, job.status)
+
+    if job.execution_mode_snapshot != ExecutionMode.MANUAL:
+        job_processor.submit(job)
+    return job
+
+
+def create_job_from_upload(db: Session, data: JobUpload, upload: StoredUpload) -> PrintJob:
+    """
+    Count pages of a received PDF, price it, move it into blob storage and
+    create the UPLOADED job. Blocking; call from a worker thread.
+    """
+    shop, pages, quote = _prepare_job(db, data, upload.path)
+    storage.put(upload.path, upload.sha256)
+    return _insert_job(db, shop, data, upload.sha256, upload.filename, pages, quote)
+
+
+def create_job_from_file(db: Session, data: JobFromFile) -> PrintJob:
+    """Create a job for a blob that is already stored, skipping the upload."""
+    try:
+        stored = storage.touch(data.file_hash)
+    except ValueError as exc:
+        raise JobCreationError(str(exc))
+    if not stored:
+        raise JobCreationError("File not found, upload it first", status_code=404)
+
+    shop, pages, quote = _prepare_job(db, data, storage.path_for(data.file_hash))
+    return _insert_job(db, shop, data, data.file_hash, data.original_filename, pages, quote)
+
+
+# ---------------------------
+# Document preprocessing
+# ---------------------------
+
+@dataclass
+class ProcessingTask:
+    job_id: UUID
+    shop_id: UUID
+    src_path: str
+    paper_size: str
+    grayscale: bool
+    payment_mode: PaymentMode
+    queued_at: float
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+def status_after_processing(payment_mode: PaymentMode) -> PrintStatus:
+    """Prepaid jobs wait for payment; counter (or either) jobs can go to the printer."""
+    if payment_mode == PaymentMode.PREPAID:
+        return PrintStatus.PAYMENT_PENDING
+    return PrintStatus.READY_TO_PRINT
+
+
+class JobProcessor:
+    """
+    Runs pdf_utils.preprocess for UPLOADED jobs on a process pool.
+
+    Tasks are queued per shop and at most `max_per_shop` of a shop's jobs
+    run at once, so one shop's burst cannot occupy every worker. Results are
+    written back on a small thread pool with a conditional UPDATE, so a job
+    cancelled while it was processing is left alone.
+
+    Several API processes run a processor each. A job belongs to the one
+    holding its claim (processing_claimed_until): new jobs are claimed by
+    the process that created them, and `recover` takes over jobs whose
+    claim lapsed, with FOR UPDATE SKIP LOCKED so two processes never take
+    the same job. A failed run releases the claim and counts an attempt, so
+    the job is retried by the next recovery pass, up to `max_attempts`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_per_shop: int,
+        output_dir: str,
+        claim_seconds: float,
+        recover_interval_seconds: float,
+        max_attempts: int,
+    ):
+        self.max_workers = max_workers
+        self.max_per_shop = max_per_shop
+        self.output_dir = output_dir
+        self.claim_seconds = claim_seconds
+        self.recover_interval_seconds = recover_interval_seconds
+        self.max_attempts = max_attempts
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._finisher: Optional[ThreadPoolExecutor] = None
+        self._recovery: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pending: Dict[UUID, Deque[ProcessingTask]] = defaultdict(deque)
+        self._running: Dict[UUID, int] = defaultdict(int)
+        # Jobs queued or running in this process
+        self._in_flight: Set[UUID] = set()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, StageStats] = defaultdict(StageStats)
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        # spawn, not fork: the API process has live threads and DB connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._finisher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-finish")
+        with self._lock:
+            for shop_id in list(self._pending):
+                self._dispatch(shop_id)
+        if self.recover_interval_seconds > 0:
+            self._stop.clear()
+            self._recovery = threading.Thread(target=self._recover_periodically, name="job-recovery", daemon=True)
+            self._recovery.start()
+
+    def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        self._stop.set()
+        if self._recovery is not None:
+            self._recovery.join(timeout=5)
+            self._recovery = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._finisher.shutdown(wait=False)
+        self._executor = None
+        self._finisher = None
+
+    def initial_claim(self, execution_mode: ExecutionMode, now: Optional[datetime] = None) -> Optional[datetime]:
+        """processing_claimed_until for a job this process creates (and submits)."""
+        if execution_mode == ExecutionMode.MANUAL:
+            return None
+        return (now or datetime.utcnow()) + timedelta(seconds=self.claim_seconds)
+
+    @staticmethod
+    def _task(job: PrintJob) -> ProcessingTask:
+        return ProcessingTask(
+            job_id=job.id,
+            shop_id=job.shop_id,
+            src_path=job.file_url,
+            paper_size=job.size.value,
+            grayscale=job.color_mode == ColorMode.BW,
+            payment_mode=job.payment_mode_snapshot,
+            queued_at=time.perf_counter(),
+        )
+
+    def submit(self, job: PrintJob) -> None:
+        """Queue a job this process holds the claim on."""
+        self._enqueue(self._task(job))
+
+    def _enqueue(self, task: ProcessingTask) -> bool:
+        with self._lock:
+            if task.job_id in self._in_flight:
+                return False
+            self._in_flight.add(task.job_id)
+            self._pending[task.shop_id].append(task)
+            self._dispatch(task.shop_id)
+        return True
+
+    def recover(self, db: Session) -> int:
+        """
+        Claim and queue UPLOADED jobs nobody holds a claim on: left by a
+        process that died, or released by a failed run. Returns how many
+        were queued. Jobs this process still has in flight keep their place
+        and only get their claim renewed.
+        """
+        now = datetime.utcnow()
+        jobs = db.execute(
+            select(PrintJob)
+            .where(
+                PrintJob.status == PrintStatus.UPLOADED,
+                PrintJob.execution_mode_snapshot != ExecutionMode.MANUAL,
+                PrintJob.print_file_url.is_(None),
+                or_(PrintJob.processing_claimed_until.is_(None), PrintJob.processing_claimed_until < now),
+                PrintJob.processing_attempts < self.max_attempts,
+            )
+            .order_by(PrintJob.created_at)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not jobs:
+            db.rollback()
+            return 0
+
+        tasks = [self._task(job) for job in jobs]
+        db.execute(
+            update(PrintJob)
+            .where(PrintJob.id.in_([task.job_id for task in tasks]))
+            # updated_at kept: a claim is not a change to the job
+            .values(processing_claimed_until=now + timedelta(seconds=self.claim_seconds), updated_at=PrintJob.updated_at),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        return sum(self._enqueue(task) for task in tasks)
+
+    def _recover_periodically(self) -> None:
+        while not self._stop.wait(self.recover_interval_seconds):
+            db = SessionLocal()
+            try:
+                queued = self.recover(db)
+                if queued:
+                    logger.info("Took over %d unprocessed jobs", queued)
+            except Exception:
+                logger.exception("Recovering unprocessed jobs failed")
+                db.rollback()
+            finally:
+                db.close()
+
+    def _release(self, job_id: UUID) -> None:
+        """After a failed run: drop the claim and count the attempt."""
+        db = SessionLocal()
+        try:
+            attempts = db.execute(
+                update(PrintJob)
+                .where(PrintJob.id == job_id, PrintJob.status == PrintStatus.UPLOADED)
+                .values(
+                    processing_claimed_until=None,
+                    processing_attempts=PrintJob.processing_attempts + 1,
+                    updated_at=PrintJob.updated_at,
+                )
+                .returning(PrintJob.processing_attempts)
+            ).scalar_one_or_none()
+            db.commit()
+        finally:
+            db.close()
+        if attempts is not None and attempts >= self.max_attempts:
+            logger.error("Giving up preprocessing job %s after %d attempts", job_id, attempts)
+
+    def _dispatch(self, shop_id: UUID) -> None:
+        # Caller holds self._lock
+        if self._executor is None:
+            return
+        pending = self._pending[shop_id]
+        while pending and self._running[shop_id] < self.max_per_shop:
+            task = pending.popleft()
+            self._running[shop_id] += 1
+            self.stages["queued"].observe(time.perf_counter() - task.queued_at)
+            future = self._executor.submit(
+                pdf_utils.preprocess,
+                task.src_path,
+                os.path.join(self.output_dir, f"{task.job_id}.pdf"),
+                task.paper_size,
+                task.grayscale,
+            )
+            future.add_done_callback(lambda f, t=task: self._finisher.submit(self._finish, t, f))
+        if not pending:
+            self._pending.pop(shop_id, None)
+
+    def _finish(self, task: ProcessingTask, future: Future) -> None:
+        try:
+            timings = future.result()
+            output = os.path.join(self.output_dir, f"{task.job_id}.pdf")
+            status = status_after_processing(task.payment_mode)
+            db = SessionLocal()
+            try:
+                # Lock the job (same order as the payment applier) so a payment
+                # applied while the job was UPLOADED is not missed
+                db.execute(select(PrintJob.id).where(PrintJob.id == task.job_id).with_for_update())
+                if status == PrintStatus.PAYMENT_PENDING and has_successful_payment(db, task.job_id):
+                    status = PrintStatus.PAYMENT_CONFIRMED
+                result = db.execute(
+                    update(PrintJob)
+                    .where(PrintJob.id == task.job_id, PrintJob.status == PrintStatus.UPLOADED)
+                    .values(
+                        status=status,
+                        print_file_url=output,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+                db.commit()
+            finally:
+                db.close()
+            # The job may have been moved on (or cancelled) while it was processing
+            if result.rowcount == 1:
+                job_events.publish(task.shop_id, task.job_id, status, PrintStatus.UPLOADED)
+            with self._lock:
+                for stage, seconds in timings.items():
+                    self.stages[stage].observe(seconds)
+                self.completed += 1
+        except Exception:
+            logger.exception("Preprocessing failed for job %s", task.job_id)
+            with self._lock:
+                self.failed += 1
+            try:
+                self._release(task.job_id)
+            except Exception:
+                logger.exception("Could not release job %s", task.job_id)
+        finally:
+            with self._lock:
+                self._in_flight.discard(task.job_id)
+                self._running[task.shop_id] -= 1
+                if not self._running[task.shop_id]:
+                    del self._running[task.shop_id]
+                self._dispatch(task.shop_id)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            shops = set(self._pending) | set(self._running)
+            return {
+                "queue_depth": sum(len(q) for q in self._pending.values()),
+                "running": sum(self._running.values()),
+                "completed": self.completed,
+                "failed": self.failed,
+                "shops": {
+                    str(shop_id): {
+                        "pending": len(self._pending.get(shop_id, ())),
+                        "running": self._running.get(shop_id, 0),
+                    }
+                    for shop_id in shops
+                },
+                "stages": {
+                    stage: {
+                        "count": stats.count,
+                        "avg_ms": stats.total_seconds / stats.count * 1000 if stats.count else 0.0,
+                        "max_ms": stats.max_seconds * 1000,
+                    }
+                    for stage, stats in self.stages.items()
+                },
+            }
+
+
+job_processor = JobProcessor(
+    max_workers=settings.JOB_WORKERS,
+    max_per_shop=settings.JOB_MAX_PER_SHOP,
+    output_dir=settings.PROCESSED_DIR,
+    claim_seconds=settings.JOB_CLAIM_SECONDS,
+    recover_interval_seconds=settings.JOB_RECOVER_INTERVAL_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+)
@@ -1,2 +1,241 @@
 # -*- coding: utf-8 -*-
+# app/services/payment_service.py
 
+import hashlib
+import hmac
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import PrintStatus
+from app.db.session import SessionLocal, dialect_insert
+from app.models.job import PrintJob
+from app.models.payment import Payment, PaymentEvent, PaymentStatus
+from app.schemas.payment import PaymentWebhook
+from app.services.event_service import job_events
+
+logger = logging.getLogger(__name__)
+
+SUCCEEDED = "payment.succeeded"
+FAILED = "payment.failed"
+
+# Gateways send amounts in major units; allow for float rounding
+AMOUNT_TOLERANCE = 0.005
+
+
+class WebhookSignatureError(ValueError):
+    """The webhook body does not match its X-Signature header."""
+
+
+def verify_signature(
+    body: bytes,
+    signature: Optional[str],
+    secret: Optional[str],
+    allow_unsigned: bool = False,
+) -> None:
+    """
+    Check a hex HMAC-SHA256 of the raw body. Without a secret every webhook
+    is rejected, unless `allow_unsigned` (local development only).
+    """
+    if not secret:
+        if allow_unsigned:
+            return
+        logger.error("Rejected a payment webhook: PAYMENT_WEBHOOK_SECRET is not set")
+        raise WebhookSignatureError("Webhook signing is not configured")
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    if not signature or not hmac.compare_digest(expected, signature.strip().lower()):
+        raise WebhookSignatureError("Invalid signature")
+
+
+def inbox_insert(dialect, event: PaymentWebhook, payload: dict) -> Insert:
+    """
+    INSERT of one webhook delivery into payment_events. A redelivery of the
+    same gateway event id inserts nothing and returns no row.
+    """
+    return (
+        dialect_insert(dialect, PaymentEvent)
+        .values(
+            gateway_event_id=event.id,
+            event_type=event.type,
+            job_id=event.job_id,
+            amount=event.amount,
+            gateway_reference=event.reference,
+            payload=payload,
+            received_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=[PaymentEvent.gateway_event_id])
+        .returning(PaymentEvent.id)
+    )
+
+
+def record_event(db: Session, event: PaymentWebhook, payload: dict) -> bool:
+    """Append a delivery to the inbox. Returns False for a duplicate."""
+    inserted = db.execute(inbox_insert(db.get_bind().dialect, event, payload)).first() is not None
+    db.commit()
+    if inserted:
+        payment_applier.wake()
+    return inserted
+
+
+def has_successful_payment(db: Session, job_id) -> bool:
+    return db.execute(
+        select(Payment.id).where(Payment.job_id == job_id, Payment.status == PaymentStatus.SUCCESS)
+    ).first() is not None
+
+
+@dataclass
+class ApplierStats:
+    batches: int = 0
+    applied: int = 0
+    confirmed: int = 0
+    rejected: int = 0
+
+
+class PaymentApplier:
+    """
+    Background thread that drains payment_events in batches.
+
+    Each batch claims unprocessed events with FOR UPDATE SKIP LOCKED, locks
+    the affected jobs in id order, applies every event to Payment/PrintJob
+    and marks the events processed, all in one transaction. Webhook
+    requests therefore never wait on job or payment row locks, and several
+    API processes can run appliers side by side.
+    """
+
+    def __init__(self, batch_size: int, interval_seconds: float):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.stats = ApplierStats()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="payment-applier", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                applied = self.apply_batch(db)
+            except Exception:
+                logger.exception("Applying payment events failed")
+                db.rollback()
+                applied = 0
+            finally:
+                db.close()
+            # A full batch means there is probably more waiting
+            if applied < self.batch_size:
+                self._wake.wait(self.interval_seconds)
+                self._wake.clear()
+
+    def apply_batch(self, db: Session) -> int:
+        """Apply up to batch_size pending events. Returns how many were claimed."""
+        events = db.execute(
+            select(PaymentEvent)
+            .where(PaymentEvent.processed_at.is_(None))
+            .order_by(PaymentEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not events:
+            return 0
+
+        job_ids = {event.job_id for event in events}
+        jobs: Dict = {
+            job.id: job
+            for job in db.execute(
+                select(PrintJob)
+                .where(PrintJob.id.in_(job_ids))
+                .order_by(PrintJob.id)
+                .with_for_update()
+            ).scalars()
+        }
+        payments: Dict = {
+            payment.job_id: payment
+            for payment in db.execute(
+                select(Payment).where(Payment.job_id.in_(job_ids)).with_for_update()
+            ).scalars()
+        }
+
+        now = datetime.utcnow()
+        confirmed: List[PrintJob] = []
+        rejected = 0
+        for event in events:
+            event.processed_at = now
+            event.error = self._apply(db, event, jobs.get(event.job_id), payments, confirmed)
+            if event.error:
+                rejected += 1
+
+        db.commit()
+
+        for job in confirmed:
+            job_events.publish(job.shop_id, job.id, PrintStatus.PAYMENT_CONFIRMED, PrintStatus.PAYMENT_PENDING)
+        self.stats.batches += 1
+        self.stats.applied += len(events)
+        self.stats.confirmed += len(confirmed)
+        self.stats.rejected += rejected
+        return len(events)
+
+    @staticmethod
+    def _apply(
+        db: Session,
+        event: PaymentEvent,
+        job: Optional[PrintJob],
+        payments: Dict,
+        confirmed: List[PrintJob],
+    ) -> Optional[str]:
+        """Apply one event; returns the reason it was not applied, if any."""
+        if job is None:
+            return "Unknown job"
+        payment = payments.get(job.id)
+        if payment is not None and payment.status == PaymentStatus.SUCCESS:
+            return None if event.event_type == FAILED else "Job already paid"
+
+        if event.event_type == SUCCEEDED and event.amount + AMOUNT_TOLERANCE < job.final_price:
+            return f"Amount {event.amount:.2f} is below the job price {job.final_price:.2f}"
+
+        if payment is None:
+            payment = Payment(job_id=job.id, amount=event.amount, status=PaymentStatus.PENDING)
+            db.add(payment)
+            payments[job.id] = payment
+        payment.amount = event.amount
+        payment.gateway_reference = event.gateway_reference
+
+        if event.event_type == FAILED:
+            payment.status = PaymentStatus.FAILED
+            return None
+
+        payment.status = PaymentStatus.SUCCESS
+        # Jobs still being preprocessed are confirmed when processing ends
+        if job.status == PrintStatus.PAYMENT_PENDING:
+            job.status = PrintStatus.PAYMENT_CONFIRMED
+            confirmed.append(job)
+        return None
+
+
+payment_applier = PaymentApplier(
+    batch_size=settings.PAYMENT_APPLIER_BATCH_SIZE,
+    interval_seconds=settings.PAYMENT_APPLIER_INTERVAL_SECONDS,
+)
@@ -0,0 +1,182 @@
+# app/services/pickup_service.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import PrintStatus
+from app.models.job import PrintJob
+from app.services.event_service import JobEvent, job_events
+from app.services.transition_service import INVALID, Transition, apply_transitions
+from app.utils.qr_utils import InvalidPickupToken, PickupTokenCodec, render_qr
+
+
+class PickupCodeError(Exception):
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+@dataclass
+class PickupCode:
+    job_id: UUID
+    shop_id: UUID
+    token: str
+    expires_at: int
+    # Rendered QR images by format, filled in on first request
+    images: Dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class PickupOutcome:
+    # None when the token did not verify
+    job_id: Optional[UUID]
+    result: str
+    status: Optional[PrintStatus]
+    detail: Optional[str] = None
+
+
+class PickupCodes:
+    """
+    Issues and checks pickup codes for PRINTED jobs.
+
+    A code is a PickupTokenCodec token, so the counter's scan is checked
+    with one HMAC and no database read. Issued codes and their rendered QR
+    images are kept in a per-process LRU keyed by job id: a code is issued
+    as soon as a job_events PRINTED event is seen, and dropped when the job
+    leaves PRINTED. Workers that missed the event issue their own code on
+    request; every unexpired code for the job stays valid.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._codec: Optional[PickupTokenCodec] = None
+        self._entries: "OrderedDict[UUID, PickupCode]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def codec(self) -> PickupTokenCodec:
+        if self._codec is None:
+            if not settings.PICKUP_CODE_SECRET:
+                raise PickupCodeError("Pickup codes are not configured", status_code=503)
+            self._codec = PickupTokenCodec(settings.PICKUP_CODE_SECRET)
+        return self._codec
+
+    def issue(self, shop_id: UUID, job_id: UUID) -> PickupCode:
+        now = time.time()
+        token = self.codec().issue(shop_id, job_id, self.ttl_seconds, now=now)
+        code = PickupCode(job_id, shop_id, token, int(now) + self.ttl_seconds)
+        with self._lock:
+            self._entries[job_id] = code
+            self._entries.move_to_end(job_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return code
+
+    def cached(self, job_id: UUID) -> Optional[PickupCode]:
+        with self._lock:
+            code = self._entries.get(job_id)
+            if code is None or code.expires_at <= time.time():
+                if code is not None:
+                    del self._entries[job_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(job_id)
+            self.hits += 1
+            return code
+
+    def drop(self, job_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(job_id, None)
+
+    def on_job_event(self, event: JobEvent) -> None:
+        if event.status == PrintStatus.PRINTED:
+            if settings.PICKUP_CODE_SECRET:
+                self.issue(event.shop_id, event.job_id)
+        elif event.previous == PrintStatus.PRINTED:
+            self.drop(event.job_id)
+
+    def code_for(self, db: Session, job_id: UUID, user_id: UUID) -> PickupCode:
+        """
+        The pickup code of `user_id`'s job, from the cache or issued now.
+        The job's owner and status are always read, so only its user gets a
+        code and only while the job is PRINTED.
+        """
+        self.codec()
+        row = db.execute(
+            select(PrintJob.shop_id, PrintJob.user_id, PrintJob.status).where(PrintJob.id == job_id)
+        ).first()
+        if row is None:
+            raise PickupCodeError("Job not found", status_code=404)
+        if row.user_id != user_id:
+            raise PickupCodeError("Job belongs to another user", status_code=403)
+        if row.status != PrintStatus.PRINTED:
+            raise PickupCodeError(f"Job is {row.status.value}, not printed", status_code=409)
+        code = self.cached(job_id)
+        if code is not None:
+            return code
+        return self.issue(row.shop_id, job_id)
+
+    def image(self, code: PickupCode, fmt: str) -> bytes:
+        image = code.images.get(fmt)
+        if image is None:
+            # Rendered outside the lock; a concurrent render of the same code is harmless
+            image = code.images[fmt] = render_qr(code.token, fmt)
+        return image
+
+    def collect(self, db: Session, shop_id: UUID, tokens: Sequence[str]) -> List[PickupOutcome]:
+        """
+        Mark the jobs behind a burst of scanned tokens COLLECTED, in one
+        transaction (transition_service.apply_transitions, expecting
+        PRINTED). Tokens that do not verify for `shop_id` never reach the
+        database. Outcomes are in token order.
+        """
+        codec = self.codec()
+        now = time.time()
+        outcomes: Dict[int, PickupOutcome] = {}
+        verified = []
+        for i, token in enumerate(tokens):
+            try:
+                verified.append((i, codec.verify(shop_id, token.strip(), now=now)))
+            except InvalidPickupToken as exc:
+                outcomes[i] = PickupOutcome(None, INVALID, None, str(exc))
+
+        if verified:
+            applied = apply_transitions(db, [
+                Transition(job_id, PrintStatus.COLLECTED, expected=PrintStatus.PRINTED)
+                for _, job_id in verified
+            ])
+            for (i, _), o in zip(verified, applied):
+                outcomes[i] = PickupOutcome(o.job_id, o.result, o.status, o.detail)
+        return [outcomes[i] for i in range(len(tokens))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+pickup_codes = PickupCodes(
+    max_entries=settings.PICKUP_CODE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PICKUP_CODE_TTL_SECONDS,
+)
+job_events.add_listener(pickup_codes.on_job_event)
@@ -1,2 +1,312 @@
 # -*- coding: utf-8 -*-
+# app/services/pricing_service.py
 
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import ColorMode, PaperSize
+from app.db.session import dialect_insert
+from app.models.job import PrintJob
+from app.models.pricing import PricingVersion, ShopPricing
+
+if TYPE_CHECKING:
+    # numpy is imported by quote_batch, the only code that needs it, to
+    # keep it off the app's import path
+    import numpy as np
+
+
+class PricingNotFound(LookupError):
+    """The shop has no rate for the requested (size, color_mode)."""
+
+
+@dataclass(frozen=True)
+class RateEntry:
+    normal_rate: float
+    bulk_rate: float
+    bulk_threshold: int
+
+
+@dataclass(frozen=True)
+class Quote:
+    final_price: float
+    pricing_snapshot: dict
+    # The entry it was priced against, for pricing_versions.id_for
+    rate: RateEntry
+
+
+@dataclass(frozen=True)
+class BatchQuote:
+    """Column-oriented result of PricingEngine.quote_batch, in input order."""
+    final_price: "np.ndarray"
+    applied_rate: "np.ndarray"
+    units: "np.ndarray"
+    is_bulk: "np.ndarray"
+    found: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.final_price)
+
+
+RateTable = Dict[Tuple[PaperSize, ColorMode], RateEntry]
+
+
+def compile_rate_table(rows: Iterable[ShopPricing]) -> RateTable:
+    """Flatten a shop's ShopPricing rows into a (size, color_mode) lookup."""
+    return {
+        (row.size, row.color_mode): RateEntry(
+            normal_rate=row.normal_rate,
+            bulk_rate=row.bulk_rate,
+            bulk_threshold=row.bulk_threshold,
+        )
+        for row in rows
+    }
+
+
+def price_job(
+    shop_id: UUID,
+    size: PaperSize,
+    color_mode: ColorMode,
+    entry: RateEntry,
+    pages: int,
+    copies: int,
+) -> Quote:
+    """
+    Price a job against one rate entry. The bulk rate applies to the whole
+    job once the printed sheet count (pages x copies) reaches the threshold.
+    """
+    units = pages * copies
+    is_bulk = units >= entry.bulk_threshold
+    applied_rate = entry.bulk_rate if is_bulk else entry.normal_rate
+
+    return Quote(
+        final_price=round(units * applied_rate, 2),
+        pricing_snapshot={
+            "shop_id": str(shop_id),
+            "size": size.value,
+            "color_mode": color_mode.value,
+            "normal_rate": entry.normal_rate,
+            "bulk_rate": entry.bulk_rate,
+            "bulk_threshold": entry.bulk_threshold,
+            "units": units,
+            "applied_rate": applied_rate,
+            "is_bulk": is_bulk,
+        },
+        rate=entry,
+    )
+
+
+class PricingEngine:
+    """
+    Per-process cache of compiled shop rate tables.
+
+    Tables are loaded on first use and dropped by `invalidate` whenever a
+    shop's pricing rows change. Each shop carries a generation counter so a
+    load that raced with an invalidation is not written back to the cache.
+    `invalidate` only reaches this process, so with several workers a table
+    is also reloaded once it is `resync_seconds` old; that bounds how long
+    another worker quotes old rates (0 keeps tables until invalidated,
+    which is only right with a single worker).
+    """
+
+    def __init__(self, resync_seconds: float = 0):
+        self.resync_seconds = resync_seconds
+        self._tables: Dict[UUID, RateTable] = {}
+        self._expires: Dict[UUID, float] = {}
+        self._generations: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, shop_id: UUID) -> Optional[RateTable]:
+        table = self._tables.get(shop_id)
+        if table is not None and self.resync_seconds > 0 and time.monotonic() >= self._expires[shop_id]:
+            return None
+        return table
+
+    def get_table(self, db: Session, shop_id: UUID) -> RateTable:
+        table = self._cached(shop_id)
+        if table is not None:
+            return table
+
+        generation = self._generations.get(shop_id, 0)
+        rows = db.query(ShopPricing).filter(ShopPricing.shop_id == shop_id).all()
+        return self.load(shop_id, rows, generation)
+
+    def get_tables(self, db: Session, shop_ids: Iterable[UUID]) -> Dict[UUID, RateTable]:
+        """Rate tables for many shops, loading every uncached one in a single query."""
+        tables = {}
+        missing = {}
+        for shop_id in set(shop_ids):
+            table = self._cached(shop_id)
+            if table is not None:
+                tables[shop_id] = table
+            else:
+                missing[shop_id] = self._generations.get(shop_id, 0)
+
+        if missing:
+            rows_by_shop = defaultdict(list)
+            rows = db.query(ShopPricing).filter(ShopPricing.shop_id.in_(list(missing))).all()
+            for row in rows:
+                rows_by_shop[row.shop_id].append(row)
+            for shop_id, generation in missing.items():
+                tables[shop_id] = self.load(shop_id, rows_by_shop[shop_id], generation)
+
+        return tables
+
+    def load(
+        self,
+        shop_id: UUID,
+        rows: Iterable[ShopPricing],
+        generation: Optional[int] = None,
+    ) -> RateTable:
+        """Compile rows into the cache, unless the shop was invalidated since `generation`."""
+        table = compile_rate_table(rows)
+        with self._lock:
+            if generation is None or self._generations.get(shop_id, 0) == generation:
+                self._tables[shop_id] = table
+                self._expires[shop_id] = time.monotonic() + self.resync_seconds
+        return table
+
+    def quote(
+        self,
+        db: Session,
+        shop_id: UUID,
+        size: PaperSize,
+        color_mode: ColorMode,
+        pages: int,
+        copies: int,
+    ) -> Quote:
+        entry = self.get_table(db, shop_id).get((size, color_mode))
+        if entry is None:
+            raise PricingNotFound(
+                f"No pricing for {size.value} {color_mode.value} at this shop"
+            )
+        return price_job(shop_id, size, color_mode, entry, pages, copies)
+
+    def quote_batch(self, db: Session, specs: Sequence) -> BatchQuote:
+        """
+        Price many job specs (anything with shop_id, size, color_mode, pages
+        and copies) in one vectorized pass. Specs whose shop has no matching
+        rate come back with found=False and a price of 0.
+        """
+        import numpy as np
+
+        tables = self.get_tables(db, (spec.shop_id for spec in specs))
+
+        # One slot per distinct (shop, size, color) rate, then gather by index
+        slots = {}
+        normal, bulk, threshold = [], [], []
+        for shop_id, table in tables.items():
+            for (size, color_mode), entry in table.items():
+                slots[(shop_id, size, color_mode)] = len(normal)
+                normal.append(entry.normal_rate)
+                bulk.append(entry.bulk_rate)
+                threshold.append(entry.bulk_threshold)
+        # Sentinel slot for specs without a rate
+        normal.append(0.0)
+        bulk.append(0.0)
+        threshold.append(0)
+
+        n = len(specs)
+        missing_slot = len(normal) - 1
+        index = np.fromiter(
+            (slots.get((s.shop_id, s.size, s.color_mode), missing_slot) for s in specs),
+            dtype=np.int64,
+            count=n,
+        )
+        pages = np.fromiter((s.pages for s in specs), dtype=np.int64, count=n)
+        copies = np.fromiter((s.copies for s in specs), dtype=np.int64, count=n)
+
+        units = pages * copies
+        is_bulk = units >= np.asarray(threshold, dtype=np.int64)[index]
+        applied_rate = np.where(
+            is_bulk,
+            np.asarray(bulk, dtype=np.float64)[index],
+            np.asarray(normal, dtype=np.float64)[index],
+        )
+
+        return BatchQuote(
+            final_price=np.round(units * applied_rate, 2),
+            applied_rate=applied_rate,
+            units=units,
+            is_bulk=is_bulk,
+            found=index != missing_slot,
+        )
+
+    def invalidate(self, shop_id: Optional[UUID] = None) -> None:
+        """Drop one shop's table, or every table when shop_id is None."""
+        with self._lock:
+            shop_ids = [shop_id] if shop_id is not None else list(self._tables)
+            for sid in shop_ids:
+                self._tables.pop(sid, None)
+                self._generations[sid] = self._generations.get(sid, 0) + 1
+
+
+pricing_engine = PricingEngine(resync_seconds=settings.PRICING_RESYNC_SECONDS)
+
+
+class PricingVersionRegistry:
+    """
+    Interns rate entries into pricing_versions and remembers their ids.
+
+    Rows are immutable, so an id is cached for the life of the process
+    once its row is committed. A missing row is inserted in a transaction
+    of its own, so the cached id stays valid even if the caller's
+    transaction (typically the job INSERT) rolls back; an unused version
+    row is harmless.
+    """
+
+    def __init__(self):
+        self._ids: Dict[RateEntry, int] = {}
+        self._lock = threading.Lock()
+
+    def id_for(self, db: Session, entry: RateEntry) -> int:
+        version_id = self._ids.get(entry)
+        if version_id is not None:
+            return version_id
+
+        table = PricingVersion.__table__
+        rates = {
+            "normal_rate": entry.normal_rate,
+            "bulk_rate": entry.bulk_rate,
+            "bulk_threshold": entry.bulk_threshold,
+        }
+        with db.get_bind().begin() as connection:
+            connection.execute(
+                dialect_insert(connection.dialect, table)
+                .values(**rates, created_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=list(rates))
+            )
+            version_id = connection.execute(
+                select(table.c.id).where(*(table.c[name] == value for name, value in rates.items()))
+            ).scalar_one()
+
+        with self._lock:
+            self._ids[entry] = version_id
+        return version_id
+
+
+pricing_versions = PricingVersionRegistry()
+
+
+def job_snapshot(job: PrintJob) -> dict:
+    """
+    The pricing_snapshot a job was created with, rebuilt from its pricing
+    version, or the stored one for jobs that predate pricing_versions.
+    """
+    if job.pricing_version_id is None:
+        return job.pricing_snapshot
+    version = job.pricing_version
+    entry = RateEntry(
+        normal_rate=version.normal_rate,
+        bulk_rate=version.bulk_rate,
+        bulk_threshold=version.bulk_threshold,
+    )
+    return price_job(job.shop_id, job.size, job.color_mode, entry, job.pages, job.copies).pricing_snapshot
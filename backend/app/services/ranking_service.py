@@ -0,0 +1,180 @@
+# app/services/ranking_service.py
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import ColorMode, ExecutionMode, PaperSize, PaymentMode, PrintStatus
+from app.models.campus import Campus
+from app.models.job import PrintJob
+from app.models.shop import Shop
+from app.services.event_service import JobEvent, job_events
+from app.services.pricing_service import pricing_engine, price_job
+
+# Jobs a shop still has to print, which a new job would wait behind
+QUEUE_STATUSES = frozenset({PrintStatus.READY_TO_PRINT, PrintStatus.PRINTING})
+
+
+@dataclass
+class ShopEntry:
+    shop_id: UUID
+    name: str
+    execution_mode: ExecutionMode
+    payment_mode: PaymentMode
+    queue_length: int = 0
+
+
+@dataclass
+class CampusIndex:
+    shops: Dict[UUID, ShopEntry]
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class RankedShop:
+    shop: ShopEntry
+    final_price: float
+    applied_rate: float
+    is_bulk: bool
+    queue_length: int
+    estimated_wait_seconds: float
+
+
+class ShopRankingIndex:
+    """
+    Per-process, per-campus index of active shops and their queue depth
+    (READY_TO_PRINT + PRINTING jobs), for ranking shops without touching
+    the database.
+
+    A campus is loaded on first use with two queries. Queue depths then
+    follow job_events as jobs move in and out of the queue, and prices come
+    from pricing_engine, whose per-shop tables are dropped on every pricing
+    change. Shop edits drop the campus via `invalidate`. Events from other
+    worker processes are not seen here, so each campus is reloaded every
+    RANKING_RESYNC_SECONDS to bound the drift.
+    """
+
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self._campuses: Dict[UUID, CampusIndex] = {}
+        self._shop_campus: Dict[UUID, UUID] = {}
+        self._generations: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def campus(self, db: Session, campus_id: UUID) -> Optional[CampusIndex]:
+        """The campus's index, loading it if missing or due; None for an unknown campus."""
+        index = self._campuses.get(campus_id)
+        if index is not None and time.monotonic() < index.expires_at:
+            return index
+
+        generation = self._generations.get(campus_id, 0)
+        index = self._load(db, campus_id)
+        with self._lock:
+            # Not cached if the campus was invalidated while loading
+            if index is not None and self._generations.get(campus_id, 0) == generation:
+                self._drop(campus_id)
+                self._campuses[campus_id] = index
+                for shop_id in index.shops:
+                    self._shop_campus[shop_id] = campus_id
+        return index
+
+    def _load(self, db: Session, campus_id: UUID) -> Optional[CampusIndex]:
+        if db.get(Campus, campus_id) is None:
+            return None
+        shops = {
+            row.id: ShopEntry(row.id, row.name, row.execution_mode, row.payment_mode)
+            for row in db.execute(
+                select(Shop.id, Shop.name, Shop.execution_mode, Shop.payment_mode)
+                .where(Shop.campus_id == campus_id, Shop.is_active)
+            )
+        }
+        if shops:
+            depths = db.execute(
+                select(PrintJob.shop_id, func.count())
+                .where(PrintJob.shop_id.in_(list(shops)), PrintJob.status.in_(QUEUE_STATUSES))
+                .group_by(PrintJob.shop_id)
+            )
+            for shop_id, count in depths:
+                shops[shop_id].queue_length = count
+        return CampusIndex(shops=shops, expires_at=time.monotonic() + self.resync_seconds)
+
+    def on_job_event(self, event: JobEvent) -> None:
+        entered = event.status in QUEUE_STATUSES
+        left = event.previous in QUEUE_STATUSES
+        if entered == left:
+            return
+        with self._lock:
+            campus_id = self._shop_campus.get(event.shop_id)
+            if campus_id is None:
+                return
+            shop = self._campuses[campus_id].shops[event.shop_id]
+            shop.queue_length = max(0, shop.queue_length + (1 if entered else -1))
+
+    def invalidate(self, campus_id: Optional[UUID] = None) -> None:
+        """Drop one campus, or every campus when campus_id is None."""
+        with self._lock:
+            campus_ids = [campus_id] if campus_id is not None else list(self._campuses)
+            for cid in campus_ids:
+                self._drop(cid)
+                self._generations[cid] = self._generations.get(cid, 0) + 1
+
+    def _drop(self, campus_id: UUID) -> None:
+        index = self._campuses.pop(campus_id, None)
+        if index is not None:
+            for shop_id in index.shops:
+                self._shop_campus.pop(shop_id, None)
+
+    def rank(
+        self,
+        db: Session,
+        campus_id: UUID,
+        size: PaperSize,
+        color_mode: ColorMode,
+        pages: int,
+        copies: int,
+        by: str = "price",
+    ) -> Optional[List[RankedShop]]:
+        """
+        The campus's active shops that can print this job, cheapest first
+        (then shortest wait), or shortest wait first when `by` is "wait".
+        None for an unknown campus.
+        """
+        index = self.campus(db, campus_id)
+        if index is None:
+            return None
+
+        shops = list(index.shops.values())
+        tables = pricing_engine.get_tables(db, (shop.shop_id for shop in shops))
+        seconds_per_job = settings.RANKING_SECONDS_PER_QUEUED_JOB
+
+        ranked = []
+        for shop in shops:
+            entry = tables[shop.shop_id].get((size, color_mode))
+            if entry is None:
+                continue
+            quote = price_job(shop.shop_id, size, color_mode, entry, pages, copies)
+            queue_length = shop.queue_length
+            ranked.append(RankedShop(
+                shop=shop,
+                final_price=quote.final_price,
+                applied_rate=quote.pricing_snapshot["applied_rate"],
+                is_bulk=quote.pricing_snapshot["is_bulk"],
+                queue_length=queue_length,
+                estimated_wait_seconds=queue_length * seconds_per_job,
+            ))
+
+        if by == "wait":
+            ranked.sort(key=lambda r: (r.estimated_wait_seconds, r.final_price))
+        else:
+            ranked.sort(key=lambda r: (r.final_price, r.estimated_wait_seconds))
+        return ranked
+
+
+shop_rankings = ShopRankingIndex(resync_seconds=settings.RANKING_RESYNC_SECONDS)
+job_events.add_listener(shop_rankings.on_job_event)
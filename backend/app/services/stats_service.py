@@ -0,0 +1,255 @@
+# app/services/stats_service.py
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, Select, and_, case, delete, event, func, inspect, or_, select, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.constants import ColorMode, PaperSize, PrintStatus
+from app.db.session import dialect_insert
+from app.models.job import ArchivedPrintJob, PrintJob
+from app.models.payment import Payment, PaymentStatus
+from app.models.stats import ShopDailyStats
+
+# A job counts towards volume once it has been printed
+PRINTED_STATUSES = (PrintStatus.PRINTED, PrintStatus.COLLECTED)
+
+StatsKey = Tuple[UUID, date, PaperSize, ColorMode]
+
+
+@dataclass
+class StatsDelta:
+    jobs: int = 0
+    pages: int = 0
+    revenue: float = 0.0
+
+
+def job_key(job: PrintJob) -> StatsKey:
+    return job.shop_id, job.created_at.date(), job.size, job.color_mode
+
+
+def transition_delta(
+    job: PrintJob,
+    previous: Optional[PrintStatus],
+    status: PrintStatus,
+    paid_online: bool,
+) -> StatsDelta:
+    """
+    Rollup change for a job moving from `previous` to `status`. Volume is
+    counted on the first move into PRINTED/COLLECTED; a COLLECTED job with
+    no successful payment was paid at the counter, so its price is revenue.
+    """
+    delta = StatsDelta()
+    if status in PRINTED_STATUSES and previous not in PRINTED_STATUSES:
+        delta.jobs = 1
+        delta.pages = job.pages * job.copies
+    if status == PrintStatus.COLLECTED and previous != PrintStatus.COLLECTED and not paid_online:
+        delta.revenue = job.final_price
+    return delta
+
+
+def payment_delta(job: PrintJob, job_status: PrintStatus, amount: float) -> StatsDelta:
+    """Rollup change for a payment that just succeeded on a job in `job_status`."""
+    if job_status == PrintStatus.COLLECTED:
+        # Already counted at the counter price; replace it with what was paid
+        return StatsDelta(revenue=amount - job.final_price)
+    return StatsDelta(revenue=amount)
+
+
+def apply_deltas(connection: Connection, deltas: Iterable[Tuple[StatsKey, StatsDelta]]) -> None:
+    """Add deltas to the rollup rows, creating them as needed, in the caller's transaction."""
+    rows = [
+        {
+            "shop_id": shop_id,
+            "day": day,
+            "size": size,
+            "color_mode": color_mode,
+            "jobs": d.jobs,
+            "pages": d.pages,
+            "revenue": d.revenue,
+        }
+        for (shop_id, day, size, color_mode), d in deltas
+        if d.jobs or d.pages or d.revenue
+    ]
+    if not rows:
+        return
+
+    table = ShopDailyStats.__table__
+    stmt = dialect_insert(connection.dialect, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.shop_id, table.c.day, table.c.size, table.c.color_mode],
+        set_={
+            "jobs": table.c.jobs + stmt.excluded.jobs,
+            "pages": table.c.pages + stmt.excluded.pages,
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+        },
+    )
+    # Lock order: sort so concurrent writers touch rows in the same order
+    rows.sort(key=lambda r: (str(r["shop_id"]), r["day"], r["size"].name, r["color_mode"].name))
+    for row in rows:
+        connection.execute(stmt, row)
+
+
+# ---------------------------
+# ORM hook
+# ---------------------------
+
+def _has_successful_payment(session: Session, job: PrintJob) -> bool:
+    payment = job.__dict__.get("payment")
+    if payment is not None:
+        return payment.status == PaymentStatus.SUCCESS
+    return session.execute(
+        select(Payment.id).where(Payment.job_id == job.id, Payment.status == PaymentStatus.SUCCESS)
+    ).first() is not None
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_rollups(session: Session, flush_context) -> None:
+    """
+    Keep shop_daily_stats in step with PrintJob.status and Payment.status
+    changes made through the ORM, in the same transaction as the change.
+    Bulk Core UPDATEs must call apply_deltas themselves.
+    """
+    deltas: List[Tuple[StatsKey, StatsDelta]] = []
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, PrintJob):
+            history = inspect(obj).attrs.status.history
+            if not history.added:
+                continue
+            previous = history.deleted[0] if history.deleted else None
+            delta = transition_delta(
+                obj, previous, obj.status,
+                paid_online=obj.status == PrintStatus.COLLECTED and _has_successful_payment(session, obj),
+            )
+            deltas.append((job_key(obj), delta))
+
+        elif isinstance(obj, Payment):
+            if obj.status != PaymentStatus.SUCCESS or not inspect(obj).attrs.status.history.added:
+                continue
+            job = obj.job if "job" in obj.__dict__ else session.get(PrintJob, obj.job_id)
+            if job is None:
+                continue
+            # If the job changed status in this same flush, its transition
+            # delta already saw this payment; price against the old status
+            job_history = inspect(job).attrs.status.history
+            job_status = job_history.deleted[0] if job_history.deleted else job.status
+            deltas.append((job_key(job), payment_delta(job, job_status, obj.amount)))
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+# ---------------------------
+# Rebuild and reads
+# ---------------------------
+
+def rollup_source(shop_id: Optional[UUID] = None) -> Select:
+    """
+    The GROUP BY over print_jobs/payments that shop_daily_stats
+    materializes, with columns in table order.
+    """
+    printed = PrintJob.status.in_(PRINTED_STATUSES)
+    paid = Payment.status == PaymentStatus.SUCCESS
+    day = func.date(PrintJob.created_at, type_=Date)
+
+    source = (
+        select(
+            PrintJob.shop_id,
+            day.label("day"),
+            PrintJob.size,
+            PrintJob.color_mode,
+            func.count(case((printed, 1))).label("jobs"),
+            func.coalesce(func.sum(case((printed, PrintJob.pages * PrintJob.copies))), 0).label("pages"),
+            func.coalesce(func.sum(case(
+                (paid, Payment.amount),
+                (PrintJob.status == PrintStatus.COLLECTED, PrintJob.final_price),
+            )), 0.0).label("revenue"),
+        )
+        .select_from(PrintJob)
+        .outerjoin(Payment, and_(Payment.job_id == PrintJob.id, paid))
+        .where(or_(printed, paid))
+        .group_by(PrintJob.shop_id, day, PrintJob.size, PrintJob.color_mode)
+    )
+    if shop_id is not None:
+        source = source.where(PrintJob.shop_id == shop_id)
+    return source
+
+
+def archived_rollup_source(shop_id: Optional[UUID] = None) -> Select:
+    """rollup_source over print_jobs_archive, where the payment is part of the row."""
+    job = ArchivedPrintJob
+    printed = job.status.in_(PRINTED_STATUSES)
+    paid = job.payment_status == PaymentStatus.SUCCESS
+    day = func.date(job.created_at, type_=Date)
+
+    source = (
+        select(
+            job.shop_id,
+            day.label("day"),
+            job.size,
+            job.color_mode,
+            func.count(case((printed, 1))).label("jobs"),
+            func.coalesce(func.sum(case((printed, job.pages * job.copies))), 0).label("pages"),
+            func.coalesce(func.sum(case(
+                (paid, job.payment_amount),
+                (job.status == PrintStatus.COLLECTED, job.final_price),
+            )), 0.0).label("revenue"),
+        )
+        .where(or_(printed, paid))
+        .group_by(job.shop_id, day, job.size, job.color_mode)
+    )
+    if shop_id is not None:
+        source = source.where(job.shop_id == shop_id)
+    return source
+
+
+def rebuild(db: Session, shop_id: Optional[UUID] = None) -> int:
+    """
+    Recompute shop_daily_stats from print_jobs and payments plus
+    print_jobs_archive (one shop, or all) with a single INSERT ... SELECT.
+    Returns the number of rollup rows.
+    """
+    table = ShopDailyStats.__table__
+    clear = delete(table)
+    if shop_id is not None:
+        clear = clear.where(table.c.shop_id == shop_id)
+
+    # A day can have both live and archived jobs
+    both = union_all(rollup_source(shop_id), archived_rollup_source(shop_id)).subquery()
+    combined = select(
+        both.c.shop_id,
+        both.c.day,
+        both.c.size,
+        both.c.color_mode,
+        func.sum(both.c.jobs),
+        func.sum(both.c.pages),
+        func.sum(both.c.revenue),
+    ).group_by(both.c.shop_id, both.c.day, both.c.size, both.c.color_mode)
+
+    db.execute(clear)
+    result = db.execute(
+        table.insert().from_select(
+            ["shop_id", "day", "size", "color_mode", "jobs", "pages", "revenue"],
+            combined,
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def shop_stats(db: Session, shop_id: UUID, start: date, end: date) -> List[ShopDailyStats]:
+    """Rollup rows for a shop with start <= day <= end, by day."""
+    return db.execute(
+        select(ShopDailyStats)
+        .where(
+            ShopDailyStats.shop_id == shop_id,
+            ShopDailyStats.day >= start,
+            ShopDailyStats.day <= end,
+        )
+        .order_by(ShopDailyStats.day, ShopDailyStats.size, ShopDailyStats.color_mode)
+    ).scalars().all()
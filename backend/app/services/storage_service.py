@@ -1,2 +1,143 @@
 # -*- coding: utf-8 -*-
+# app/services/storage_service.py
 
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import PrintJob
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+GC_BATCH_SIZE = 1000
+
+
+@dataclass
+class GcResult:
+    scanned: int = 0
+    deleted: int = 0
+    freed_bytes: int = 0
+
+
+class LocalBlobStorage:
+    """
+    Content-addressed blob store on the local filesystem.
+
+    Blobs live at <root>/<h[0:2]>/<h[2:4]>/<h>, so identical uploads share one
+    file. Blobs are reference-counted by the PrintJob rows carrying their
+    hash in `file_hash`; `collect_garbage` removes the ones nothing points at.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, sha256: str) -> str:
+        if not SHA256_RE.match(sha256):
+            raise ValueError("Invalid SHA-256 digest")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.isfile(self.path_for(sha256))
+
+    def touch(self, sha256: str) -> bool:
+        """Mark a blob as recently used so GC's grace period covers it. False if missing."""
+        try:
+            os.utime(self.path_for(sha256))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def put(self, src_path: str, sha256: str) -> str:
+        """
+        Move a received file into the store. If the blob already exists the
+        file is dropped instead (deduplication). Returns the blob path.
+        """
+        dest = self.path_for(sha256)
+        if self.touch(sha256):
+            os.remove(src_path)
+            return dest
+
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(src_path, dest)
+        return dest
+
+    def iter_blobs(self) -> Iterator[str]:
+        if not os.path.isdir(self.root):
+            return
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if SHA256_RE.match(name):
+                    yield os.path.join(dirpath, name)
+
+    def delete(self, sha256: str) -> int:
+        path = self.path_for(sha256)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+
+storage = LocalBlobStorage(settings.STORAGE_DIR)
+
+
+def reference_counts(db: Session, hashes: Iterable[str]) -> Dict[str, int]:
+    hashes = list(hashes)
+    if not hashes:
+        return {}
+    rows = (
+        db.query(PrintJob.file_hash, func.count(PrintJob.id))
+        .filter(PrintJob.file_hash.in_(hashes))
+        .group_by(PrintJob.file_hash)
+        .all()
+    )
+    return dict(rows)
+
+
+def collect_garbage(
+    db: Session,
+    store: LocalBlobStorage = storage,
+    grace_seconds: Optional[int] = None,
+    dry_run: bool = False,
+) -> GcResult:
+    """
+    Delete blobs no PrintJob references. Blobs used within the grace period
+    are kept, which covers uploads whose job row is not committed yet.
+    """
+    if grace_seconds is None:
+        grace_seconds = settings.BLOB_GC_GRACE_SECONDS
+    cutoff = time.time() - grace_seconds
+    result = GcResult()
+
+    batch: List[str] = []
+
+    def flush():
+        referenced = reference_counts(db, batch)
+        for sha256 in batch:
+            if sha256 in referenced:
+                continue
+            try:
+                if os.path.getmtime(store.path_for(sha256)) > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            result.deleted += 1
+            if not dry_run:
+                result.freed_bytes += store.delete(sha256)
+        batch.clear()
+
+    for path in store.iter_blobs():
+        result.scanned += 1
+        batch.append(os.path.basename(path))
+        if len(batch) >= GC_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+    return result
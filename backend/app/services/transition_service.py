@@ -0,0 +1,154 @@
+# app/services/transition_service.py
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import case, literal, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.constants import PrintStatus
+from app.models.job import PrintJob
+from app.models.payment import Payment, PaymentStatus
+from app.services.event_service import job_events
+from app.services.stats_service import apply_deltas, job_key, transition_delta
+
+APPLIED = "applied"
+CONFLICT = "conflict"
+INVALID = "invalid"
+NOT_FOUND = "not_found"
+
+ALLOWED_TRANSITIONS: Dict[PrintStatus, FrozenSet[PrintStatus]] = {
+    PrintStatus.UPLOADED: frozenset({
+        PrintStatus.PAYMENT_PENDING,
+        PrintStatus.PAYMENT_CONFIRMED,
+        PrintStatus.READY_TO_PRINT,
+        PrintStatus.CANCELLED,
+    }),
+    PrintStatus.PAYMENT_PENDING: frozenset({PrintStatus.PAYMENT_CONFIRMED, PrintStatus.CANCELLED}),
+    PrintStatus.PAYMENT_CONFIRMED: frozenset({PrintStatus.READY_TO_PRINT, PrintStatus.CANCELLED}),
+    PrintStatus.READY_TO_PRINT: frozenset({
+        PrintStatus.PRINTING,
+        PrintStatus.PRINTED,
+        PrintStatus.CANCELLED,
+    }),
+    # A failed print goes back to the queue
+    PrintStatus.PRINTING: frozenset({PrintStatus.PRINTED, PrintStatus.READY_TO_PRINT}),
+    PrintStatus.PRINTED: frozenset({PrintStatus.COLLECTED}),
+    PrintStatus.COLLECTED: frozenset(),
+    PrintStatus.CANCELLED: frozenset(),
+}
+
+
+def can_transition(current: PrintStatus, target: PrintStatus) -> bool:
+    return target in ALLOWED_TRANSITIONS[current]
+
+
+@dataclass
+class Transition:
+    job_id: UUID
+    to: PrintStatus
+    # The status the caller last saw; the current one is read when omitted
+    expected: Optional[PrintStatus] = None
+
+
+@dataclass
+class TransitionOutcome:
+    job_id: UUID
+    result: str
+    # The job's status after the call, when known
+    status: Optional[PrintStatus]
+    detail: Optional[str] = None
+
+
+def _current_statuses(db: Session, job_ids) -> Dict[UUID, PrintStatus]:
+    if not job_ids:
+        return {}
+    return dict(db.execute(select(PrintJob.id, PrintJob.status).where(PrintJob.id.in_(job_ids))).all())
+
+
+def apply_transitions(db: Session, transitions: Sequence[Transition]) -> List[TransitionOutcome]:
+    """
+    Apply a batch of status changes with one conditional UPDATE and no row
+    locks taken up front.
+
+    Each change is applied only if the job is still in its expected status
+    (`WHERE (id, status) IN (...)`); a job moved on by someone else in the
+    meantime is reported as a conflict with its current status. Edges not
+    in ALLOWED_TRANSITIONS are rejected without touching the row. The
+    shop_daily_stats rollup is updated in the same transaction and job
+    events are published after commit. Outcomes are in request order.
+    """
+    outcomes: Dict[int, TransitionOutcome] = {}
+    unread = {t.job_id for t in transitions if t.expected is None}
+    current = _current_statuses(db, unread)
+
+    candidates: Dict[UUID, tuple] = {}
+    seen = set()
+    for i, t in enumerate(transitions):
+        if t.job_id in seen:
+            outcomes[i] = TransitionOutcome(t.job_id, INVALID, None, "Job appears more than once in the batch")
+            continue
+        seen.add(t.job_id)
+        expected = t.expected if t.expected is not None else current.get(t.job_id)
+        if expected is None:
+            outcomes[i] = TransitionOutcome(t.job_id, NOT_FOUND, None, "Job not found")
+        elif not can_transition(expected, t.to):
+            outcomes[i] = TransitionOutcome(
+                t.job_id, INVALID, current.get(t.job_id),
+                f"Cannot move a job from {expected.value} to {t.to.value}",
+            )
+        else:
+            candidates[t.job_id] = (i, expected, t.to)
+
+    applied = []
+    if candidates:
+        status_type = PrintJob.__table__.c.status.type
+        rows = db.execute(
+            update(PrintJob)
+            .where(tuple_(PrintJob.id, PrintJob.status).in_(
+                [(job_id, expected) for job_id, (_, expected, _) in candidates.items()]
+            ))
+            .values(
+                status=case(
+                    {job_id: literal(to, status_type) for job_id, (_, _, to) in candidates.items()},
+                    value=PrintJob.id,
+                ),
+                updated_at=datetime.utcnow(),
+            )
+            .returning(
+                PrintJob.id, PrintJob.shop_id, PrintJob.created_at, PrintJob.size,
+                PrintJob.color_mode, PrintJob.pages, PrintJob.copies, PrintJob.final_price,
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        applied = [(row, candidates[row.id][1], candidates[row.id][2]) for row in rows]
+
+        missed = set(candidates) - {row.id for row in rows}
+        now_current = _current_statuses(db, missed)
+        for job_id in missed:
+            i, expected, _ = candidates[job_id]
+            status = now_current.get(job_id)
+            if status is None:
+                outcomes[i] = TransitionOutcome(job_id, NOT_FOUND, None, "Job not found")
+            else:
+                outcomes[i] = TransitionOutcome(
+                    job_id, CONFLICT, status, f"Job is {status.value}, not {expected.value}"
+                )
+
+        collected = [row.id for row, _, to in applied if to == PrintStatus.COLLECTED]
+        paid = set(db.execute(
+            select(Payment.job_id).where(Payment.job_id.in_(collected), Payment.status == PaymentStatus.SUCCESS)
+        ).scalars()) if collected else set()
+        apply_deltas(db.connection(), [
+            (job_key(row), transition_delta(row, previous, to, paid_online=row.id in paid))
+            for row, previous, to in applied
+        ])
+
+    db.commit()
+
+    for row, previous, to in applied:
+        job_events.publish(row.shop_id, row.id, to, previous)
+        outcomes[candidates[row.id][0]] = TransitionOutcome(row.id, APPLIED, to)
+    return [outcomes[i] for i in range(len(transitions))]
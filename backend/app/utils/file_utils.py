@@ -1,2 +1,170 @@
 # -*- coding: utf-8 -*-
+# app/utils/file_utils.py
 
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+from multipart.exceptions import FormParserError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+
+class UploadError(ValueError):
+    """The multipart body is malformed or exceeds the configured limits."""
+
+
+class UploadTooLarge(UploadError):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    filename: str
+
+
+@dataclass
+class MultipartUpload:
+    fields: Dict[str, str] = field(default_factory=dict)
+    file: Optional[StoredUpload] = None
+
+
+class _PartCollector:
+    """
+    MultipartParser callbacks. The parser is synchronous, so file data is
+    only queued here and written out by `receive_multipart` between chunks.
+    """
+
+    def __init__(self):
+        self.header_field = b""
+        self.header_value = b""
+        self.name = None
+        self.filename = None
+        self.value = bytearray()
+        self.fields: Dict[str, str] = {}
+        self.file_chunks: List[bytes] = []
+        self.file_started = False
+        self.file_parts = 0
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+        }
+
+    def on_part_begin(self):
+        self.name = None
+        self.filename = None
+        self.value = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        if self.header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(self.header_value)
+            self.name = options.get(b"name", b"").decode()
+            if b"filename" in options:
+                self.filename = os.path.basename(options[b"filename"].decode())
+                self.file_parts += 1
+                if self.file_parts > 1:
+                    raise UploadError("Only one file per upload is supported")
+                self.file_started = True
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_part_data(self, data, start, end):
+        if self.filename is not None:
+            self.file_chunks.append(bytes(data[start:end]))
+        else:
+            self.value += data[start:end]
+            if len(self.value) > 64 * 1024:
+                raise UploadError("Form field too large")
+
+    def on_part_end(self):
+        if self.filename is None and self.name:
+            self.fields[self.name] = self.value.decode()
+
+
+async def receive_multipart(
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    dest_dir: str,
+    max_bytes: int,
+) -> MultipartUpload:
+    """
+    Parse a multipart/form-data body as it arrives, writing the single file
+    part to `dest_dir` and hashing it chunk by chunk. Memory use is bounded
+    by the transport chunk size, independent of the file size. The file is
+    left at a temporary `.part` path; callers move it into storage.
+    """
+    media_type, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise UploadError("Expected multipart/form-data")
+
+    os.makedirs(dest_dir, exist_ok=True)
+    path = os.path.join(dest_dir, f"{uuid.uuid4().hex}.part")
+    collector = _PartCollector()
+    parser = MultipartParser(boundary, collector.callbacks())
+    digest = hashlib.sha256()
+    size = 0
+    out = None
+
+    try:
+        async for chunk in chunks:
+            parser.write(chunk)
+            if not collector.file_chunks:
+                continue
+
+            data = b"".join(collector.file_chunks)
+            collector.file_chunks.clear()
+            size += len(data)
+            if size > max_bytes:
+                raise UploadTooLarge(f"File exceeds {max_bytes} bytes")
+
+            if out is None:
+                out = open(path, "wb")
+            digest.update(data)
+            await run_in_threadpool(out.write, data)
+        parser.finalize()
+    except Exception as exc:
+        if out is not None:
+            out.close()
+        if os.path.exists(path):
+            os.remove(path)
+        # Unparseable framing, or a form field that is not UTF-8
+        if isinstance(exc, (FormParserError, UnicodeDecodeError)):
+            raise UploadError(f"Malformed multipart body: {exc}") from exc
+        raise
+
+    result = MultipartUpload(fields=collector.fields)
+    if collector.file_started:
+        if out is None:
+            # Empty file part
+            out = open(path, "wb")
+        out.close()
+        result.file = StoredUpload(
+            path=path,
+            sha256=digest.hexdigest(),
+            size=size,
+            filename=collector.filename,
+        )
+    return result
+
+
+def discard(upload: Optional[StoredUpload]) -> None:
+    if upload is not None and os.path.exists(upload.path):
+        os.remove(upload.path)
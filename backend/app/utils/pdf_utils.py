@@ -1,2 +1,378 @@
 # -*- coding: utf-8 -*-
+# app/utils/pdf_utils.py
 
+import mmap
+import os
+import re
+import shutil
+import subprocess
+import time
+import uuid
+import zlib
+from typing import Dict, Optional, Tuple
+
+# Only the tail of the file is needed to find the last cross-reference section
+TAIL_BYTES = 4096
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_ROOT_RE = re.compile(rb"/Root\s+(\d+)\s+(\d+)\s+R")
+_PREV_RE = re.compile(rb"/Prev\s+(\d+)")
+_XREFSTM_RE = re.compile(rb"/XRefStm\s+(\d+)")
+_PAGES_RE = re.compile(rb"/Pages\s+(\d+)\s+(\d+)\s+R")
+_COUNT_RE = re.compile(rb"/Count\s+(\d+)(?:\s+(\d+)\s+R)?")
+_LENGTH_RE = re.compile(rb"/Length\s+(\d+)(?!\s+\d+\s+R)")
+_W_RE = re.compile(rb"/W\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s*\]")
+_INDEX_RE = re.compile(rb"/Index\s*\[([\d\s]+)\]")
+_SIZE_RE = re.compile(rb"/Size\s+(\d+)")
+_COLUMNS_RE = re.compile(rb"/Columns\s+(\d+)")
+_PREDICTOR_RE = re.compile(rb"/Predictor\s+(\d+)")
+_N_RE = re.compile(rb"/N\s+(\d+)")
+_FIRST_RE = re.compile(rb"/First\s+(\d+)")
+_PAGE_OBJECT_RE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+# xref subsection header "start count", ending in CR, LF or CRLF
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\r|\n)")
+
+# Paper sizes in PostScript points (portrait)
+PAPER_POINTS = {
+    "A4": (595.276, 841.89),
+    "A3": (841.89, 1190.551),
+}
+
+# xref entries: ("offset", byte_offset) or ("objstm", stream_object_number, index)
+XrefEntry = Tuple
+Xref = Dict[int, XrefEntry]
+
+
+class PdfError(ValueError):
+    """The file is not a PDF we can count pages in."""
+
+
+def count_pages(path: str) -> int:
+    """
+    Page count of the PDF at `path`, read through an mmap.
+
+    The count comes from the /Count of the root page tree node, located via
+    startxref -> xref (tables, streams and /Prev chains) -> catalog -> /Pages,
+    so only the tail of the file and a handful of objects are ever touched.
+    Files with a damaged xref fall back to a scan for /Type /Page objects.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise PdfError("File is empty")
+
+        with mm:
+            if mm.find(b"%PDF-", 0, 1024) == -1:
+                raise PdfError("File is not a PDF")
+
+            try:
+                count = _count_from_page_tree(mm)
+            except (PdfError, ValueError, IndexError, zlib.error):
+                count = None
+
+            if count is None:
+                count = len(_PAGE_OBJECT_RE.findall(mm))
+
+    if count <= 0:
+        raise PdfError("PDF has no pages")
+    return count
+
+
+def _count_from_page_tree(mm: mmap.mmap) -> Optional[int]:
+    tail_start = max(0, len(mm) - TAIL_BYTES)
+    matches = list(_STARTXREF_RE.finditer(mm, tail_start))
+    if not matches:
+        return None
+
+    xref, trailer = _read_xref_chain(mm, int(matches[-1].group(1)))
+    root = _ROOT_RE.search(trailer)
+    if not root:
+        return None
+
+    catalog = _object_body(mm, xref, int(root.group(1)))
+    pages = _PAGES_RE.search(catalog)
+    if not pages:
+        return None
+
+    count = _COUNT_RE.search(_object_body(mm, xref, int(pages.group(1))))
+    if not count:
+        return None
+    if count.group(2) is not None:
+        # /Count stored as an indirect integer object
+        return int(_object_body(mm, xref, int(count.group(1))).split()[0])
+    return int(count.group(1))
+
+
+# ---------------------------
+# Cross-reference sections
+# ---------------------------
+
+def _read_xref_chain(mm: mmap.mmap, offset: int) -> Tuple[Xref, bytes]:
+    """Merge every xref section reachable from `offset`; newer entries win."""
+    xref: Xref = {}
+    newest_trailer = None
+    seen = set()
+    pending = [offset]
+
+    while pending:
+        offset = pending.pop(0)
+        if offset in seen or offset >= len(mm):
+            continue
+        seen.add(offset)
+
+        if mm[offset:offset + 4] == b"xref":
+            entries, trailer = _read_xref_table(mm, offset)
+        else:
+            entries, trailer = _read_xref_stream(mm, offset)
+
+        for num, entry in entries.items():
+            xref.setdefault(num, entry)
+        if newest_trailer is None:
+            newest_trailer = trailer
+
+        # Hybrid files point at an xref stream from a classic trailer
+        xrefstm = _XREFSTM_RE.search(trailer)
+        if xrefstm:
+            pending.insert(0, int(xrefstm.group(1)))
+        prev = _PREV_RE.search(trailer)
+        if prev:
+            pending.append(int(prev.group(1)))
+
+    return xref, newest_trailer or b""
+
+
+def _read_xref_table(mm: mmap.mmap, offset: int) -> Tuple[Xref, bytes]:
+    entries: Xref = {}
+    pos = offset + 4
+    trailer_at = mm.find(b"trailer", pos)
+    if trailer_at == -1:
+        raise PdfError("xref table without trailer")
+
+    while pos < trailer_at:
+        # Matched within the table, so a malformed one never reads past it
+        subsection = _SUBSECTION_RE.match(mm, pos, trailer_at)
+        if not subsection:
+            break
+        pos = subsection.end()
+        start = int(subsection.group(1))
+        count = min(int(subsection.group(2)), (trailer_at - pos) // 20)
+        # Entries are fixed-width: "oooooooooo ggggg n\r\n"
+        for i in range(count):
+            entry = mm[pos + 20 * i:pos + 20 * i + 18]
+            if entry[17:18] == b"n":
+                entries[start + i] = ("offset", int(entry[:10]))
+        pos += 20 * count
+
+    trailer_end = mm.find(b"startxref", trailer_at)
+    return entries, mm[trailer_at:trailer_end if trailer_end != -1 else trailer_at + TAIL_BYTES]
+
+
+def _read_xref_stream(mm: mmap.mmap, offset: int) -> Tuple[Xref, bytes]:
+    header, data = _read_stream(mm, offset)
+    widths = _W_RE.search(header)
+    if not widths:
+        raise PdfError("xref stream without /W")
+    w = [int(x) for x in widths.groups()]
+    row = sum(w)
+    if row == 0:
+        raise PdfError("xref stream with empty /W")
+
+    index = _INDEX_RE.search(header)
+    if index:
+        numbers = [int(x) for x in index.group(1).split()]
+        sections = list(zip(numbers[::2], numbers[1::2]))
+    else:
+        sections = [(0, _int_key(_SIZE_RE, header, "xref stream without /Size or /Index"))]
+
+    entries: Xref = {}
+    pos = 0
+    for start, count in sections:
+        # Never more rows than the stream holds
+        for i in range(min(count, (len(data) - pos) // row)):
+            fields = []
+            field_pos = pos
+            for width in w:
+                fields.append(int.from_bytes(data[field_pos:field_pos + width], "big"))
+                field_pos += width
+            pos += row
+            kind = fields[0] if w[0] else 1
+            if kind == 1:
+                entries[start + i] = ("offset", fields[1])
+            elif kind == 2:
+                entries[start + i] = ("objstm", fields[1], fields[2])
+
+    return entries, header
+
+
+# ---------------------------
+# Objects and streams
+# ---------------------------
+
+def _object_body(mm: mmap.mmap, xref: Xref, num: int) -> bytes:
+    entry = xref.get(num)
+    if entry is None:
+        raise PdfError(f"object {num} not in xref")
+
+    if entry[0] == "offset":
+        end = mm.find(b"endobj", entry[1])
+        if end == -1:
+            raise PdfError(f"object {num} is not terminated")
+        return mm[entry[1]:end]
+
+    _, stream_num, index = entry
+    stream = xref.get(stream_num)
+    if stream is None or stream[0] != "offset":
+        raise PdfError(f"object stream {stream_num} not in xref")
+    header, data = _read_stream(mm, stream[1])
+    n = _int_key(_N_RE, header, f"object stream {stream_num} without /N")
+    first = _int_key(_FIRST_RE, header, f"object stream {stream_num} without /First")
+    pairs = data[:first].split()
+    offsets = [int(x) for x in pairs[1:2 * n:2]]
+    if index >= len(offsets):
+        raise PdfError(f"object {num} not in object stream {stream_num}")
+    start = first + offsets[index]
+    end = first + offsets[index + 1] if index + 1 < n else len(data)
+    return data[start:end]
+
+
+def _int_key(pattern: re.Pattern, header: bytes, missing: str) -> int:
+    """The integer value `pattern` captures in a dictionary; PdfError(missing) if absent."""
+    match = pattern.search(header)
+    if not match:
+        raise PdfError(missing)
+    return int(match.group(1))
+
+
+def _read_stream(mm: mmap.mmap, offset: int) -> Tuple[bytes, bytes]:
+    """Dictionary and decoded data of the stream object at `offset`."""
+    keyword = mm.find(b"stream", offset)
+    if keyword == -1:
+        raise PdfError("expected a stream object")
+    header = mm[offset:keyword]
+
+    start = keyword + len(b"stream")
+    if mm[start:start + 2] == b"\r\n":
+        start += 2
+    elif mm[start:start + 1] in (b"\n", b"\r"):
+        start += 1
+
+    length = _LENGTH_RE.search(header)
+    end = start + int(length.group(1)) if length else mm.find(b"endstream", start)
+    data = mm[start:end]
+
+    if b"/FlateDecode" in header:
+        data = zlib.decompress(data)
+    predictor = _PREDICTOR_RE.search(header)
+    if predictor and int(predictor.group(1)) >= 10:
+        columns = _COLUMNS_RE.search(header)
+        data = _undo_png_predictor(data, int(columns.group(1)) if columns else 1)
+    return header, data
+
+
+def _undo_png_predictor(data: bytes, columns: int) -> bytes:
+    out = bytearray()
+    prev = bytearray(columns)
+    stride = columns + 1
+    for pos in range(0, len(data), stride):
+        kind, row = data[pos], bytearray(data[pos + 1:pos + stride])
+        if kind == 1:
+            for i in range(1, len(row)):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif kind == 2:
+            for i in range(len(row)):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif kind != 0:
+            raise PdfError(f"unsupported PNG predictor {kind}")
+        out += row
+        prev = row
+    return bytes(out)
+
+
+# ---------------------------
+# Print preprocessing
+# ---------------------------
+
+def fit_to_paper(src: str, dst: str, paper_size: str) -> None:
+    """
+    Scale every page to fit the paper size, keeping aspect ratio and
+    orientation, and centre it on a page of exactly that size.
+    """
+    from pypdf import PdfReader, PdfWriter, Transformation
+    from pypdf.generic import RectangleObject
+
+    paper_w, paper_h = PAPER_POINTS[paper_size]
+    reader = PdfReader(src)
+    writer = PdfWriter()
+
+    for page in reader.pages:
+        if page.rotation:
+            page.transfer_rotation_to_content()
+        box = page.mediabox
+        width, height = float(box.width), float(box.height)
+        target_w, target_h = (paper_h, paper_w) if width > height else (paper_w, paper_h)
+
+        factor = min(target_w / width, target_h / height)
+        offset_x = (target_w - width * factor) / 2 - float(box.left) * factor
+        offset_y = (target_h - height * factor) / 2 - float(box.bottom) * factor
+        page.add_transformation(Transformation().scale(factor).translate(offset_x, offset_y))
+
+        page.mediabox = RectangleObject([0, 0, target_w, target_h])
+        page.cropbox = RectangleObject([0, 0, target_w, target_h])
+        writer.add_page(page)
+
+    with open(dst, "wb") as f:
+        writer.write(f)
+
+
+def to_grayscale(src: str, dst: str) -> bool:
+    """Convert to DeviceGray with Ghostscript. Returns False if gs is not installed."""
+    gs = shutil.which("gs")
+    if gs is None:
+        return False
+    subprocess.run(
+        [
+            gs, "-q", "-dNOPAUSE", "-dBATCH", "-dSAFER",
+            "-sDEVICE=pdfwrite",
+            "-sColorConversionStrategy=Gray",
+            "-dProcessColorModel=/DeviceGray",
+            "-o", dst, src,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return True
+
+
+def preprocess(src: str, dst: str, paper_size: str, grayscale: bool) -> Dict[str, float]:
+    """
+    Produce the print-ready file for a job. Runs in a worker process; returns
+    seconds spent per stage. Stages that could not run are left out.
+
+    Intermediate files are private to this call and `dst` only appears,
+    complete, through a final rename, so two runs for the same job (say, one
+    taken over after its claim lapsed) cannot clobber each other's files.
+    """
+    timings = {}
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    run = f"{dst}.{uuid.uuid4().hex}"
+    fitted, gray = run + ".fit", run + ".gray"
+
+    try:
+        start = time.perf_counter()
+        fit_to_paper(src, fitted, paper_size)
+        timings["fit"] = time.perf_counter() - start
+        output = fitted
+
+        if grayscale:
+            start = time.perf_counter()
+            if to_grayscale(fitted, gray):
+                output = gray
+                timings["grayscale"] = time.perf_counter() - start
+
+        os.replace(output, dst)
+    finally:
+        for path in (fitted, gray):
+            if os.path.exists(path):
+                os.remove(path)
+    return timings
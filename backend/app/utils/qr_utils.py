@@ -1,2 +1,92 @@
 # -*- coding: utf-8 -*-
+# app/utils/qr_utils.py
 
+import base64
+import binascii
+import hashlib
+import hmac
+import io
+import struct
+import threading
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+# Pickup token layout, before base32:
+#   version (1 byte) | job id (16) | expiry, unix seconds (4) | truncated MAC (12)
+TOKEN_VERSION = 1
+MAC_BYTES = 12
+_BODY = struct.Struct(">B16sI")
+TOKEN_BYTES = _BODY.size + MAC_BYTES
+# Unpadded base32 length; the alphabet (A-Z, 2-7) fits QR alphanumeric mode
+TOKEN_LENGTH = (TOKEN_BYTES * 8 + 4) // 5
+_PADDING = "=" * (-TOKEN_LENGTH % 8)
+
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+class InvalidPickupToken(ValueError):
+    """The token is malformed, forged, for another shop, or expired."""
+
+
+class PickupTokenCodec:
+    """
+    Compact, stateless pickup tokens: a job id and an expiry signed with
+    HMAC-SHA256 under a key derived per shop from `secret`, so checking a
+    scanned token needs neither the database nor any shared state, and a
+    token only verifies at the shop that printed the job.
+    """
+
+    def __init__(self, secret: str):
+        self._secret = secret.encode()
+        self._shop_macs: Dict[UUID, "hmac.HMAC"] = {}
+        self._lock = threading.Lock()
+
+    def _mac(self, shop_id: UUID) -> "hmac.HMAC":
+        # Keyed HMAC state per shop; copying it skips re-hashing the key
+        base = self._shop_macs.get(shop_id)
+        if base is None:
+            key = hmac.new(self._secret, b"pickup:" + shop_id.bytes, hashlib.sha256).digest()
+            base = hmac.new(key, digestmod=hashlib.sha256)
+            with self._lock:
+                self._shop_macs[shop_id] = base
+        return base.copy()
+
+    def issue(self, shop_id: UUID, job_id: UUID, ttl_seconds: int, now: Optional[float] = None) -> str:
+        expires_at = int(now if now is not None else time.time()) + ttl_seconds
+        body = _BODY.pack(TOKEN_VERSION, job_id.bytes, expires_at)
+        mac = self._mac(shop_id)
+        mac.update(body)
+        raw = body + mac.digest()[:MAC_BYTES]
+        return base64.b32encode(raw).decode("ascii").rstrip("=")
+
+    def verify(self, shop_id: UUID, token: str, now: Optional[float] = None) -> UUID:
+        """The job id in `token`, or InvalidPickupToken."""
+        if len(token) != TOKEN_LENGTH:
+            raise InvalidPickupToken("Invalid pickup code")
+        try:
+            raw = base64.b32decode(token.upper() + _PADDING)
+        except (binascii.Error, ValueError):
+            raise InvalidPickupToken("Invalid pickup code")
+        body = raw[:_BODY.size]
+        version, job_bytes, expires_at = _BODY.unpack(body)
+        mac = self._mac(shop_id)
+        mac.update(body)
+        if version != TOKEN_VERSION or not hmac.compare_digest(mac.digest()[:MAC_BYTES], raw[_BODY.size:]):
+            raise InvalidPickupToken("Invalid pickup code")
+        if expires_at <= (now if now is not None else time.time()):
+            raise InvalidPickupToken("Pickup code expired")
+        return UUID(bytes=job_bytes)
+
+
+def render_qr(data: str, fmt: str, scale: int = 8) -> bytes:
+    """`data` as a QR code image, fmt "png" or "svg"."""
+    import segno
+
+    if fmt not in QR_MEDIA_TYPES:
+        raise ValueError(f"Unknown QR format {fmt}; expected one of {', '.join(QR_MEDIA_TYPES)}")
+    # Medium error correction survives a scuffed phone screen
+    qr = segno.make(data, error="m", micro=False)
+    out = io.BytesIO()
+    qr.save(out, kind=fmt, scale=scale, border=2)
+    return out.getvalue()
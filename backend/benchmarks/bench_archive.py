@@ -0,0 +1,181 @@
+# benchmarks/bench_archive.py
+"""
+Hot queue queries and index sizes on a 10M-row print_jobs before and after
+`archive-jobs` moves the finished (COLLECTED/CANCELLED) history into
+print_jobs_archive.
+
+The seeded jobs get a realistic pricing_snapshot and finish when they were
+created, so --older-than-days 30 archives about two thirds of the terminal
+quarter of the table. Sizes are measured three times: before, after the
+archiver and VACUUM (the space is reusable but the indexes keep their
+size), and after REINDEX. The run also checks that rebuilding
+shop_daily_stats gives the same rollups with the history archived, and
+reports how much smaller an archived row's pricing data is.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_archive [--jobs 10000000] [--older-than-days 30] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, select, text
+
+from app.core.constants import PrintStatus
+from app.db.session import SessionLocal, engine
+from app.models.job import PrintJob
+from app.models.stats import ShopDailyStats
+from app.services import archive_service, job_service, stats_service
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+INSERT_CHUNK = 1_000_000
+INDEXES = (
+    "print_jobs",
+    "ix_print_jobs_status",
+    "ix_print_jobs_shop_status_created",
+    "ix_print_jobs_shop_created",
+)
+ACTIVE = [PrintStatus.PAYMENT_CONFIRMED, PrintStatus.READY_TO_PRINT, PrintStatus.PRINTING]
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _finish_jobs(db, fx):
+    """Price the fixture jobs like price_job does and mark them finished at creation."""
+    db.execute(
+        text("""
+            UPDATE print_jobs SET
+                updated_at = created_at,
+                pricing_snapshot = json_build_object(
+                    'shop_id', shop_id::text,
+                    'size', size::text,
+                    'color_mode', lower(color_mode::text),
+                    'normal_rate', 1.5,
+                    'bulk_rate', 1.0,
+                    'bulk_threshold', 50,
+                    'units', pages * copies,
+                    'applied_rate', CASE WHEN pages * copies >= 50 THEN 1.0 ELSE 1.5 END,
+                    'is_bulk', pages * copies >= 50
+                )
+            WHERE campus_id = CAST(:campus_id AS uuid)
+        """),
+        {"campus_id": str(fx.campus_id)},
+    )
+    db.commit()
+
+
+def _vacuum(*statements):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+
+
+def _sizes(db):
+    return {
+        name: db.execute(text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": name}).scalar()
+        for name in INDEXES
+    }
+
+
+def _queries(db, shop_id, repeat):
+    queue_page = job_service.build_shop_queue_query(shop_id, statuses=[PrintStatus.READY_TO_PRINT], limit=50)
+    active_count = (
+        select(PrintJob.status, func.count())
+        .where(PrintJob.shop_id == shop_id, PrintJob.status.in_(ACTIVE))
+        .group_by(PrintJob.status)
+    )
+    campus_ready = select(func.count()).select_from(PrintJob).where(PrintJob.status == PrintStatus.READY_TO_PRINT)
+    return {
+        "queue page": _median_ms(lambda: db.execute(queue_page).all(), repeat),
+        "active counts": _median_ms(lambda: db.execute(active_count).all(), repeat),
+        "all ready": _median_ms(lambda: db.execute(campus_ready).scalar(), repeat),
+    }
+
+
+def _rollups(db):
+    return sorted(
+        (str(r.shop_id), r.day, r.size.name, r.color_mode.name, r.jobs, r.pages, round(r.revenue, 2))
+        for r in db.execute(select(ShopDailyStats)).scalars()
+    )
+
+
+def _print_sizes(label, sizes, baseline):
+    print(f"\n{label}")
+    for name, size in sizes.items():
+        print(f"  {name:<36} {size / 2**20:>9.1f} MB  ({size / baseline[name]:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=10_000_000)
+    parser.add_argument("--older-than-days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db)
+    shop_id = fx.shop_ids[0]
+
+    try:
+        t = time.perf_counter()
+        for offset in range(0, args.jobs, INSERT_CHUNK):
+            insert_jobs(db, fx, min(INSERT_CHUNK, args.jobs - offset))
+        _finish_jobs(db, fx)
+        _vacuum("VACUUM (ANALYZE) print_jobs")
+        print(f"seeded {args.jobs:,} jobs in {time.perf_counter() - t:.1f}s")
+
+        stats_service.rebuild(db)
+        rollups = _rollups(db)
+        sizes = _sizes(db)
+        before = _queries(db, shop_id, args.repeat)
+        snapshot_bytes = db.execute(text("""
+            SELECT avg(pg_column_size(pricing_snapshot)) FROM print_jobs
+            WHERE status IN ('COLLECTED', 'CANCELLED')
+        """)).scalar()
+
+        t = time.perf_counter()
+        result = archive_service.archive_jobs(db, args.older_than_days, args.batch_size)
+        elapsed = time.perf_counter() - t
+        print(f"archived {result.archived:,} jobs in {elapsed:.1f}s ({result.archived / elapsed:,.0f} jobs/s)")
+
+        _vacuum("VACUUM (ANALYZE) print_jobs")
+        vacuumed = _sizes(db)
+        after = _queries(db, shop_id, args.repeat)
+        _vacuum("REINDEX TABLE print_jobs", "ANALYZE print_jobs")
+        reindexed = _sizes(db)
+        compacted = _queries(db, shop_id, args.repeat)
+
+        print(f"\n{'query':<16} {'before':>10} {'vacuumed':>10} {'reindexed':>10}")
+        for name in before:
+            print(f"{name:<16} {before[name]:>8.2f}ms {after[name]:>8.2f}ms {compacted[name]:>8.2f}ms")
+        _print_sizes("after archive + VACUUM", vacuumed, sizes)
+        _print_sizes("after REINDEX", reindexed, sizes)
+
+        archived_bytes = db.execute(text("""
+            SELECT avg(pg_column_size(normal_rate) + pg_column_size(bulk_rate)
+                       + pg_column_size(bulk_threshold)
+                       + coalesce(pg_column_size(pricing_extra), 0))
+            FROM print_jobs_archive WHERE campus_id = CAST(:campus_id AS uuid)
+        """), {"campus_id": str(fx.campus_id)}).scalar()
+        print(f"\npricing data per finished job: {snapshot_bytes:.0f} B live, {archived_bytes:.0f} B archived")
+
+        stats_service.rebuild(db)
+        assert _rollups(db) == rollups, "shop_daily_stats differs after archiving"
+        print("rollups rebuilt with the archive match the originals")
+    finally:
+        db.rollback()
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_bulk_import.py
+"""
+Rows/sec of POST /api/users/import against batch size, with one
+POST /api/users/ per row as the baseline.
+
+Each run streams --rows NDJSON UserCreate records with fresh emails into
+the benchmark campus; drop_fixtures removes them afterwards. Run against a
+scratch PostgreSQL database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_import [--rows 20000] [--batch-sizes 1 10 100 1000 5000]
+"""
+
+import argparse
+import json
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from benchmarks.seed import create_fixtures, drop_fixtures
+
+BASELINE_ROWS = 1000
+
+
+def _records(campus_id, n):
+    tag = uuid.uuid4().hex[:8]
+    for i in range(n):
+        yield {
+            "campus_id": str(campus_id),
+            "email": f"import-{tag}-{i}@example.com",
+            "name": f"student {i}",
+            "role": "student",
+        }
+
+
+def _ndjson(records, chunk_rows=500):
+    chunk = []
+    for record in records:
+        chunk.append(json.dumps(record))
+        if len(chunk) == chunk_rows:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    settings.JOB_PROCESSING_ENABLED = False
+    from app.main import app
+
+    db = SessionLocal()
+    fx = create_fixtures(db, n_shops=1, n_users=1)
+    try:
+        with TestClient(app) as client:
+            start = time.perf_counter()
+            for record in _records(fx.campus_id, BASELINE_ROWS):
+                client.post("/api/users/", json=record).raise_for_status()
+            baseline = BASELINE_ROWS / (time.perf_counter() - start)
+            print(f"{'per-row POST':>14} {baseline:>10,.0f} rows/s ({BASELINE_ROWS} rows)")
+
+            for batch_size in args.batch_sizes:
+                start = time.perf_counter()
+                response = client.post(
+                    f"/api/users/import?batch_size={batch_size}",
+                    content=_ndjson(_records(fx.campus_id, args.rows)),
+                    headers={"content-type": "application/x-ndjson"},
+                )
+                elapsed = time.perf_counter() - start
+                result = response.json()
+                print(
+                    f"{'batch ' + str(batch_size):>14} {result['inserted'] / elapsed:>10,.0f} rows/s "
+                    f"({result['inserted']} inserted, {result['failed']} failed)"
+                )
+    finally:
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
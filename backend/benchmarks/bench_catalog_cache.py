@@ -0,0 +1,63 @@
+# benchmarks/bench_catalog_cache.py
+"""
+Throughput of the catalog endpoints (/api/campuses/, /api/shops/) with and
+without the read-through cache, measured in-process through the ASGI app.
+
+Three modes per endpoint:
+  uncached   the cache is cleared before every request (DB query + validation)
+  cached     body served from the cache
+  304        cached, and the client sends the ETag back in If-None-Match
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_catalog_cache [--shops 200] [--requests 2000]
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.cache_service import catalog_cache
+from benchmarks.seed import create_fixtures, drop_fixtures
+
+
+def _rate(client, path, n, headers=None, clear=False):
+    start = time.perf_counter()
+    for _ in range(n):
+        if clear:
+            catalog_cache.clear()
+        client.get(path, headers=headers)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Keep the benchmark to the HTTP path only
+    settings.JOB_PROCESSING_ENABLED = False
+    from app.main import app
+
+    db = SessionLocal()
+    fx = create_fixtures(db, n_shops=args.shops, n_users=1)
+    try:
+        with TestClient(app) as client:
+            print(f"{'endpoint':<16} {'uncached/s':>11} {'cached/s':>9} {'304/s':>7}")
+            for path in ("/api/campuses/", "/api/shops/"):
+                uncached = _rate(client, path, args.requests, clear=True)
+                etag = client.get(path).headers["etag"]
+                cached = _rate(client, path, args.requests)
+                not_modified = _rate(client, path, args.requests, headers={"If-None-Match": etag})
+                print(f"{path:<16} {uncached:>11,.0f} {cached:>9,.0f} {not_modified:>7,.0f}")
+        print(catalog_cache.stats())
+    finally:
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_dispatch.py
+"""
+Discrete-event simulation of an AUTO shop's printers: naive FIFO dispatch
+versus the (size, color_mode) batching queue GET /api/shops/{shop_id}/dispatch
+uses, for several printer counts.
+
+Jobs arrive as a Poisson stream over --hours with a campus-like mix
+(mostly A4 mono, some colour, a little A3); the arrival rate is set so the
+printers would be --load busy if no time were lost to tray and mode
+switches. Reports makespan, p50/p95/max wait and the number of switches.
+No database needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dispatch [--printers 1 2 4] [--jobs 5000] [--load 0.9]
+"""
+
+import argparse
+import random
+import statistics
+
+from app.core.constants import ColorMode, PaperSize
+from app.services.dispatch_service import (
+    BatchingQueue,
+    FifoQueue,
+    PrinterProfile,
+    QueuedJob,
+    simulate,
+)
+
+MIX = [
+    ((PaperSize.A4, ColorMode.BW), 0.70),
+    ((PaperSize.A4, ColorMode.COLOR), 0.18),
+    ((PaperSize.A3, ColorMode.BW), 0.08),
+    ((PaperSize.A3, ColorMode.COLOR), 0.04),
+]
+
+
+def make_jobs(n, printers, load, profile, seed):
+    rng = random.Random(seed)
+    setups = [setup for setup, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    shapes = []
+    for i in range(n):
+        size, color_mode = rng.choices(setups, weights)[0]
+        # Mostly short documents with a long tail
+        sheets = max(1, min(200, int(rng.lognormvariate(2.0, 1.0))))
+        shapes.append((i, size, color_mode, sheets))
+
+    work = sum(
+        profile.print_seconds(QueuedJob(i, size, color_mode, sheets, 0.0))
+        for i, size, color_mode, sheets in shapes
+    )
+    rate = n * load * printers / work
+    jobs, t = [], 0.0
+    for i, size, color_mode, sheets in shapes:
+        t += rng.expovariate(rate)
+        jobs.append(QueuedJob(i, size, color_mode, sheets, t))
+    return jobs
+
+
+def summarize(assignments):
+    waits = sorted(a.wait for a in assignments)
+    return {
+        "makespan": max(a.end for a in assignments),
+        "p50": statistics.median(waits),
+        "p95": waits[int(0.95 * (len(waits) - 1))],
+        "max": waits[-1],
+        "switches": sum(1 for a in assignments if a.setup_seconds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--printers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--load", type=float, default=0.9)
+    parser.add_argument("--max-wait", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    profile = PrinterProfile()
+    print(f"{'printers':>8} {'policy':>8} {'makespan s':>11} {'p50 wait':>9} "
+          f"{'p95 wait':>9} {'max wait':>9} {'switches':>9}")
+    for printers in args.printers:
+        jobs = make_jobs(args.jobs, printers, args.load, profile, args.seed)
+        for name, queue in (
+            ("fifo", FifoQueue()),
+            ("batched", BatchingQueue(profile, args.max_wait)),
+        ):
+            s = summarize(simulate(jobs, printers, profile, queue))
+            print(f"{printers:>8} {name:>8} {s['makespan']:>11,.0f} {s['p50']:>9.1f} "
+                  f"{s['p95']:>9.1f} {s['max']:>9.1f} {s['switches']:>9,}")
+
+
+if __name__ == "__main__":
+    main()
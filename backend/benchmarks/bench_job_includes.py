@@ -0,0 +1,91 @@
+# benchmarks/bench_job_includes.py
+"""
+Shop dashboard page with every related object (campus, shop, user,
+payment): lazy loading per job versus ?include= eager loading, for several
+page sizes.
+
+For each page size it counts the SQL statements and times building the
+JobDetail items the way GET /api/shops/{shop_id}/jobs does. That the
+eager statement count does not grow with the page size is asserted by
+tests/test_job_includes.py.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_job_includes [--jobs 20000] [--limits 10 50 200] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event
+
+from app.db.session import SessionLocal, engine
+from app.services import job_service
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+INCLUDES = job_service.JOB_INCLUDES
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def _lazy_page(db, shop_id, limit):
+    jobs = db.execute(job_service.build_shop_queue_query(shop_id, limit=limit)).scalars().all()
+    page, _ = job_service.paginate(list(jobs), limit)
+    return [job_service.job_detail(job, INCLUDES) for job in page]
+
+
+def _eager_page(db, shop_id, limit):
+    stmt = job_service.with_includes(job_service.build_shop_queue_query(shop_id, limit=limit), INCLUDES)
+    jobs = db.execute(stmt).scalars().all()
+    page, _ = job_service.paginate(list(jobs), limit)
+    return [job_service.job_detail(job, INCLUDES) for job in page]
+
+
+def _measure(db, fn, shop_id, limit, repeat, counter):
+    samples, queries = [], None
+    for _ in range(repeat):
+        # Fresh identity map, so nothing is served from earlier iterations
+        db.expunge_all()
+        counter.count = 0
+        start = time.perf_counter()
+        fn(db, shop_id, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+        queries = counter.count
+    return statistics.median(samples), queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db)
+    shop_id = fx.shop_ids[0]
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+
+    print(f"{'limit':>6} {'lazy q':>7} {'lazy ms':>9} {'eager q':>8} {'eager ms':>9}")
+    try:
+        insert_jobs(db, fx, args.jobs)
+        for limit in args.limits:
+            lazy_ms, lazy_q = _measure(db, _lazy_page, shop_id, limit, args.repeat, counter)
+            eager_ms, eager_q = _measure(db, _eager_page, shop_id, limit, args.repeat, counter)
+            print(f"{limit:>6} {lazy_q:>7} {lazy_ms:>9.2f} {eager_q:>8} {eager_ms:>9.2f}")
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        db.rollback()
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
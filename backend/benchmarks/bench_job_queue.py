@@ -0,0 +1,98 @@
+# benchmarks/bench_job_queue.py
+"""
+Shop job queue latency as print_jobs grows from 10k to 1M rows.
+
+For each table size it times the first page, a page deep into the queue
+(reached by following cursors), a page filtered on one status and one
+filtered on several, using the same query the /api/shops/{shop_id}/jobs
+route runs. With keyset pagination all four should stay flat as the table
+grows. At the largest size the EXPLAIN ANALYZE of the two status-filtered
+pages is printed: each status should be an Index Scan on
+ix_print_jobs_shop_status_created under a Limit, with no Sort over the
+matching rows.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_job_queue [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.core.constants import PrintStatus
+from app.db.session import SessionLocal
+from app.services import job_service
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+MULTI_STATUSES = [PrintStatus.UPLOADED, PrintStatus.READY_TO_PRINT, PrintStatus.PRINTING]
+
+
+def _time_page(db, shop_id, repeat, **kwargs):
+    samples = []
+    for _ in range(repeat):
+        stmt = job_service.build_shop_queue_query(shop_id, **kwargs)
+        start = time.perf_counter()
+        db.execute(stmt).scalars().all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _explain(db, shop_id, **kwargs):
+    stmt = job_service.build_shop_queue_query(shop_id, **kwargs)
+    sql = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    rows = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).scalars().all()
+    return "\n".join(rows)
+
+
+def _deep_cursor(db, shop_id, pages, limit):
+    cursor = None
+    for _ in range(pages):
+        stmt = job_service.build_shop_queue_query(shop_id, cursor=cursor, limit=limit)
+        jobs = db.execute(stmt).scalars().all()
+        _, cursor = job_service.paginate(list(jobs), limit)
+        if cursor is None:
+            break
+    return cursor
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db)
+    shop_id = fx.shop_ids[0]
+    inserted = 0
+
+    print(f"{'rows':>10} {'first ms':>10} {'deep ms':>10} {'status ms':>10} {'statuses ms':>12}")
+    try:
+        for size in sorted(args.sizes):
+            insert_jobs(db, fx, size - inserted)
+            inserted = size
+
+            deep = _deep_cursor(db, shop_id, pages=20, limit=args.limit)
+            first_ms = _time_page(db, shop_id, args.repeat, limit=args.limit)
+            deep_ms = _time_page(db, shop_id, args.repeat, limit=args.limit, cursor=deep)
+            status_ms = _time_page(
+                db, shop_id, args.repeat, limit=args.limit,
+                statuses=[PrintStatus.READY_TO_PRINT],
+            )
+            multi_ms = _time_page(db, shop_id, args.repeat, limit=args.limit, statuses=MULTI_STATUSES)
+            print(f"{size:>10} {first_ms:>10.2f} {deep_ms:>10.2f} {status_ms:>10.2f} {multi_ms:>12.2f}")
+
+        for label, statuses in (("one status", [PrintStatus.READY_TO_PRINT]), ("several statuses", MULTI_STATUSES)):
+            print(f"\nEXPLAIN, {label}:")
+            print(_explain(db, shop_id, limit=args.limit, cursor=deep, statuses=statuses))
+    finally:
+        db.rollback()
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_job_stream.py
+"""
+Fan-out latency of the shop job feed with many concurrent subscribers.
+
+N subscribers (spread over --shops shops) wait on the in-process broker the
+same way /api/shops/{id}/jobs/stream does, each rendering the SSE frame it
+would send. A separate thread publishes status changes, as route handlers
+and the job processor do. Reported latency is publish -> frame rendered by
+the subscriber.
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_stream [--subscribers 1000] [--shops 10] [--events 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+
+from app.core.constants import PrintStatus
+from app.services.event_service import JobEventBroker
+
+
+async def run(subscribers, shops, events, rate):
+    broker = JobEventBroker()
+    shop_ids = [uuid.uuid4() for _ in range(shops)]
+    published_at = {}
+    latencies = []
+    per_shop = events // shops
+
+    async def subscriber(shop_id):
+        sub = broker.subscribe(shop_id)
+        try:
+            for _ in range(per_shop):
+                event = await sub.get()
+                event.to_sse()
+                latencies.append(time.perf_counter() - published_at[event.job_id])
+        finally:
+            broker.unsubscribe(sub)
+
+    tasks = [asyncio.create_task(subscriber(shop_ids[i % shops])) for i in range(subscribers)]
+    await asyncio.sleep(0)
+
+    def publisher():
+        interval = 1 / rate if rate else 0
+        for i in range(per_shop * shops):
+            shop_id = shop_ids[i % shops]
+            job_id = uuid.uuid4()
+            published_at[job_id] = time.perf_counter()
+            broker.publish(shop_id, job_id, PrintStatus.READY_TO_PRINT, PrintStatus.UPLOADED)
+            if interval:
+                time.sleep(interval)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--shops", type=int, default=10)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=500, help="events/s published (0 = unthrottled)")
+    args = parser.parse_args()
+
+    latencies, elapsed = asyncio.run(run(args.subscribers, args.shops, args.events, args.rate))
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"subscribers={args.subscribers} shops={args.shops} events={args.events}")
+    print(f"deliveries      {len(ms)} in {elapsed:.2f}s ({len(ms) / elapsed:,.0f}/s)")
+    print(
+        f"latency ms      p50={statistics.median(ms):.2f} "
+        f"p99={ms[int(len(ms) * 0.99) - 1]:.2f} max={ms[-1]:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/bench_pdf_ingest.py
+"""
+Peak RSS and throughput of PDF ingestion on synthetic files of 1 MB-500 MB.
+
+Each size is measured in a fresh subprocess so ru_maxrss reflects only that
+run. Two phases are timed:
+  receive  streaming the multipart body through receive_multipart (write + SHA-256)
+  count    pdf_utils.count_pages over the stored file
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_ingest [--sizes-mb 1 10 100 500] [--dir /tmp]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.utils import file_utils, pdf_utils
+
+CHUNK = 64 * 1024
+BOUNDARY = b"benchboundary"
+
+
+def write_synthetic_pdf(path, target_bytes, pages=200):
+    """PDF with `pages` blank pages and a padding stream to reach target_bytes."""
+    offsets = {}
+    with open(path, "wb") as f:
+        def obj(num, body):
+            offsets[num] = f.tell()
+            f.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = b" ".join(b"%d 0 R" % (4 + i) for i in range(pages))
+        obj(2, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages)
+
+        padding = max(0, target_bytes - 200 * pages - 1024)
+        offsets[3] = f.tell()
+        f.write(b"3 0 obj\n<< /Length %d >>\nstream\n" % padding)
+        block = b"0" * CHUNK
+        remaining = padding
+        while remaining:
+            n = min(CHUNK, remaining)
+            f.write(block[:n])
+            remaining -= n
+        f.write(b"\nendstream\nendobj\n")
+
+        for i in range(pages):
+            obj(4 + i, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 3 0 R >>")
+
+        xref_at = f.tell()
+        size = 4 + pages
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for num in range(1, size):
+            f.write(b"%010d 00000 n \n" % offsets[num])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_at))
+
+
+async def _multipart_chunks(path):
+    yield (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="copies"\r\n\r\n1\r\n'
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="thesis.pdf"\r\n'
+        b"Content-Type: application/pdf\r\n\r\n"
+    )
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            yield chunk
+    yield b"\r\n--" + BOUNDARY + b"--\r\n"
+
+
+def measure_one(path, work_dir):
+    """Runs in the child process; prints one JSON line."""
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    upload = asyncio.run(file_utils.receive_multipart(
+        _multipart_chunks(path),
+        "multipart/form-data; boundary=" + BOUNDARY.decode(),
+        work_dir,
+        max_bytes=size * 2,
+    ))
+    receive_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pages = pdf_utils.count_pages(upload.file.path)
+    count_s = time.perf_counter() - start
+    file_utils.discard(upload.file)
+
+    print(json.dumps({
+        "size": size,
+        "pages": pages,
+        "receive_mb_s": size / receive_s / 2**20,
+        "count_ms": count_s * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--dir", default=tempfile.gettempdir())
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_one(*args.child)
+        return
+
+    print(f"{'size MB':>8} {'pages':>6} {'recv MB/s':>10} {'count ms':>9} {'peak RSS MB':>12}")
+    for size_mb in args.sizes_mb:
+        path = os.path.join(args.dir, f"bench-{size_mb}mb.pdf")
+        write_synthetic_pdf(path, size_mb * 2**20)
+        try:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pdf_ingest", "--child", path, args.dir],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"{size_mb:>8} {r['pages']:>6} {r['receive_mb_s']:>10.1f} "
+                f"{r['count_ms']:>9.2f} {r['peak_rss_mb']:>12.1f}"
+            )
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
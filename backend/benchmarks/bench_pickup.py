@@ -0,0 +1,90 @@
+# benchmarks/bench_pickup.py
+"""
+Pickup-code scan hot path: how many tokens per second one core can verify
+(valid, forged and other-shop codes), against issuing them and rendering
+their QR codes, which PickupCodes caches per job.
+
+Verification is pure CPU (one HMAC-SHA256 per token, no database), so a
+counter scanning hundreds of codes a minute is nowhere near the limit;
+the batch endpoint's cost is the single UPDATE it ends with.
+
+Usage (from backend/, no database needed):
+    python -m benchmarks.bench_pickup [--tokens 100000] [--shops 50] [--renders 200]
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from app.utils.qr_utils import InvalidPickupToken, PickupTokenCodec, render_qr
+
+TTL_SECONDS = 14 * 24 * 3600
+
+
+def _per_second(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--shops", type=int, default=50)
+    parser.add_argument("--renders", type=int, default=200)
+    args = parser.parse_args()
+
+    codec = PickupTokenCodec("bench-secret")
+    shop_ids = [uuid.uuid4() for _ in range(args.shops)]
+    jobs = [(shop_ids[i % args.shops], uuid.uuid4()) for i in range(args.tokens)]
+
+    issued = []
+    issue_rate = _per_second(lambda job: issued.append(codec.issue(*job, TTL_SECONDS)), jobs)
+    scans = list(zip((shop_id for shop_id, _ in jobs), issued))
+
+    def verify(scan):
+        return codec.verify(*scan)
+
+    def reject(scan):
+        try:
+            codec.verify(*scan)
+        except InvalidPickupToken:
+            return
+        raise AssertionError("forged token verified")
+
+    for (shop_id, job_id), token in zip(jobs[:1000], issued):
+        assert codec.verify(shop_id, token) == job_id
+    verify_rate = _per_second(verify, scans)
+    # Flip a character in the MAC; scan at the next shop over
+    forged = [(shop_id, token[:40] + ("A" if token[40] != "A" else "B") + token[41:]) for shop_id, token in scans]
+    other_shop = [(shop_ids[(shop_ids.index(shop_id) + 1) % args.shops], token) for shop_id, token in scans[:10_000]]
+    forged_rate = _per_second(reject, forged)
+    other_rate = _per_second(reject, other_shop)
+
+    token = issued[0]
+    png_ms = _median_ms(lambda: render_qr(token, "png"), args.renders)
+    svg_ms = _median_ms(lambda: render_qr(token, "svg"), args.renders)
+    png_bytes = len(render_qr(token, "png"))
+
+    print(f"{args.tokens:,} tokens over {args.shops} shops, {len(token)} characters each")
+    print(f"{'issue':<22} {issue_rate:>12,.0f} /s")
+    print(f"{'verify':<22} {verify_rate:>12,.0f} /s  ({1e6 / verify_rate:.1f} us each)")
+    print(f"{'reject forged':<22} {forged_rate:>12,.0f} /s")
+    print(f"{'reject other shop':<22} {other_rate:>12,.0f} /s")
+    print(f"{'render png':<22} {png_ms:>12.2f} ms  ({png_bytes:,} bytes, cached per job after the first)")
+    print(f"{'render svg':<22} {svg_ms:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
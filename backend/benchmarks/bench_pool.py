@@ -0,0 +1,75 @@
+# benchmarks/bench_pool.py
+"""
+Connection checkout cost under each DB_PRE_PING strategy, and checkout
+queueing when more threads than pooled connections run short queries.
+
+Each run builds a fresh engine from the same engine_options() the app
+uses, then has --threads threads each check out a connection and run
+SELECT 1 --per-thread times. Reports statements/s and the checkout wait
+p50/p99 from the pool's own PoolStats histogram.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_pool [--threads 32] [--per-thread 500] [--pool-size 5]
+"""
+
+import argparse
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.metrics import PoolStats
+from app.db.pool import engine_options, install_pool_events
+
+
+def _quantile(histogram, q):
+    """Upper bound of the bucket holding the q-quantile."""
+    target = q * histogram.count
+    for bound, n in zip(histogram.bounds, histogram.buckets):
+        if n >= target:
+            return bound
+    return float("inf")
+
+
+def run(threads, per_thread):
+    stats = PoolStats()
+    engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, stats))
+    install_pool_events(engine)
+
+    def worker():
+        for _ in range(per_thread):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return threads * per_thread / elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--per-thread", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    args = parser.parse_args()
+
+    settings.DB_POOL_SIZE = args.pool_size
+    settings.DB_MAX_OVERFLOW = args.max_overflow
+    print(f"{'pre-ping':>8} {'stmts/s':>10} {'wait p50':>10} {'wait p99':>10} {'timeouts':>9}")
+    for strategy in ("always", "idle", "never"):
+        settings.DB_PRE_PING = strategy
+        rate, stats = run(args.threads, args.per_thread)
+        print(f"{strategy:>8} {rate:>10,.0f} {_quantile(stats.wait, 0.5) * 1000:>8.1f}ms "
+              f"{_quantile(stats.wait, 0.99) * 1000:>8.1f}ms {stats.timeouts:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_pricing.py
+"""
+Quotes/sec of the in-process pricing engine on warm rate tables.
+
+No database is needed: rate tables are loaded straight into the engine, which
+is exactly the state every quote after the first one per shop runs in.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pricing [--shops 500] [--quotes 1000000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.core.constants import ColorMode, PaperSize
+from app.services.pricing_service import PricingEngine
+
+
+def fake_pricing_rows(shop_id):
+    return [
+        SimpleNamespace(
+            shop_id=shop_id,
+            size=size,
+            color_mode=color_mode,
+            normal_rate=round(random.uniform(1, 10), 2),
+            bulk_rate=round(random.uniform(0.5, 1), 2),
+            bulk_threshold=random.choice([50, 100, 200]),
+        )
+        for size in PaperSize
+        for color_mode in ColorMode
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shops", type=int, default=500)
+    parser.add_argument("--quotes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    engine = PricingEngine()
+    shop_ids = [uuid.uuid4() for _ in range(args.shops)]
+    for shop_id in shop_ids:
+        engine.load(shop_id, fake_pricing_rows(shop_id))
+
+    specs = [
+        (
+            random.choice(shop_ids),
+            random.choice(list(PaperSize)),
+            random.choice(list(ColorMode)),
+            random.randint(1, 300),
+            random.randint(1, 5),
+        )
+        for _ in range(10_000)
+    ]
+
+    quote = engine.quote
+    n_specs = len(specs)
+    start = time.perf_counter()
+    for i in range(args.quotes):
+        shop_id, size, color_mode, pages, copies = specs[i % n_specs]
+        quote(None, shop_id, size, color_mode, pages, copies)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.quotes} quotes over {args.shops} shops in {elapsed:.2f}s")
+    print(f"{args.quotes / elapsed:,.0f} quotes/sec, {elapsed / args.quotes * 1e6:.2f} us/quote")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# benchmarks/bench_pricing_versions.py
+"""
+print_jobs storage, WAL and read cost with a JSON pricing_snapshot per job
+versus a pricing_version_id into the hash-consed pricing_versions table.
+
+Seeds --jobs jobs with the snapshots price_job writes (a handful of
+distinct rate tables, as in a real campus), measures them, then converts
+them to pricing versions and measures again:
+
+- bytes per row, for the fixture rows only;
+- WAL written by inserting --wal-rows more jobs in each layout;
+- reading a 1000-job shop page as ORM objects, with and without
+  rebuilding every job's snapshot.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_pricing_versions [--jobs 5000000] [--wal-rows 100000] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import undefer
+
+from app.db.session import SessionLocal
+from app.models.job import PrintJob
+from app.services import job_service
+from app.services.pricing_service import RateEntry, job_snapshot, pricing_versions
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+INSERT_CHUNK = 1_000_000
+PAGE = 1000
+
+# (normal_rate, bulk_rate, bulk_threshold) per paper size
+RATES = {"A4": (1.5, 1.0, 50), "A3": (3.0, 2.5, 25)}
+
+SNAPSHOT_SQL = """
+    json_build_object(
+        'shop_id', shop_id::text,
+        'size', size::text,
+        'color_mode', lower(color_mode::text),
+        'normal_rate', r.normal_rate,
+        'bulk_rate', r.bulk_rate,
+        'bulk_threshold', r.bulk_threshold,
+        'units', pages * copies,
+        'applied_rate', CASE WHEN pages * copies >= r.bulk_threshold THEN r.bulk_rate ELSE r.normal_rate END,
+        'is_bulk', pages * copies >= r.bulk_threshold
+    )
+"""
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _rates_values():
+    return ", ".join(
+        f"('{size}', {normal}, {bulk}, {threshold})"
+        for size, (normal, bulk, threshold) in RATES.items()
+    )
+
+
+def _to_legacy(db, fx):
+    db.execute(
+        text(f"""
+            UPDATE print_jobs AS j
+            SET pricing_version_id = NULL, pricing_snapshot = {SNAPSHOT_SQL}
+            FROM (VALUES {_rates_values()}) AS r(size, normal_rate, bulk_rate, bulk_threshold)
+            WHERE j.campus_id = CAST(:campus_id AS uuid) AND j.size::text = r.size
+        """),
+        {"campus_id": str(fx.campus_id)},
+    )
+    db.commit()
+
+
+def _to_versions(db, fx):
+    for size, (normal, bulk, threshold) in RATES.items():
+        version_id = pricing_versions.id_for(db, RateEntry(normal, bulk, threshold))
+        db.execute(
+            text("""
+                UPDATE print_jobs SET pricing_version_id = :version_id, pricing_snapshot = NULL
+                WHERE campus_id = CAST(:campus_id AS uuid) AND size::text = :size
+            """),
+            {"version_id": version_id, "campus_id": str(fx.campus_id), "size": size},
+        )
+    db.commit()
+
+
+def _row_bytes(db, fx):
+    return db.execute(
+        text("""
+            SELECT avg(pg_column_size(j.*))
+            FROM print_jobs AS j WHERE campus_id = CAST(:campus_id AS uuid)
+        """),
+        {"campus_id": str(fx.campus_id)},
+    ).scalar()
+
+
+def _wal_bytes(db, fx, rows):
+    """WAL written copying `rows` fixture jobs (with new ids) in their current layout."""
+    start = db.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+    db.execute(
+        text("""
+            INSERT INTO print_jobs
+            SELECT (jsonb_populate_record(NULL::print_jobs, to_jsonb(j) || jsonb_build_object('id', gen_random_uuid()))).*
+            FROM print_jobs AS j WHERE campus_id = CAST(:campus_id AS uuid)
+            LIMIT :rows
+        """),
+        {"campus_id": str(fx.campus_id), "rows": rows},
+    )
+    db.commit()
+    return db.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:start AS pg_lsn))"), {"start": start}).scalar()
+
+
+def _reads(db, shop_id, repeat):
+    page = job_service.build_shop_queue_query(shop_id, limit=PAGE)
+
+    def load(stmt, snapshots):
+        db.expunge_all()
+        jobs = db.execute(stmt).scalars().all()
+        if snapshots:
+            for job in jobs:
+                job_snapshot(job)
+
+    loaded = page.options(undefer(PrintJob.pricing_snapshot))
+    return {
+        "page": _median_ms(lambda: load(loaded, False), repeat),
+        "page + snapshots": _median_ms(lambda: load(loaded, True), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5_000_000)
+    parser.add_argument("--wal-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db)
+    shop_id = fx.shop_ids[0]
+
+    try:
+        t = time.perf_counter()
+        for offset in range(0, args.jobs, INSERT_CHUNK):
+            insert_jobs(db, fx, min(INSERT_CHUNK, args.jobs - offset))
+        _to_legacy(db, fx)
+        print(f"seeded {args.jobs:,} jobs in {time.perf_counter() - t:.1f}s")
+
+        sample = db.execute(
+            select(PrintJob.id, PrintJob.pricing_snapshot).where(PrintJob.shop_id == shop_id).limit(PAGE)
+        ).all()
+        legacy = {
+            "bytes": _row_bytes(db, fx),
+            "wal": _wal_bytes(db, fx, args.wal_rows),
+            **_reads(db, shop_id, args.repeat),
+        }
+
+        _to_versions(db, fx)
+        db.expunge_all()
+        for job_id, snapshot in sample:
+            assert job_snapshot(db.get(PrintJob, job_id)) == snapshot, f"snapshot of {job_id} changed"
+        versioned = {
+            "bytes": _row_bytes(db, fx),
+            "wal": _wal_bytes(db, fx, args.wal_rows),
+            **_reads(db, shop_id, args.repeat),
+        }
+
+        print(f"\n{'':<22} {'snapshot':>14} {'version':>14}")
+        print(f"{'bytes/row':<22} {legacy['bytes']:>14.0f} {versioned['bytes']:>14.0f}")
+        print(f"{'MB for ' + format(args.jobs, ',') + ' jobs':<22} "
+              f"{legacy['bytes'] * args.jobs / 2**20:>14.1f} {versioned['bytes'] * args.jobs / 2**20:>14.1f}")
+        print(f"{'WAL MB / ' + format(args.wal_rows, ',') + ' rows':<22} "
+              f"{legacy['wal'] / 2**20:>14.1f} {versioned['wal'] / 2**20:>14.1f}")
+        for name in ("page", "page + snapshots"):
+            print(f"{name + ' ms':<22} {legacy[name]:>14.2f} {versioned[name]:>14.2f}")
+        print(f"\n{len(sample)} sampled snapshots rebuilt unchanged from pricing_versions")
+    finally:
+        db.rollback()
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
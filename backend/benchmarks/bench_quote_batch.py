@@ -0,0 +1,83 @@
+# benchmarks/bench_quote_batch.py
+"""
+Batch quoting of 10k job specs: vectorized quote_batch vs one quote per spec,
+plus the full POST /api/pricing/quote:batch round trip in-process.
+
+Rate tables are preloaded into the engine and get_db is overridden, so no
+database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_quote_batch [--specs 10000] [--shops 200]
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.constants import ColorMode, PaperSize
+from app.db.session import get_db
+from app.main import app
+from app.schemas.job import JobCreate
+from app.services.pricing_service import pricing_engine
+from benchmarks.bench_pricing import fake_pricing_rows
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=10_000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    shop_ids = [uuid.uuid4() for _ in range(args.shops)]
+    for shop_id in shop_ids:
+        pricing_engine.load(shop_id, fake_pricing_rows(shop_id))
+
+    specs = [
+        JobCreate(
+            shop_id=random.choice(shop_ids),
+            pages=random.randint(1, 300),
+            copies=random.randint(1, 5),
+            size=random.choice(list(PaperSize)),
+            color_mode=random.choice(list(ColorMode)),
+        )
+        for _ in range(args.specs)
+    ]
+    payload = [spec.model_dump(mode="json") for spec in specs]
+
+    def per_spec():
+        for s in specs:
+            pricing_engine.quote(None, s.shop_id, s.size, s.color_mode, s.pages, s.copies)
+
+    def vectorized():
+        pricing_engine.quote_batch(None, specs)
+
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+
+    def http_batch():
+        response = client.post("/api/pricing/quote:batch", json=payload)
+        assert response.status_code == 200
+        assert response.text.count("\n") == len(specs)
+
+    print(f"{args.specs} specs over {args.shops} shops")
+    print(f"  per-spec quote loop   {_median_ms(per_spec, args.repeat):8.2f} ms")
+    print(f"  vectorized batch      {_median_ms(vectorized, args.repeat):8.2f} ms")
+    print(f"  POST quote:batch      {_median_ms(http_batch, args.repeat):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
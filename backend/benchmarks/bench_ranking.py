@@ -0,0 +1,122 @@
+# benchmarks/bench_ranking.py
+"""
+GET /api/campuses/{campus_id}/shops/ranked for a campus of 500 shops with
+10k queued (READY_TO_PRINT/PRINTING) jobs: ranking from the warm in-memory
+index versus rebuilding it (shops, rate tables and queue depths from the
+database) on every request, plus the cost of applying a job event.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_ranking [--shops 500] [--jobs 10000] [--repeat 200]
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import insert, text
+
+from app.core.constants import ColorMode, PaperSize, PrintStatus
+from app.db.session import SessionLocal
+from app.models.pricing import ShopPricing
+from app.services.event_service import JobEvent
+from app.services.pricing_service import pricing_engine
+from app.services.ranking_service import shop_rankings
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+
+def _percentiles_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def _seed(db, fx, jobs):
+    db.execute(insert(ShopPricing), [
+        {
+            "shop_id": shop_id,
+            "size": size,
+            "color_mode": color_mode,
+            "normal_rate": 1.0 + (i % 7) * 0.1,
+            "bulk_rate": 0.7 + (i % 5) * 0.1,
+            "bulk_threshold": 50 + (i % 4) * 25,
+        }
+        for i, shop_id in enumerate(fx.shop_ids)
+        for size in PaperSize
+        for color_mode in ColorMode
+    ])
+    db.commit()
+    insert_jobs(db, fx, jobs)
+    # Put every fixture job in the queue, a quarter of them printing
+    db.execute(
+        text("""
+            UPDATE print_jobs
+            SET status = CASE WHEN random() < 0.25 THEN 'PRINTING' ELSE 'READY_TO_PRINT' END::printstatus
+            WHERE campus_id = CAST(:campus_id AS uuid)
+        """),
+        {"campus_id": str(fx.campus_id)},
+    )
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shops", type=int, default=500)
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db, n_shops=args.shops)
+    campus_id = fx.campus_id
+    spec = (PaperSize.A4, ColorMode.BW, 12, 3)
+
+    def rank():
+        return shop_rankings.rank(db, campus_id, *spec)
+
+    def rank_cold():
+        shop_rankings.invalidate(campus_id)
+        pricing_engine.invalidate()
+        return rank()
+
+    try:
+        _seed(db, fx, args.jobs)
+        ranked = rank()
+        assert len(ranked) == args.shops
+        assert sum(r.queue_length for r in ranked) == args.jobs
+
+        cold = _percentiles_ms(rank_cold, max(args.repeat // 10, 5))
+        warm = _percentiles_ms(rank, args.repeat)
+
+        shop_ids = fx.shop_ids
+        # Alternately a job joining and a job leaving the queue
+        moves = [
+            (PrintStatus.READY_TO_PRINT, PrintStatus.PAYMENT_CONFIRMED),
+            (PrintStatus.PRINTED, PrintStatus.PRINTING),
+        ]
+        events = [
+            JobEvent(i, shop_ids[(i // 2) % len(shop_ids)], uuid.uuid4(), *moves[i % 2], None)
+            for i in range(100_000)
+        ]
+        start = time.perf_counter()
+        for event in events:
+            shop_rankings.on_job_event(event)
+        per_event_us = (time.perf_counter() - start) / len(events) * 1e6
+
+        print(f"{args.shops} shops, {args.jobs:,} queued jobs")
+        print(f"{'rebuilt per request':<22} p50 {cold[0]:>8.2f} ms   p99 {cold[1]:>8.2f} ms")
+        print(f"{'warm index':<22} p50 {warm[0]:>8.2f} ms   p99 {warm[1]:>8.2f} ms  ({cold[0] / warm[0]:.0f}x)")
+        print(f"{'job event':<22} {per_event_us:>12.2f} us")
+    finally:
+        db.rollback()
+        shop_rankings.invalidate(campus_id)
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
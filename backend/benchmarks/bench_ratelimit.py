@@ -0,0 +1,124 @@
+# benchmarks/bench_ratelimit.py
+"""
+Per-request cost of RateLimitMiddleware with the in-memory bucket store:
+the same stream of ASGI requests is sent straight to a trivial app and
+through the middleware, and the difference per request is the limiter's
+overhead. Requests come from --clients distinct addresses, half of them
+for a shop path (so they take a second, per-shop token).
+
+Fails (exit status 1) if the median overhead is over --max-us. Pass
+--redis-url to also time the shared Redis store (not asserted; it adds a
+network round trip).
+
+Usage (from backend/, no database needed):
+    python -m benchmarks.bench_ratelimit [--requests 200000] [--clients 10000] [--max-us 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from app.core.ratelimit import BucketLimit, MemoryBucketStore, RateLimitMiddleware, RedisBucketStore
+
+HEADERS = [
+    (b"host", b"api.example.edu"),
+    (b"user-agent", b"kiosk/1.0"),
+    (b"accept", b"application/json"),
+    (b"accept-encoding", b"gzip, deflate"),
+    (b"connection", b"keep-alive"),
+    (b"cookie", b"session=abc"),
+]
+# High enough that every request is let through
+OPEN = BucketLimit(rate=1e9, burst=10**9)
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+def _scopes(n, clients, shops):
+    scopes = []
+    for i in range(n):
+        path = f"/api/shops/{shops[i // 2 % len(shops)]}/queue" if i % 2 else "/api/jobs/"
+        scopes.append({
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": b"",
+            "headers": HEADERS,
+            "client": (f"10.{i % clients // 65536}.{i % clients // 256 % 256}.{i % clients % 256}", 50000),
+        })
+    return scopes
+
+
+async def _run(app, scopes):
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    start = time.perf_counter()
+    for scope in scopes:
+        await app(scope, _receive, send)
+    return time.perf_counter() - start, statuses
+
+
+async def _overhead_us(limited, scopes, rounds):
+    samples = []
+    for _ in range(rounds):
+        bare, _ = await _run(_app, scopes)
+        wrapped, statuses = await _run(limited, scopes)
+        assert all(status == 200 for status in statuses)
+        samples.append((wrapped - bare) / len(scopes) * 1e6)
+    return statistics.median(samples)
+
+
+async def _main(args):
+    shops = [uuid.uuid4() for _ in range(100)]
+    scopes = _scopes(args.requests, args.clients, shops)
+
+    store = MemoryBucketStore()
+    memory = await _overhead_us(RateLimitMiddleware(_app, store, OPEN, OPEN), scopes, args.rounds)
+
+    # One client over its limit: the 429 path
+    tight = BucketLimit(rate=1, burst=1)
+    rejecting = RateLimitMiddleware(_app, MemoryBucketStore(), tight, tight)
+    one_client = [dict(scopes[0])] * args.requests
+    elapsed, statuses = await _run(rejecting, one_client)
+    assert statuses.count(429) >= args.requests - 2
+
+    print(f"{args.requests:,} requests, {args.clients:,} clients, {len(store):,} buckets")
+    print(f"{'memory store':<18} {memory:>8.2f} us/request overhead")
+    print(f"{'429 response':<18} {elapsed / args.requests * 1e6:>8.2f} us/request")
+
+    if args.redis_url:
+        redis_store = RedisBucketStore(args.redis_url, prefix=f"bench:{uuid.uuid4()}:")
+        redis_scopes = scopes[:args.requests // 20]
+        redis = await _overhead_us(RateLimitMiddleware(_app, redis_store, OPEN, OPEN), redis_scopes, 1)
+        print(f"{'redis store':<18} {redis:>8.2f} us/request overhead")
+
+    assert memory <= args.max_us, f"limiter overhead {memory:.2f}us is over --max-us {args.max_us}"
+    print(f"limiter overhead within {args.max_us:.0f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-us", type=float, default=50)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_serialization.py
+"""
+GET /api/jobs/ latency with the default response_model path versus the
+FAST_SERIALIZATION path (column SELECT + orjson) at 1k, 10k and 100k rows.
+
+list_jobs returns every row in print_jobs, so run this against a scratch
+PostgreSQL database; rows are added cumulatively to reach each size. The
+body of both paths is compared once per size to check the shapes match.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import PrintJob
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+
+def _median_ms(client, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get("/api/jobs/")
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return statistics.median(samples), response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    settings.JOB_PROCESSING_ENABLED = False
+    from app.main import app
+
+    db = SessionLocal()
+    fx = create_fixtures(db)
+    try:
+        with TestClient(app) as client:
+            print(f"{'rows':>8} {'model ms':>9} {'fast ms':>8} {'speedup':>8} {'same body':>10}")
+            for size in sorted(args.sizes):
+                existing = db.scalar(select(func.count()).select_from(PrintJob))
+                if existing < size:
+                    insert_jobs(db, fx, size - existing)
+
+                settings.FAST_SERIALIZATION = False
+                model_ms, model_response = _median_ms(client, args.repeat)
+                settings.FAST_SERIALIZATION = True
+                fast_ms, fast_response = _median_ms(client, args.repeat)
+
+                same = model_response.json() == fast_response.json()
+                print(f"{size:>8} {model_ms:>9.1f} {fast_ms:>8.1f} {model_ms / fast_ms:>7.1f}x {str(same):>10}")
+    finally:
+        settings.FAST_SERIALIZATION = False
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
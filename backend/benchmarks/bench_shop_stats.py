@@ -0,0 +1,76 @@
+# benchmarks/bench_shop_stats.py
+"""
+Shop dashboard stats over 5M synthetic jobs: the live GROUP BY over
+print_jobs/payments versus reading the shop_daily_stats rollup that
+GET /api/shops/{shop_id}/stats serves, plus the cost of a full rebuild.
+
+Both reads cover one shop and the last --days days. Run against a scratch
+PostgreSQL database; the fixture jobs and their rollup rows are removed
+afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_shop_stats [--jobs 5000000] [--days 30] [--repeat 10]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from app.db.session import SessionLocal
+from app.models.job import PrintJob
+from app.services import stats_service
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+INSERT_CHUNK = 1_000_000
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db)
+    shop_id = fx.shop_ids[0]
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+
+    try:
+        t = time.perf_counter()
+        for offset in range(0, args.jobs, INSERT_CHUNK):
+            insert_jobs(db, fx, min(INSERT_CHUNK, args.jobs - offset))
+        print(f"inserted {args.jobs:,} jobs in {time.perf_counter() - t:.1f}s")
+
+        t = time.perf_counter()
+        rows = stats_service.rebuild(db)
+        print(f"rebuild: {rows:,} rollup rows in {time.perf_counter() - t:.1f}s")
+
+        live = stats_service.rollup_source(shop_id).where(
+            PrintJob.created_at >= start,
+            PrintJob.created_at < end + timedelta(days=1),
+        )
+        live_ms = _median_ms(lambda: db.execute(live).all(), args.repeat)
+        rollup_ms = _median_ms(lambda: stats_service.shop_stats(db, shop_id, start, end), args.repeat)
+
+        print(f"{'live GROUP BY':<16} {live_ms:>10.2f} ms")
+        print(f"{'rollup read':<16} {rollup_ms:>10.2f} ms  ({live_ms / rollup_ms:.0f}x)")
+    finally:
+        db.rollback()
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
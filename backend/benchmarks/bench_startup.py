@@ -0,0 +1,99 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start time to first response: launches `uvicorn app.main:app` in a
+fresh process --runs times and measures, from spawning it, how long until
+
+- GET /health answers (the app is serving), and
+- the first database-backed request (--path) answers, which also pays
+  for creating the engine if the warm-up has not done it yet.
+
+Fails (exit status 1) if the median time to the first /health response is
+over --max-seconds. `python -m app.cli startup-profile` shows where the
+time goes.
+
+Usage (from backend/, against a scratch PostgreSQL database):
+    python -m benchmarks.bench_startup [--runs 5] [--max-seconds 3] [--path /api/campuses/]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+POLL_SECONDS = 0.005
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(POLL_SECONDS)
+    raise TimeoutError(f"no response from {url}")
+
+
+def _cold_start(path, timeout):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    # The processor would spawn worker processes and compete for the CPU
+    env = dict(os.environ, JOB_PROCESSING_ENABLED="false")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        _wait_for(base + "/health", deadline)
+        ready = time.perf_counter() - start
+        status = _wait_for(base + path, deadline)
+        first = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    if status >= 500:
+        raise RuntimeError(f"GET {path} returned {status}")
+    return ready, first
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=3.0)
+    parser.add_argument("--path", default="/api/campuses/")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    ready, first = [], []
+    for _ in range(args.runs):
+        r, f = _cold_start(args.path, args.timeout)
+        ready.append(r)
+        first.append(f)
+
+    print(f"{args.runs} cold starts")
+    print(f"{'GET /health':<28} median {statistics.median(ready) * 1000:>8.0f} ms   max {max(ready) * 1000:>8.0f} ms")
+    print(f"{'GET ' + args.path:<28} median {statistics.median(first) * 1000:>8.0f} ms   max {max(first) * 1000:>8.0f} ms")
+
+    median = statistics.median(ready)
+    assert median <= args.max_seconds, (
+        f"time to first response {median:.2f}s is over --max-seconds {args.max_seconds}"
+    )
+    print(f"time to first response within {args.max_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
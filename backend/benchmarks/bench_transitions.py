@@ -0,0 +1,70 @@
+# benchmarks/bench_transitions.py
+"""
+Marking jobs PRINTED: one POST /api/jobs/transitions:batch call per job
+versus batches of --batch-size, in transitions per second.
+
+Jobs are moved READY_TO_PRINT -> PRINTED; each run resets the fixture jobs
+first. Run against a scratch PostgreSQL database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_transitions [--jobs 5000] [--batch-sizes 1 50 500 1000]
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import PrintJob
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+
+def _reset(db, fx):
+    db.execute(
+        text("UPDATE print_jobs SET status = 'READY_TO_PRINT' WHERE campus_id = CAST(:c AS uuid)"),
+        {"c": str(fx.campus_id)},
+    )
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 50, 500, 1000])
+    args = parser.parse_args()
+
+    settings.JOB_PROCESSING_ENABLED = False
+    settings.PAYMENT_APPLIER_ENABLED = False
+    from app.main import app
+
+    db = SessionLocal()
+    fx = create_fixtures(db, n_shops=1, n_users=10)
+    try:
+        insert_jobs(db, fx, args.jobs)
+        job_ids = [str(i) for i in db.scalars(select(PrintJob.id).where(PrintJob.campus_id == fx.campus_id))]
+
+        with TestClient(app) as client:
+            for batch_size in args.batch_sizes:
+                _reset(db, fx)
+                applied = 0
+                start = time.perf_counter()
+                for offset in range(0, len(job_ids), batch_size):
+                    batch = [
+                        {"job_id": job_id, "to": "printed", "expected": "ready_to_print"}
+                        for job_id in job_ids[offset:offset + batch_size]
+                    ]
+                    response = client.post("/api/jobs/transitions:batch", json={"transitions": batch})
+                    applied += response.json()["applied"]
+                elapsed = time.perf_counter() - start
+                print(f"{'batch ' + str(batch_size):>12} {applied / elapsed:>10,.0f} transitions/s "
+                      f"({applied} applied)")
+    finally:
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
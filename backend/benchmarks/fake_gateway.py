@@ -0,0 +1,168 @@
+# benchmarks/fake_gateway.py
+"""
+Local fake payment gateway: replays webhook deliveries with duplicates
+against POST /api/payments/webhook and checks the end state.
+
+One payment.succeeded event is generated per PAYMENT_PENDING fixture job;
+the deliveries are those events plus random redeliveries, shuffled and
+sent from --concurrency connections, so a duplicate can race its original
+the way a retrying gateway's does; --deliveries in total. The script reports webhook throughput and latency,
+then waits for the applier to drain the inbox and verifies that every job
+was confirmed exactly once.
+
+Deliveries are signed with PAYMENT_WEBHOOK_SECRET from the environment,
+which --spawn passes on to the server; without it the server must run with
+PAYMENT_WEBHOOK_ALLOW_UNSIGNED=true.
+
+Usage (from backend/, against a scratch PostgreSQL database; needs
+`pip install -r requirements-bench.txt`):
+    python -m benchmarks.fake_gateway --spawn [--deliveries 100000] [--jobs 20000]
+    python -m benchmarks.fake_gateway --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import time
+
+import httpx
+from sqlalchemy import func, select, text
+
+from app.core.constants import PrintStatus
+from app.db.session import SessionLocal
+from app.models.job import PrintJob
+from app.models.payment import Payment, PaymentEvent
+from benchmarks.load_test import spawn_server, wait_ready, _percentile
+from benchmarks.seed import create_fixtures, drop_fixtures, insert_jobs
+
+
+def make_deliveries(jobs, total, seed=7):
+    rng = random.Random(seed)
+    events = [
+        {
+            "id": f"evt_{job_id.hex}",
+            "type": "payment.succeeded",
+            "job_id": str(job_id),
+            "amount": price,
+            "reference": f"ch_{job_id.hex[:12]}",
+        }
+        for job_id, price in jobs
+    ]
+    deliveries = events + rng.choices(events, k=max(0, total - len(events)))
+    rng.shuffle(deliveries)
+    return deliveries, len(events)
+
+
+async def replay(url, deliveries, concurrency, secret):
+    latencies, errors, duplicates = [], [], 0
+    queue = asyncio.Queue()
+    for event in deliveries:
+        queue.put_nowait(json.dumps(event).encode())
+
+    async def worker(client):
+        nonlocal duplicates
+        while not queue.empty():
+            body = queue.get_nowait()
+            headers = {"content-type": "application/json"}
+            if secret:
+                headers["X-Signature"] = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/payments/webhook", content=body, headers=headers)
+            except httpx.HTTPError as exc:
+                errors.append(type(exc).__name__)
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+            elif response.json()["duplicate"]:
+                duplicates += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, duplicates, elapsed
+
+
+def wait_drained(db, timeout):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        pending = db.scalar(
+            select(func.count()).select_from(PaymentEvent).where(PaymentEvent.processed_at.is_(None))
+        )
+        if not pending:
+            return time.perf_counter() - start
+        time.sleep(0.2)
+    raise RuntimeError(f"{pending} events still pending after {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--deliveries", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--drain-timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fx = create_fixtures(db, n_shops=10, n_users=100)
+    insert_jobs(db, fx, args.jobs)
+    db.execute(
+        text("UPDATE print_jobs SET status = 'PAYMENT_PENDING' WHERE campus_id = CAST(:c AS uuid)"),
+        {"c": str(fx.campus_id)},
+    )
+    db.commit()
+    jobs = db.execute(
+        select(PrintJob.id, PrintJob.final_price).where(PrintJob.campus_id == fx.campus_id)
+    ).all()
+    deliveries, unique = make_deliveries(jobs, args.deliveries)
+
+    server = None
+    url = args.url
+    if args.spawn:
+        url = f"http://127.0.0.1:{args.port}"
+        server = spawn_server(db_async=False, port=args.port)
+    try:
+        wait_ready(url)
+        latencies, errors, duplicates, elapsed = asyncio.run(
+            replay(url, deliveries, args.concurrency, os.environ.get("PAYMENT_WEBHOOK_SECRET"))
+        )
+        print(f"deliveries {len(deliveries):,} ({unique:,} unique) in {elapsed:.1f}s: "
+              f"{len(latencies) / elapsed:,.0f} req/s, p50 {_percentile(latencies, 50):.1f} ms, "
+              f"p99 {_percentile(latencies, 99):.1f} ms, {len(errors)} errors, {duplicates:,} acked as duplicate")
+
+        drain = wait_drained(db, args.drain_timeout)
+        print(f"inbox drained {drain:.1f}s after the last delivery")
+
+        job_ids = [job_id for job_id, _ in jobs]
+        confirmed = db.scalar(
+            select(func.count()).select_from(PrintJob)
+            .where(PrintJob.id.in_(job_ids), PrintJob.status == PrintStatus.PAYMENT_CONFIRMED)
+        )
+        payments = db.scalar(select(func.count()).select_from(Payment).where(Payment.job_id.in_(job_ids)))
+        events = db.scalar(select(func.count()).select_from(PaymentEvent).where(PaymentEvent.job_id.in_(job_ids)))
+        ok = confirmed == payments == events == unique and duplicates == len(deliveries) - unique
+        print(f"confirmed jobs {confirmed:,}, payments {payments:,}, inbox rows {events:,}: {'OK' if ok else 'MISMATCH'}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        db.execute(
+            PaymentEvent.__table__.delete().where(PaymentEvent.job_id.in_([job_id for job_id, _ in jobs]))
+        )
+        db.commit()
+        drop_fixtures(db, fx)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/load_test.py
+"""
+Closed-loop HTTP load test comparing the sync and async database modes.
+
+With --spawn the script starts uvicorn twice against DATABASE_URL, once with
+DB_ASYNC=false and once with DB_ASYNC=true, and drives both with the same
+workload. Without it, the running server at --url is measured once.
+
+Usage (from backend/, needs `pip install -r requirements-bench.txt`):
+    python -m benchmarks.load_test --spawn --concurrency 64 --duration 20
+    python -m benchmarks.load_test --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+DEFAULT_PATHS = ["/api/campuses/", "/api/shops/", "/api/payments/"]
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _worker(client, paths, deadline, latencies, errors, offset):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_load(url, paths, concurrency, duration):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        # Warm the connection pools on both sides before measuring
+        await asyncio.gather(*(client.get(p) for p in paths))
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            _worker(client, paths, deadline, latencies, errors, i)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 50),
+        "p99": _percentile(latencies, 99),
+    }
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url + "/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def spawn_server(db_async, port):
+    env = dict(os.environ, DB_ASYNC="true" if db_async else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+def _report(label, result):
+    print(
+        f"{label:<8} {result['rps']:>10.1f} {result['p50']:>10.2f} "
+        f"{result['p99']:>10.2f} {result['requests']:>10} {result['errors']:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn in sync and async mode")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'requests':>10} {'errors':>8}")
+
+    if not args.spawn:
+        _report("server", asyncio.run(run_load(args.url, args.paths, args.concurrency, args.duration)))
+        return
+
+    url = f"http://127.0.0.1:{args.port}"
+    for label, db_async in (("sync", False), ("async", True)):
+        server = spawn_server(db_async, args.port)
+        try:
+            wait_ready(url)
+            _report(label, asyncio.run(run_load(url, args.paths, args.concurrency, args.duration)))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
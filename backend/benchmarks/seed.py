@@ -0,0 +1,104 @@
+# benchmarks/seed.py
+"""
+Synthetic data helpers shared by the benchmark scripts.
+
+Everything is created under a dedicated campus so `drop_fixtures` can remove
+it again with a single cascading delete. Bulk rows are generated server-side
+with generate_series, so the benchmarks need a PostgreSQL DATABASE_URL.
+"""
+
+import uuid
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.constants import ExecutionMode, PaymentMode, UserRole
+from app.models import Campus, Shop, User
+
+
+@dataclass
+class Fixtures:
+    campus_id: uuid.UUID
+    shop_ids: List[uuid.UUID]
+    user_ids: List[uuid.UUID]
+
+
+def create_fixtures(db: Session, n_shops: int = 10, n_users: int = 100) -> Fixtures:
+    campus = Campus(name=f"bench-{uuid.uuid4().hex[:8]}", location="benchmark")
+    db.add(campus)
+    db.flush()
+
+    shops = [
+        Shop(
+            campus_id=campus.id,
+            name=f"shop-{i}",
+            execution_mode=ExecutionMode.AUTO,
+            payment_mode=PaymentMode.BOTH,
+        )
+        for i in range(n_shops)
+    ]
+    users = [
+        User(
+            campus_id=campus.id,
+            email=f"{campus.name}-{i}@bench.local",
+            name=f"user {i}",
+            role=UserRole.STUDENT,
+        )
+        for i in range(n_users)
+    ]
+    db.add_all(shops + users)
+    db.commit()
+
+    return Fixtures(
+        campus_id=campus.id,
+        shop_ids=[s.id for s in shops],
+        user_ids=[u.id for u in users],
+    )
+
+
+def insert_jobs(db: Session, fx: Fixtures, n: int) -> None:
+    """Insert n jobs spread over the fixture shops/users and the last 90 days."""
+    db.execute(
+        text("""
+            INSERT INTO print_jobs (
+                id, campus_id, shop_id, user_id, file_url, original_filename,
+                pages, copies, size, color_mode, final_price, pricing_snapshot,
+                execution_mode_snapshot, payment_mode_snapshot, status,
+                created_at, updated_at
+            )
+            SELECT
+                gen_random_uuid(), CAST(:campus_id AS uuid),
+                (CAST(:shop_ids AS uuid[]))[1 + (g % :n_shops)],
+                (CAST(:user_ids AS uuid[]))[1 + (g % :n_users)],
+                'bench://' || g, 'doc.pdf',
+                1 + (g % 40), 1 + (g % 3),
+                (ARRAY['A4', 'A3'])[1 + (g % 5 = 0)::int]::papersize,
+                (ARRAY['BW', 'COLOR'])[1 + (g % 4 = 0)::int]::colormode,
+                1.0, '{}'::json,
+                'AUTO', 'BOTH',
+                (ARRAY['UPLOADED', 'PAYMENT_PENDING', 'PAYMENT_CONFIRMED',
+                       'READY_TO_PRINT', 'PRINTING', 'PRINTED', 'COLLECTED',
+                       'CANCELLED'])[1 + (g % 8)]::printstatus,
+                now() - (random() * interval '90 days'),
+                now()
+            FROM generate_series(1, :n) AS g
+        """),
+        {
+            "campus_id": str(fx.campus_id),
+            "shop_ids": [str(i) for i in fx.shop_ids],
+            "user_ids": [str(i) for i in fx.user_ids],
+            "n_shops": len(fx.shop_ids),
+            "n_users": len(fx.user_ids),
+            "n": n,
+        },
+    )
+    db.commit()
+    db.execute(text("ANALYZE print_jobs"))
+    db.commit()
+
+
+def drop_fixtures(db: Session, fx: Fixtures) -> None:
+    db.execute(text("DELETE FROM campuses WHERE id = CAST(:id AS uuid)"), {"id": str(fx.campus_id)})
+    db.commit()
@@ -0,0 +1,37 @@
+# tests/test_file_utils.py
+
+import asyncio
+
+import pytest
+
+from app.utils.file_utils import UploadError, receive_multipart
+
+CONTENT_TYPE = "multipart/form-data; boundary=xx"
+
+
+def _receive(body: bytes, dest_dir):
+    async def chunks():
+        yield body
+
+    return asyncio.run(receive_multipart(chunks(), CONTENT_TYPE, str(dest_dir), 10**6))
+
+
+def test_file_and_fields(tmp_path):
+    body = (
+        b'--xx\r\nContent-Disposition: form-data; name="shop_id"\r\n\r\nabc\r\n'
+        b'--xx\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n'
+        b"Content-Type: application/pdf\r\n\r\n%PDF-1.4 data\r\n--xx--\r\n"
+    )
+    upload = _receive(body, tmp_path)
+    assert upload.fields == {"shop_id": "abc"}
+    assert upload.file.filename == "a.pdf" and upload.file.size == len(b"%PDF-1.4 data")
+
+
+@pytest.mark.parametrize("body", [
+    b"garbage garbage\r\n--xx\r\nzz",
+    b'--xx\r\nContent-Disposition: form-data; name="shop_id"\r\n\r\n\xff\xfe\r\n--xx--\r\n',
+], ids=["bad-framing", "non-utf8-field"])
+def test_malformed_body_is_upload_error(tmp_path, body):
+    with pytest.raises(UploadError):
+        _receive(body, tmp_path)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,100 @@
+# tests/test_job_includes.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.constants import ColorMode, ExecutionMode, PaperSize, PaymentMode, PrintStatus, UserRole
+from app.models import Campus, Payment, PrintJob, Shop, User
+from app.models.base import Base
+from app.models.payment import PaymentStatus
+from app.services import job_service
+
+INCLUDES = ("shop", "user", "payment")
+STATUSES = (PrintStatus.UPLOADED, PrintStatus.PAYMENT_PENDING, PrintStatus.READY_TO_PRINT)
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@pytest.fixture(scope="module")
+def queue():
+    """In-memory database with one shop's queue of 60 jobs; yields (engine, shop_id)."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        campus = Campus(name="c", location="l")
+        db.add(campus)
+        db.flush()
+        shop = Shop(campus_id=campus.id, name="s", execution_mode=ExecutionMode.AUTO, payment_mode=PaymentMode.BOTH)
+        users = [User(campus_id=campus.id, email=f"u{i}@x.co", name="u", role=UserRole.STUDENT) for i in range(5)]
+        db.add_all([shop, *users])
+        db.flush()
+
+        start = datetime(2026, 1, 1)
+        for i in range(60):
+            job = PrintJob(
+                campus_id=campus.id,
+                shop_id=shop.id,
+                user_id=users[i % len(users)].id,
+                file_url=f"test://{i}",
+                original_filename="doc.pdf",
+                pages=1,
+                copies=1,
+                size=PaperSize.A4,
+                color_mode=ColorMode.BW,
+                final_price=1.0,
+                execution_mode_snapshot=ExecutionMode.AUTO,
+                payment_mode_snapshot=PaymentMode.BOTH,
+                status=STATUSES[i % len(STATUSES)],
+                created_at=start + timedelta(minutes=i),
+            )
+            db.add(job)
+            db.flush()
+            if i % 2:
+                db.add(Payment(job_id=job.id, amount=1.0, status=PaymentStatus.SUCCESS))
+        db.commit()
+        shop_id = shop.id
+
+    yield engine, shop_id
+    engine.dispose()
+
+
+def _page_statements(queue, limit, statuses=None):
+    """Build one ?include= page from a fresh session; returns (items, SQL statements issued)."""
+    engine, shop_id = queue
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with Session(engine) as db:
+            stmt = job_service.build_shop_queue_query(shop_id, statuses=statuses, limit=limit)
+            jobs = db.execute(job_service.with_includes(stmt, INCLUDES)).scalars().all()
+            page, _ = job_service.paginate(list(jobs), limit)
+            items = [job_service.job_detail(job, INCLUDES) for job in page]
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return items, len(statements)
+
+
+@pytest.mark.parametrize("statuses", [None, STATUSES[:2]], ids=["all", "multi-status"])
+def test_include_query_count_does_not_grow_with_page_size(queue, statuses):
+    small, small_queries = _page_statements(queue, 5, statuses)
+    large, large_queries = _page_statements(queue, 30, statuses)
+
+    assert (len(small), len(large)) == (5, 30)
+    assert all(item.shop is not None and item.user is not None for item in small + large)
+    assert any(item.payment is not None for item in large)
+    # The page query plus one SELECT ... IN for the payments
+    assert small_queries == large_queries == 2
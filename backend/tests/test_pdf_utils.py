@@ -0,0 +1,117 @@
+# tests/test_pdf_utils.py
+
+import mmap
+
+import pytest
+
+from app.utils import pdf_utils
+
+
+def _pdf(eol: bytes, pages: int = 3) -> bytes:
+    """A classic-xref PDF with `pages` pages and every line ending in `eol`."""
+    kids = b" ".join(b"%d 0 R" % (3 + i) for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages,
+    ] + [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>"] * pages
+
+    out = b"%PDF-1.4" + eol
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj" % num + eol + body + eol + b"endobj" + eol
+
+    xref_at = len(out)
+    # Entries stay 20 bytes: a one-byte line ending is padded with a space
+    entry_eol = eol if len(eol) == 2 else b" " + eol
+    out += b"xref" + eol + b"0 %d" % (len(objects) + 1) + eol
+    out += b"0000000000 65535 f" + entry_eol
+    for offset in offsets:
+        out += b"%010d 00000 n" % offset + entry_eol
+    out += b"trailer" + eol + b"<< /Size %d /Root 1 0 R >>" % (len(objects) + 1) + eol
+    out += b"startxref" + eol + b"%d" % xref_at + eol + b"%%EOF" + eol
+    return out
+
+
+def _startxref(data: bytes) -> int:
+    return int(data.rsplit(b"startxref", 1)[1].split()[0])
+
+
+@pytest.mark.parametrize("eol", [b"\n", b"\r\n", b"\r"], ids=["lf", "crlf", "cr"])
+def test_xref_table_line_endings(tmp_path, eol):
+    data = _pdf(eol)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        entries, trailer = pdf_utils._read_xref_table(mm, _startxref(data))
+        assert sorted(entries) == [1, 2, 3, 4, 5]
+        assert trailer.startswith(b"trailer") and len(trailer) < 100
+        assert pdf_utils._count_from_page_tree(mm) == 3
+
+    assert pdf_utils.count_pages(str(path)) == 3
+
+
+def test_truncated_xref_table_stops_at_trailer(tmp_path):
+    data = _pdf(b"\r").replace(b"0 6\r", b"0 999999\r")
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        entries, _ = pdf_utils._read_xref_table(mm, _startxref(data))
+        assert sorted(entries) == [1, 2, 3, 4, 5]
+
+
+def _xref_stream_pdf(pages: int = 2, size: bool = True, catalog_in_objstm: bool = False) -> bytes:
+    """
+    A PDF whose only cross-reference section is an uncompressed xref stream.
+    `size=False` leaves /Size (and /Index) out; `catalog_in_objstm` points
+    the catalog at an object stream that is not in the xref.
+    """
+    kids = b" ".join(b"%d 0 R" % (3 + i) for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages,
+    ] + [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>"] * pages
+
+    out = b"%PDF-1.5\n"
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+
+    rows = [bytes([0, 0, 0, 0, 0, 0])]
+    for num, offset in enumerate(offsets, start=1):
+        if num == 1 and catalog_in_objstm:
+            rows.append(bytes([2]) + (99).to_bytes(4, "big") + bytes([0]))
+        else:
+            rows.append(bytes([1]) + offset.to_bytes(4, "big") + bytes([0]))
+    data = b"".join(rows)
+
+    xref_at = len(out)
+    keys = b"/Type /XRef /W [1 4 1] /Root 1 0 R /Length %d" % len(data)
+    if size:
+        keys += b" /Size %d" % len(rows)
+    out += b"%d 0 obj\n<< " % (len(objects) + 1) + keys + b" >>\nstream\n" + data + b"\nendstream\nendobj\n"
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_at
+    return out
+
+
+def test_xref_stream(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(_xref_stream_pdf(pages=2))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        assert pdf_utils._count_from_page_tree(mm) == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"size": False}, {"catalog_in_objstm": True}], ids=["no-size", "missing-objstm"]
+)
+def test_malformed_xref_stream_falls_back_to_page_scan(tmp_path, kwargs):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(_xref_stream_pdf(pages=2, **kwargs))
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with pytest.raises(pdf_utils.PdfError):
+            pdf_utils._count_from_page_tree(mm)
+    assert pdf_utils.count_pages(str(path)) == 2
@@ -0,0 +1,73 @@
+# tests/test_ratelimit.py
+
+import asyncio
+import uuid
+
+from app.core.ratelimit import BucketLimit, MemoryBucketStore, RateLimitMiddleware, client_key, shop_key
+
+# Effectively unlimited per client, so only the shop buckets are under test
+OPEN = BucketLimit(rate=1e9, burst=10**9)
+ONE = BucketLimit(rate=1e-9, burst=1)
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+def _scope(path, headers=(), query=b"", client="10.0.0.1"):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+        "client": (client, 50000),
+    }
+
+
+def _status(app, scope):
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    asyncio.run(app(scope, _receive, send))
+    return statuses[0]
+
+
+def test_client_key_ignores_user_header():
+    forged = _scope("/api/jobs/", headers=[(b"x-user-id", b"someone-else")])
+    assert client_key(forged) == client_key(_scope("/api/jobs/")) == "addr:10.0.0.1"
+
+
+def test_shop_key_only_from_path():
+    shop = uuid.uuid4()
+    assert shop_key(_scope(f"/api/shops/{shop}/queue")) == f"shop:{shop}"
+    assert shop_key(_scope("/api/jobs/", headers=[(b"x-shop-id", str(shop).encode())])) is None
+    assert shop_key(_scope("/api/jobs/", query=f"shop_id={shop}".encode())) is None
+
+
+def test_forged_shop_does_not_drain_other_bucket():
+    victim = uuid.uuid4()
+    store = MemoryBucketStore()
+    app = RateLimitMiddleware(_app, store, OPEN, ONE)
+
+    for i in range(20):
+        forged = _scope(
+            "/api/jobs/",
+            headers=[(b"x-shop-id", str(victim).encode())],
+            query=f"shop_id={victim}".encode(),
+            client=f"10.0.1.{i}",
+        )
+        assert _status(app, forged) == 200
+    assert f"shop:{victim}" not in store._buckets
+
+    # The victim's single token is still there, and spent by its own route
+    assert _status(app, _scope(f"/api/shops/{victim}/queue")) == 200
+    assert _status(app, _scope(f"/api/shops/{victim}/queue")) == 429